@@ -0,0 +1,120 @@
+# benchmarks/bench_board_size.py
+# Cost of the common rule operations on boards of growing size. The amount of work per operation
+# (buildings, entangled pairs, tokens) is the same on every board, so the numbers should stay flat.
+#
+#   python -m benchmarks.bench_board_size              (from the QuantumCatan folder)
+#   python -m benchmarks.bench_board_size --radius 2 10 20 30 --repeat 2000
+
+import argparse, heapq, random, time
+from src.bots import new_game
+
+SETTLEMENTS_PER_PLAYER = 2   # as after the placement rounds
+PAIRS = 4
+PLACEMENTS_PER_GAME = 5       # a standard board has little room left, games are copied and refilled
+
+
+def free_vertex(game, rng, tries=1000):
+    """a random vertex that keeps the distance rule, None when none was found"""
+    owners = game.settlements_owner
+    neighbors = game.vertex_neighbors
+    n = len(game.vertex_positions)
+    for _ in range(tries):
+        v = rng.randrange(n)
+        if v not in owners and all(u not in owners for u in neighbors[v]):
+            return v
+    return None
+
+
+def classical_pair(game, rng):
+    """two random tiles that can be entangled, found by sampling instead of scanning the board"""
+    n = len(game.tiles)
+    while True:
+        a, b = rng.randrange(n), rng.randrange(n)
+        if a != b and game.can_entangle_tile(a) and game.can_entangle_tile(b, (a,)):
+            return a, b
+
+
+def setup(radius, seed):
+    rng = random.Random(seed)
+    game = new_game(4, PAIRS, seed=seed, board_radius=radius)
+    for _ in range(SETTLEMENTS_PER_PLAYER):
+        for p in range(game.num_players):
+            game.place_settlement(free_vertex(game, rng), p)
+    return game, rng
+
+
+def bench_roll(radius, repeat, seed=1):
+    game, rng = setup(radius, seed)
+    numbers = [2, 3, 4, 5, 6, 8, 9, 10, 11, 12]
+    t0 = time.perf_counter()
+    for i in range(repeat):
+        game.roll_and_distribute(numbers[i % len(numbers)])
+        if i % 50 == 0:
+            # keep hands from growing without bound
+            for p in game.players:
+                p.tokens.clear()
+    return (time.perf_counter() - t0) / repeat
+
+
+def bench_placement(radius, repeat, seed=2):
+    """a distance rule check, a settlement and a road next to it"""
+    base, rng = setup(radius, seed)
+    total = 0.0
+    done = 0
+    while done < repeat:
+        game = base.clone()
+        candidates = []
+        for _ in range(min(PLACEMENTS_PER_GAME, repeat - done)):
+            v = free_vertex(game, rng)
+            if v is not None and all(u not in candidates for u in game.vertex_neighbors[v]):
+                candidates.append(v)
+        t0 = time.perf_counter()
+        for k, v in enumerate(candidates):
+            if game.can_place_settlement(v):
+                game.place_settlement(v, k % game.num_players)
+            u = min(game.vertex_neighbors[v])
+            road = game.topology.road_index[tuple(sorted((u, v)))]
+            game.place_road(road, k % game.num_players)
+        total += time.perf_counter() - t0
+        done += max(len(candidates), 1)
+    return total / repeat
+
+
+def bench_collapse(radius, repeat, seed=3):
+    """measuring a pair (tokens converted for every player), entangling a new pair is not timed"""
+    game, rng = setup(radius, seed)
+    total = 0.0
+    for i in range(repeat):
+        group = game.tiles.groups()[0]
+        for ti in game.tiles.group_members(group):
+            for p in game.players:
+                p.tokens.append({"type": "entangled", "group": group, "possible": [], "tile_coord": None,
+                                 "from_tile_idx": ti})
+        member = game.tiles.group_members(group)[0]
+        t0 = time.perf_counter()
+        game.unentangle_pair_of_quantum_tiles(game.tiles[member])
+        total += time.perf_counter() - t0
+        a, b = classical_pair(game, rng)
+        game.entangle_pair_of_normal_tiles([(a, game.tiles[a]), (b, game.tiles[b])],
+                                           heapq.heappop(game.unused_ent_group_numbers), start=True)
+        game.message_log.clear()
+    return total / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="rule operation cost per board radius")
+    parser.add_argument("--radius", type=int, nargs="+", default=[2, 10, 20])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    print(f"{'radius':>6} {'tiles':>6} {'roll us':>9} {'place us':>9} {'collapse us':>12}")
+    for r in args.radius:
+        roll = bench_roll(r, args.repeat)
+        place = bench_placement(r, args.repeat)
+        collapse = bench_collapse(r, args.repeat)
+        tiles = 3 * r * (r + 1) + 1
+        print(f"{r:>6} {tiles:>6} {roll*1e6:>9.1f} {place*1e6:>9.1f} {collapse*1e6:>12.1f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
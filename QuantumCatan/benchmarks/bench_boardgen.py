@@ -0,0 +1,66 @@
+# benchmarks/bench_boardgen.py
+# Boards per second from boardgen.generate_boards against making them one by one the way
+# reset_game does (randomize_tiles, generate_sea_ring and the entangle loop), and what a fair
+# board from balanced.py costs.
+#
+#   python -m benchmarks.bench_boardgen              (from the QuantumCatan folder)
+#   python -m benchmarks.bench_boardgen --radius 2 5 --boards 1000000
+
+import argparse, heapq, random, time
+from src.boardgen import iter_boards
+from src.balanced import balanced_board
+from src.board import randomize_tiles, generate_sea_ring
+from src.engine import GameEngine
+
+PAIRS = 2
+SINGLE_BOARDS = 2000
+
+
+def bench_single(radius, boards, seed=1):
+    """the per-game path, on an engine that is never started"""
+    random.seed(seed)
+    game = GameEngine(4, board_radius=radius)
+    game.robber_idx = None
+    t0 = time.perf_counter()
+    for _ in range(boards):
+        game.tiles = randomize_tiles(game.topology.hex_coords)
+        game.sea_tiles = generate_sea_ring(game.topology.sea_coords)
+        game.unused_ent_group_numbers = list(range(1, len(game.tiles) // 2 + 1))
+        for _ in range(PAIRS):
+            pair = game._random_entangle_group(2)
+            game.tiles.entangle(pair, heapq.heappop(game.unused_ent_group_numbers))
+    return (time.perf_counter() - t0) / boards
+
+
+def bench_balanced(radius, boards, seed=1):
+    random.seed(seed)
+    t0 = time.perf_counter()
+    for _ in range(boards):
+        balanced_board(radius, PAIRS)
+    return (time.perf_counter() - t0) / boards
+
+
+def bench_batch(radius, boards, chunk, seed=1):
+    t0 = time.perf_counter()
+    made = sum(len(batch) for batch in iter_boards(boards, radius, PAIRS, seed, chunk))
+    return (time.perf_counter() - t0) / made
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="board generation cost, one by one and batched")
+    parser.add_argument("--radius", type=int, nargs="+", default=[2, 5, 10])
+    parser.add_argument("--boards", type=int, default=200_000)
+    parser.add_argument("--chunk", type=int, default=50_000)
+    args = parser.parse_args(argv)
+
+    print(f"{'radius':>6} {'tiles':>6} {'single us':>10} {'batch us':>9} {'speedup':>8} {'balanced us':>12}")
+    for r in args.radius:
+        single = bench_single(r, SINGLE_BOARDS)
+        batch = bench_batch(r, args.boards, args.chunk)
+        balanced = bench_balanced(r, max(SINGLE_BOARDS // r, 50))
+        tiles = 3 * r * (r + 1) + 1
+        print(f"{r:>6} {tiles:>6} {single*1e6:>10.1f} {batch*1e6:>9.2f} {single/batch:>7.0f}x {balanced*1e6:>12.1f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,23 @@
 # main.py
 # Run this to start Quantum Catan
 import time
+STARTUP_T0 = time.perf_counter()
 import pygame
 from pygame.locals import *
 import sys
+import logging
+import argparse
 from src.game_state import GameState
 from src.ui import GameUI
-from src.constants import WIN_W, WIN_H
+from src.worker import AnalysisWorker
+from src.timestep import GameClock, FixedTimestep, FrameLimiter, STEP_MS, LOGIC_HZ, FAST_FORWARD_SPEED, FAST_FORWARD_FPS
+from src.constants import WIN_W, WIN_H, BG_COLOR, HEX_RADIUS
+from src.assets import ASSETS, LOGO_PATH, LOGO_SIZE, COMMON_FONT_SIZES
+from src import gamelog
+from src.bots import make_bot, BOTS
+
+# the window should be on screen within this many milliseconds after starting main.py
+STARTUP_BUDGET_MS = 500
 
 """
 def ask_player_count():
@@ -24,23 +35,61 @@ def ask_player_count():
         print("Please enter 2, 3 or 4.")
 """
 
+log = gamelog.get_logger("main")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Quantum Catan")
+    parser.add_argument("--radius", type=int, default=HEX_RADIUS, help="board size, tiles from the centre to the edge (2 is the standard board)")
+    parser.add_argument("--bots", type=int, default=0, help="number of seats (counted from the last one) played by the computer")
+    parser.add_argument("--bot", default="mcts", choices=sorted(BOTS), help="which computer player to use")
+    parser.add_argument("--bot-time", type=float, default=1.0, help="seconds the mcts bot may think per move")
+    parser.add_argument("--bot-workers", type=int, default=None, help="processes the mcts bot searches with (default: all cores)")
+    parser.add_argument("--autosave", default=None, help="file the game is pickled to at every turn (in the background)")
+    parser.add_argument("--speed", type=float, default=1.0, help="seconds of game time per second, Tab switches between 1 and %d" % FAST_FORWARD_SPEED)
+    return parser.parse_args(argv)
+
 def main():
-    pygame.init()
-    pygame.font.init()
+    args = parse_args()
+    # silent unless QUATAN_LOG (and optionally QUATAN_LOG_FILE) is set
+    gamelog.configure_from_env()
+    # only the display is needed to show the window, fonts and the mixer are started when first used
+    pygame.display.init()
     pygame.display.set_caption("Quantum Catan")
     screen = pygame.display.set_mode((WIN_W, WIN_H), HWSURFACE|DOUBLEBUF|RESIZABLE)
+    screen.fill(BG_COLOR)
+    pygame.display.flip()
+    startup_ms = (time.perf_counter() - STARTUP_T0) * 1000
+    level = logging.WARNING if startup_ms > STARTUP_BUDGET_MS else logging.INFO
+    gamelog.log_event(log, level, "startup", ms=round(startup_ms), budget_ms=STARTUP_BUDGET_MS)
+    # decode the logo and open the fonts while the rest starts up
+    ASSETS.preload(images=[(LOGO_PATH, LOGO_SIZE)], fonts=COMMON_FONT_SIZES)
 
     num_players =  2 #ask_player_count()
-    state = GameState(num_players=num_players, screen=screen)
-    ui = GameUI(state, screen)
+    # the game runs on its own clock, moved in fixed steps below, so it can run faster than real time
+    game_clock = GameClock()
+    state = GameState(num_players=num_players, screen=screen, board_radius=args.radius, clock=game_clock)
+    bot = None
+    if args.bots > 0:
+        options = {"time_budget": args.bot_time, "workers": args.bot_workers} if args.bot == "mcts" else {}
+        bot = make_bot(args.bot, **options)
+    # bot moves, the analysis overlay (A key) and autosaves run off the main loop
+    worker = AnalysisWorker()
+    ui = GameUI(state, screen, bot=bot, num_bots=args.bots, worker=worker, autosave_path=args.autosave)
 
     clock = pygame.time.Clock()
+    timestep = FixedTimestep(speed=args.speed)
+    fast_frames = FrameLimiter(FAST_FORWARD_FPS)
     running = True
     while running:
-        dt = clock.tick(60)
+        # fast-forwarding goes around more often than it draws, every time around picks up the bot's moves
+        fast = timestep.speed > 1
+        real_dt = clock.tick(LOGIC_HZ * 4 if fast else LOGIC_HZ)
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            if event.type == KEYDOWN and event.key == pygame.K_TAB:
+                timestep.speed = FAST_FORWARD_SPEED if timestep.speed == 1 else 1
+                continue
             ui.handle_event(event)
             isFullscreen = pygame.display.get_window_size() == pygame.display.get_desktop_sizes()[0]
             if event.type == KEYDOWN:
@@ -62,10 +111,22 @@ def main():
                 ui.screen = screen
                 ui.state.screen = screen
     
-        state.update(dt)
-        ui.draw()
-        pygame.display.flip()
+        # logic in fixed steps of game time, as many as the wall time (times the speed) asks for
+        for _ in range(timestep.steps(real_dt)):
+            game_clock.advance(STEP_MS)
+            state.update(STEP_MS)
+            ui.run_bots()
+        ui.run_jobs()
+        # at normal speed every time around is drawn, fast-forwarding draws FAST_FORWARD_FPS frames a second
+        if not fast or fast_frames.due(pygame.time.get_ticks()):
+            ui.speed = timestep.speed
+            ui.draw(timestep.frame_time(game_clock))
+            pygame.display.flip()
 
+    worker.close()
+    if bot is not None:
+        bot.close()
+    gamelog.shutdown()  # writes out the last batch of the file sink
     pygame.quit()
     sys.exit()
 
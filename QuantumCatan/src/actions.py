@@ -0,0 +1,373 @@
+# src/actions.py
+# Every move a player can make as a small tuple, so bots can list, compare and replay them.
+# legal_actions() only offers what the engine would accept, is_legal() checks a single move without
+# listing the others, apply_action() makes the move.
+
+import itertools
+from .resources import RESOURCES, COSTS
+from .turn import Action, TurnPhase
+
+# action kinds, the first item of every action tuple
+ROLL = "roll"                   # ("roll",)
+END_TURN = "end"                # ("end",)
+SETTLEMENT = "settlement"       # ("settlement", vertex)
+CITY = "city"                   # ("city", vertex)
+ROAD = "road"                   # ("road", road index)
+BUY_DEV = "buy_dev"             # ("buy_dev",)
+PLAY_DEV = "play_dev"           # ("play_dev", card)
+ROBBER = "robber"               # ("robber", tile)
+STEAL = "steal"                 # ("steal", victim)
+ENTANGLE = "entangle"           # ("entangle", (tile_a, tile_b)), (ENTANGLE, None) when no pair is left
+INTERFERE = "interfere"         # ("interfere", tile)
+CHOOSE_RESOURCE = "resource"    # ("resource", name), monopoly / year of plenty
+BANK_TRADE = "bank_trade"       # ("bank_trade", give, get)
+OFFER_TRADE = "offer_trade"     # ("offer_trade", partner, (lumber, brick, wool, grain, ore)), never listed
+ACCEPT_TRADE = "accept_trade"   # ("accept_trade",)
+DECLINE_TRADE = "decline_trade" # ("decline_trade",)
+
+# decisions that are not part of the normal turn flow, a bot has to answer these first
+PENDING_KINDS = (STEAL, ROBBER, ENTANGLE, INTERFERE, CHOOSE_RESOURCE)
+
+DEV_CARDS = ("knight", "point", "interference", "Year of Plenty", "Monopoly", "roadBuilding")
+
+
+def _network(game, player):
+    """vertices touched by the player's roads and buildings"""
+    roads = game.roads_list
+    vertices = set(player.buildables_placed["settlements"])
+    for r in player.buildables_placed["roads"]:
+        vertices.update(roads[r])
+    return vertices
+
+
+def settlement_spots(game):
+    if game.round < 2 or game.devMode:
+        return [v for v in range(len(game.vertex_positions)) if game.can_place_settlement(v)]
+    # after the placement rounds a settlement needs one of the player's roads, so only their ends are checked
+    roads = game.roads_list
+    ends = set()
+    for r in game.players[game.current_player].buildables_placed["roads"]:
+        ends.update(roads[r])
+    return sorted(v for v in ends if game.can_place_settlement(v))
+
+
+def road_spots(game):
+    if game.round < 2:
+        return _setup_road_spots(game)
+    # a new road has to touch the player's network, the edges around it are the only candidates
+    topo = game.topology
+    roads_owner = game.roads_owner
+    spots = set()
+    for v in _network(game, game.players[game.current_player]):
+        for n in topo.vertex_neighbors.get(v, ()):
+            edge = (v, n) if v < n else (n, v)
+            if edge not in roads_owner:
+                spots.add(topo.road_index[edge])
+    return sorted(spots)
+
+
+def city_spots(game, player_idx):
+    return [v for v, (owner, typ) in game.settlements_owner.items() if owner == player_idx and typ == "settlement"]
+
+
+def entangle_pairs(game):
+    """every pair of tiles that may be entangled right now (in board order), O(tiles²) of them"""
+    return list(iter_entangle_pairs(game))
+
+
+def iter_entangle_pairs(game, tile=None):
+    """entangle_pairs() one at a time, only the pairs with `tile` in them if given"""
+    chosen = [idx for idx, _ in game.entangling_pair]
+    n = len(game.tiles)
+    if chosen:
+        if tile is None or tile == chosen[0]:
+            yield from ((chosen[0], t) for t in range(n) if game.can_entangle_tile(t, chosen))
+        elif game.can_entangle_tile(tile, chosen):
+            yield (chosen[0], tile)
+        return
+    if tile is not None:
+        if game.can_entangle_tile(tile):
+            yield from ((min(tile, t), max(tile, t)) for t in range(n) if game.can_entangle_tile(t, (tile,)))
+        return
+    singles = [t for t in range(n) if game.can_entangle_tile(t)]
+    for i, a in enumerate(singles):
+        for b in singles[i+1:]:
+            if game.can_entangle_tile(b, (a,)):
+                yield (a, b)
+
+
+def entangle_tiles(game):
+    """the tiles that can be in an entangled pair right now"""
+    chosen = [idx for idx, _ in game.entangling_pair]
+    if chosen:
+        return chosen if any(game.can_entangle_tile(t, chosen) for t in range(len(game.tiles))) else []
+    singles = [t for t in range(len(game.tiles)) if game.can_entangle_tile(t)]
+    # a pair needs two different resources
+    if len({game.tiles.resource[t] for t in singles}) < 2:
+        return []
+    return singles
+
+
+def _dev_card_actions(game, player):
+    if not game.turn.allows(Action.DEV_CARD):
+        return []
+    actions = []
+    for card in DEV_CARDS:
+        if player.held_dev_cards.get(card, 0) <= 0:
+            continue
+        # an interference card needs a quantum tile to work on
+        if card == "interference" and not game.tiles.quantum_tiles():
+            continue
+        actions.append((PLAY_DEV, card))
+    return actions
+
+
+def legal_actions(game, trades=True, max_pairs=None):
+    """the moves open to game.current_player, [] when the game is not running.
+    trades=False leaves out bank trades (rollouts never use them and the port check is not free).
+    max_pairs: at most this many entangle pairs, there are O(tiles²) of them on a big board"""
+    if not game.runningGame:
+        return []
+    player_idx = game.current_player
+    player = game.players[player_idx]
+    turn = game.turn
+
+    # open questions from the robber, cards and measurements come first
+    if game.possible_victims:
+        return [(STEAL, v) for v in game.possible_victims]
+    if game.moving_robber:
+        return [(ROBBER, t) for t in range(len(game.tiles)) if t != game.robber_idx]
+    if game.entangling:
+        # with every usable tile already quantum the measurement just ends
+        pairs = itertools.islice(iter_entangle_pairs(game), max_pairs)
+        return [(ENTANGLE, pair) for pair in pairs] or [(ENTANGLE, None)]
+    if game.interfering:
+        return [(INTERFERE, t) for t in game.tiles.quantum_tiles()]
+    if game.monopolysing or game.resources_to_collect > 0:
+        return [(CHOOSE_RESOURCE, r) for r in RESOURCES]
+
+    if turn.phase == TurnPhase.TRADE_RESPONSE:
+        actions = [(DECLINE_TRADE,)]
+        if player.resources.can_apply(game.tradingAddedResources):
+            actions.append((ACCEPT_TRADE,))
+        return actions
+
+    if turn.phase == TurnPhase.SETUP:
+        if game.settlements_placed == 0:
+            return [(SETTLEMENT, v) for v in settlement_spots(game)]
+        if game.roads_placed == 0:
+            roads = road_spots(game)
+            if roads:
+                return [(ROAD, r) for r in roads]
+        return [(END_TURN,)]
+
+    if turn.phase == TurnPhase.ROLL:
+        return [(ROLL,)] + _dev_card_actions(game, player)
+
+    actions = []
+    if turn.allows(Action.END_TURN):
+        actions.append((END_TURN,))
+    if game.has_free_roads:
+        actions += [(ROAD, r) for r in road_spots(game)]
+    if turn.allows(Action.BUILD):
+        resources = player.resources
+        if resources.can_afford(COSTS["settlement"]):
+            actions += [(SETTLEMENT, v) for v in settlement_spots(game)]
+        if resources.can_afford(COSTS["city"]):
+            actions += [(CITY, v) for v in city_spots(game, player_idx)]
+        if resources.can_afford(COSTS["road"]) and not game.has_free_roads:
+            actions += [(ROAD, r) for r in road_spots(game)]
+        if resources.can_afford(COSTS["dev"]) and game.possible_cards:
+            actions.append((BUY_DEV,))
+    actions += _dev_card_actions(game, player)
+    if trades and turn.allows(Action.TRADE):
+        resources = player.resources
+        for give in RESOURCES:
+            if resources[give] >= 2 and resources[give] >= game.check_best_trade_ratio(give):
+                actions += [(BANK_TRADE, give, get) for get in RESOURCES if get != give]
+    return actions
+
+
+def _index(value, n):
+    return isinstance(value, int) and not isinstance(value, bool) and 0 <= value < n
+
+
+def _settlement_ok(game, v):
+    if not _index(v, len(game.vertex_positions)) or not game.can_place_settlement(v):
+        return False
+    if game.round < 2 or game.devMode:
+        return True
+    roads = game.roads_list
+    return any(v in roads[r] for r in game.players[game.current_player].buildables_placed["roads"])
+
+
+def _setup_road_spots(game):
+    """road_spots() in the placement rounds: only the edges at the settlement just placed can take a road"""
+    v = game.last_settlement_pos
+    if v is None:
+        return []
+    road_index = game.topology.road_index
+    edges = ((v, n) if v < n else (n, v) for n in game.topology.vertex_neighbors.get(v, ()))
+    return sorted(r for r in (road_index[e] for e in edges) if game.can_place_road_slot(r))
+
+
+def _road_ok(game, r):
+    if not _index(r, len(game.roads_list)):
+        return False
+    if game.round < 2:
+        return game.can_place_road_slot(r)
+    a, b = game.roads_list[r]
+    if (min(a, b), max(a, b)) in game.roads_owner:
+        return False
+    network = _network(game, game.players[game.current_player])
+    return a in network or b in network
+
+
+def _dev_card_ok(game, player, card):
+    if not game.turn.allows(Action.DEV_CARD) or card not in DEV_CARDS or player.held_dev_cards.get(card, 0) <= 0:
+        return False
+    return card != "interference" or len(game.tiles.states) > 0
+
+
+def _entangle_ok(game, pair):
+    if pair is None:
+        return not entangle_tiles(game)
+    n = len(game.tiles)
+    if not isinstance(pair, tuple) or len(pair) != 2 or not _index(pair[0], n) or not _index(pair[1], n):
+        return False
+    a, b = pair
+    chosen = [idx for idx, _ in game.entangling_pair]
+    if chosen:
+        return a == chosen[0] and game.can_entangle_tile(b, chosen)
+    return a < b and game.can_entangle_tile(a) and game.can_entangle_tile(b, (a,))
+
+
+def is_legal(game, action):
+    """
+    action in legal_actions(game), without listing every move: the work depends on the action, not
+    on the size of the board (there are O(tiles²) entangle pairs). Offers (OFFER_TRADE) are never legal
+    here, like in legal_actions().
+    """
+    if not game.runningGame or not isinstance(action, tuple) or not action:
+        return False
+    kind, args = action[0], action[1:]
+    player_idx = game.current_player
+    player = game.players[player_idx]
+    turn = game.turn
+    one = args[0] if len(args) == 1 else None
+
+    if game.possible_victims:
+        return kind == STEAL and len(args) == 1 and one in game.possible_victims
+    if game.moving_robber:
+        return kind == ROBBER and len(args) == 1 and _index(one, len(game.tiles)) and one != game.robber_idx
+    if game.entangling:
+        return kind == ENTANGLE and len(args) == 1 and _entangle_ok(game, one)
+    if game.interfering:
+        return kind == INTERFERE and len(args) == 1 and _index(one, len(game.tiles)) and bool(game.tiles.quantum[one])
+    if game.monopolysing or game.resources_to_collect > 0:
+        return kind == CHOOSE_RESOURCE and len(args) == 1 and one in RESOURCES
+
+    if turn.phase == TurnPhase.TRADE_RESPONSE:
+        if action == (DECLINE_TRADE,):
+            return True
+        return action == (ACCEPT_TRADE,) and player.resources.can_apply(game.tradingAddedResources)
+
+    if turn.phase == TurnPhase.SETUP:
+        if game.settlements_placed == 0:
+            return kind == SETTLEMENT and len(args) == 1 and _settlement_ok(game, one)
+        if game.roads_placed == 0:
+            if kind == ROAD:
+                return len(args) == 1 and _road_ok(game, one)
+            return action == (END_TURN,) and not _setup_road_spots(game)
+        return action == (END_TURN,)
+
+    if turn.phase == TurnPhase.ROLL:
+        if action == (ROLL,):
+            return True
+        return kind == PLAY_DEV and len(args) == 1 and _dev_card_ok(game, player, one)
+
+    if action == (END_TURN,):
+        return turn.allows(Action.END_TURN)
+    if kind == PLAY_DEV:
+        return len(args) == 1 and _dev_card_ok(game, player, one)
+    if kind == BANK_TRADE:
+        if len(args) != 2 or not turn.allows(Action.TRADE):
+            return False
+        give, get = args
+        if give not in RESOURCES or get not in RESOURCES or give == get:
+            return False
+        return player.resources[give] >= 2 and player.resources[give] >= game.check_best_trade_ratio(give)
+    if action == (BUY_DEV,):
+        return turn.allows(Action.BUILD) and player.resources.can_afford(COSTS["dev"]) and bool(game.possible_cards)
+    if len(args) != 1:
+        return False
+    resources = player.resources
+    if kind == ROAD:
+        if game.has_free_roads:
+            return _road_ok(game, one)
+        return turn.allows(Action.BUILD) and resources.can_afford(COSTS["road"]) and _road_ok(game, one)
+    if not turn.allows(Action.BUILD):
+        return False
+    if kind == SETTLEMENT:
+        return resources.can_afford(COSTS["settlement"]) and _settlement_ok(game, one)
+    if kind == CITY:
+        return resources.can_afford(COSTS["city"]) and _index(one, len(game.vertex_positions)) \
+            and game.can_upgrade_to_city(player_idx, one)
+    return False
+
+
+def apply_action(game, action):
+    """makes the move for game.current_player, returns False if the engine refused it"""
+    kind = action[0]
+    if kind == ROLL:
+        if not game.turn.allows(Action.ROLL):
+            return False
+        game.roll_and_distribute(None)
+        return True
+    if kind == END_TURN:
+        if not game.turn.allows(Action.END_TURN):
+            return False
+        game.end_turn()
+        return True
+    if kind == SETTLEMENT:
+        return game.build_settlement(action[1])
+    if kind == CITY:
+        return game.build_city(action[1])
+    if kind == ROAD:
+        return game.build_road(action[1])
+    if kind == BUY_DEV:
+        return game.turn.allows(Action.BUILD) and game.buy_dev_card()
+    if kind == PLAY_DEV:
+        if game.players[game.current_player].held_dev_cards.get(action[1], 0) <= 0:
+            return False
+        if not game.turn.allows(Action.DEV_CARD):
+            return False
+        game.play_dev_card(game.current_player, action[1])
+        return True
+    if kind == ROBBER:
+        return game.place_robber(action[1])
+    if kind == STEAL:
+        if action[1] not in game.possible_victims:
+            return False
+        game.steal_from_victim(game.current_player, action[1])
+        return True
+    if kind == ENTANGLE:
+        if action[1] is None:
+            return game.skip_entangling()
+        a, b = action[1]
+        if a not in [idx for idx, _ in game.entangling_pair] and not game.select_entangle_tile(a):
+            return False
+        return game.select_entangle_tile(b)
+    if kind == INTERFERE:
+        return game.interfere(action[1])
+    if kind == CHOOSE_RESOURCE:
+        return game.choose_resource(action[1])
+    if kind == BANK_TRADE:
+        return game.turn.allows(Action.TRADE) and game.bank_trade(action[1], action[2])
+    if kind == OFFER_TRADE:
+        return game.offer_trade(action[1], list(action[2]))
+    if kind == ACCEPT_TRADE:
+        return game.accept_trade()
+    if kind == DECLINE_TRADE:
+        return game.decline_trade()
+    raise ValueError(f"unknown action {action!r}")
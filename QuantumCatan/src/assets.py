@@ -0,0 +1,120 @@
+# src/assets.py
+# loads images, fonts and sounds once and hands out cached (scaled) copies
+
+import os, threading
+import pygame
+
+# the QuantumCatan folder, so asset paths work no matter what the working directory is
+ASSET_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+FONT_PATH = "fonts/ScienceGothic-Regular.ttf"
+LOGO_PATH = "img/QuatanLogo.png"
+LOGO_SIZE = (600, 400)
+MUSIC_PATH = "music/Quantum_Catan.wav"
+
+# font sizes used by the board, panels and start/game over screens
+COMMON_FONT_SIZES = (8, 10, 12, 14, 16, 18, 19, 20, 24, 48)
+
+
+class AssetManager:
+    """
+    Every image, font and sound is read from disk once. Scaled images are cached per
+    target size, so asking for the same image at the same size every frame is a dict lookup.
+    preload() can fill the caches in a background thread while the window is starting up.
+    """
+    def __init__(self, root=ASSET_DIR):
+        self.root = root
+        self._images = {}   # (path, size or None) -> Surface
+        self._fonts = {}    # (path, size) -> Font
+        self._sounds = {}   # path -> Sound
+        self._music_loaded = None  # path of the track currently loaded in pygame.mixer.music
+        self._lock = threading.Lock()
+        self._preload_thread = None
+
+    def path(self, rel_path):
+        return os.path.join(self.root, rel_path)
+
+    def image(self, rel_path, size=None):
+        """returns the image, scaled to size (w, h) if given. Both the original and the scaled copy are cached"""
+        key = (rel_path, tuple(size) if size is not None else None)
+        img = self._images.get(key)
+        if img is not None:
+            return img
+        with self._lock:
+            original = self._images.get((rel_path, None))
+            if original is None:
+                original = pygame.image.load(self.path(rel_path))
+                self._images[(rel_path, None)] = original
+            img = original if size is None else pygame.transform.scale(original, key[1])
+            self._images[key] = img
+        return img
+
+    def font(self, size=18, rel_path=FONT_PATH):
+        key = (rel_path, size)
+        font = self._fonts.get(key)
+        if font is not None:
+            return font
+        with self._lock:
+            # the font module is started on first use instead of at program start
+            if not pygame.font.get_init():
+                pygame.font.init()
+            try:
+                font = pygame.font.Font(self.path(rel_path), size)
+            except:
+                font = pygame.font.SysFont("Arial", size)
+            self._fonts[key] = font
+        return font
+
+    def sound(self, rel_path):
+        """short sound effects, returns None if the mixer or the file is not available"""
+        if rel_path in self._sounds:
+            return self._sounds[rel_path]
+        with self._lock:
+            try:
+                snd = pygame.mixer.Sound(self.path(rel_path))
+            except (pygame.error, FileNotFoundError):
+                snd = None
+            self._sounds[rel_path] = snd
+        return snd
+
+    def play_music(self, rel_path=MUSIC_PATH, volume=0.2):
+        """
+        Streams the background track. The file is only loaded the first time, later calls
+        (e.g. on every reset) just restart it. A missing track or mixer is not fatal.
+        """
+        try:
+            if self._music_loaded != rel_path:
+                pygame.mixer.music.load(self.path(rel_path))
+                self._music_loaded = rel_path
+            pygame.mixer.music.play()
+            pygame.mixer.music.set_volume(volume)
+        except (pygame.error, FileNotFoundError):
+            self._music_loaded = None
+
+    def preload(self, images=(), fonts=(), sounds=(), background=True):
+        """
+        images: list of (path, size or None), fonts: list of sizes, sounds: list of paths.
+        With background=True the loading happens in a daemon thread, call wait() to join it.
+        """
+        def work():
+            for rel_path, size in images:
+                self.image(rel_path, size)
+            for size in fonts:
+                self.font(size)
+            for rel_path in sounds:
+                self.sound(rel_path)
+
+        if not background:
+            work()
+            return
+        self._preload_thread = threading.Thread(target=work, name="asset-preload", daemon=True)
+        self._preload_thread.start()
+
+    def wait(self):
+        if self._preload_thread is not None:
+            self._preload_thread.join()
+            self._preload_thread = None
+
+
+# shared instance used by the drawing code
+ASSETS = AssetManager()
@@ -0,0 +1,219 @@
+# src/balanced.py
+# Fair boards for tournaments. randomize_tiles shuffles freely, so 6s and 8s can touch and one
+# resource can get all the good numbers. Here a shuffled board is repaired with swaps that only look
+# at the tiles around the swapped pair (topology.tile_neighbors), so a board of any size costs
+# about as much per tile as the standard one.
+#
+#   tiles, sea_tiles, pairs = balanced_board(radius=2, num_pairs=2)
+#   game = new_game(4, 2, board=(tiles, sea_tiles, pairs))       # or new_game(4, 2, balanced=True)
+
+import random
+from .board import RESOURCE_POOL, STANDARD_NUMBERS, scaled_pool, num_deserts, generate_sea_ring
+from .constants import HEX_RADIUS
+from .resources import RESOURCE_NAMES, RESOURCE_CODES, NUM_RESOURCES, DESERT
+from .tiles import TileStore
+from .topology import get_topology
+
+RED_NUMBERS = (6, 8)
+# swaps tried per conflicting tile before the board is shuffled again
+SWAP_TRIES = 20
+MAX_ROUNDS = 50
+MAX_RESTARTS = 20
+
+
+class BoardConstraints:
+    """
+    What makes a board fair:
+
+    no_adjacent_red     6s and 8s never touch each other
+    max_same_neighbors  a tile touches at most this many tiles of its own resource
+    pip_spread          the average dice pips per tile of the best and the worst resource differ by at most this
+    min_pair_distance   entangled tiles are at least this many steps apart (2: never neighbours)
+    max_pair_distance   ... and at most this many, None for anywhere on the board
+    """
+    def __init__(self, no_adjacent_red=True, max_same_neighbors=1, pip_spread=1.0,
+                 min_pair_distance=2, max_pair_distance=None):
+        self.no_adjacent_red = no_adjacent_red
+        self.max_same_neighbors = max_same_neighbors
+        self.pip_spread = pip_spread
+        self.min_pair_distance = min_pair_distance
+        self.max_pair_distance = max_pair_distance
+
+
+DEFAULT_CONSTRAINTS = BoardConstraints()
+
+
+def pips(number):
+    """dots printed under a number, how many of the 36 dice rolls produce it"""
+    return 6 - abs(7 - number) if number else 0
+
+
+PIPS = [pips(n) for n in range(13)]
+
+
+def hex_distance(a, b):
+    dq, dr = a[0] - b[0], a[1] - b[1]
+    return (abs(dq) + abs(dr) + abs(dq + dr)) // 2
+
+
+def _repair(values, keys, movable, neighbors, limit, rng):
+    """
+    Swaps values (and their keys) between movable tiles until no tile touches more than `limit`
+    tiles with its own key; keys below 0 never clash. The clash count of every tile is kept up
+    to date per swap, so trying a swap only touches the two tiles and their neighbours.
+    False if it got stuck.
+    """
+    clashes = [sum(k >= 0 and keys[n] == k for n in neighbors[t]) for t, k in enumerate(keys)]
+    excess = [0]
+
+    def set_key(t, key):
+        old = keys[t]
+        for n in neighbors[t]:
+            other = keys[n]
+            d = (key >= 0 and other == key) - (old >= 0 and other == old)
+            if d > 0:
+                for x in (n, t):
+                    excess[0] += clashes[x] >= limit
+                    clashes[x] += 1
+            elif d < 0:
+                for x in (n, t):
+                    clashes[x] -= 1
+                    excess[0] -= clashes[x] >= limit
+        keys[t] = key
+
+    def swap(t, u):
+        kt, ku = keys[t], keys[u]
+        set_key(t, ku)
+        set_key(u, kt)
+        values[t], values[u] = values[u], values[t]
+
+    excess[0] = sum(max(0, c - limit) for c in clashes)
+    for _ in range(MAX_ROUNDS):
+        if not excess[0]:
+            return True
+        conflicts = [t for t in movable if clashes[t] > limit]
+        rng.shuffle(conflicts)
+        for t in conflicts:
+            if clashes[t] <= limit:
+                continue   # fixed by an earlier swap
+            for _ in range(SWAP_TRIES):
+                u = rng.choice(movable)
+                if keys[u] == keys[t]:
+                    continue
+                before = excess[0]
+                swap(t, u)
+                if excess[0] < before:
+                    break
+                swap(t, u)
+    return not excess[0]
+
+
+def _place_resources(land, neighbors, constraints, rng):
+    resources = [RESOURCE_CODES[r] for r in scaled_pool(RESOURCE_POOL, len(land), rng)]
+    rng.shuffle(resources)
+    values = [DESERT] * len(neighbors)
+    for t, res in zip(land, resources):
+        values[t] = res
+    # deserts never count as a neighbour of the same resource
+    keys = [-1 if res == DESERT else res for res in values]
+    return values if _repair(values, keys, land, neighbors, constraints.max_same_neighbors, rng) else None
+
+
+def _place_numbers(land, neighbors, resources, constraints, rng):
+    numbers = scaled_pool(STANDARD_NUMBERS, len(land), rng)
+    rng.shuffle(numbers)
+    values = [0] * len(neighbors)
+    for t, number in zip(land, numbers):
+        values[t] = number
+    if constraints.no_adjacent_red:
+        # only red numbers clash, with each other
+        keys = [0 if n in RED_NUMBERS else -1 for n in values]
+        if not _repair(values, keys, land, neighbors, 0, rng):
+            return None
+    if constraints.pip_spread is not None and not _balance_pips(values, land, neighbors, resources, constraints, rng):
+        return None
+    return values
+
+
+def _balance_pips(numbers, land, neighbors, resources, constraints, rng):
+    """moves good numbers from the richest to the poorest resource, pip totals are kept up to date per swap"""
+    tiles_of = [[] for _ in range(NUM_RESOURCES)]
+    for t in land:
+        tiles_of[resources[t]].append(t)
+    present = [r for r in range(NUM_RESOURCES) if tiles_of[r]]
+    size = [len(tiles_of[r]) or 1 for r in range(NUM_RESOURCES)]
+    total = [sum(PIPS[numbers[t]] for t in tiles_of[r]) for r in range(NUM_RESOURCES)]
+    red_check = constraints.no_adjacent_red
+    for _ in range(MAX_ROUNDS * SWAP_TRIES):
+        rich = max(present, key=lambda r: total[r] / size[r])
+        poor = min(present, key=lambda r: total[r] / size[r])
+        if total[rich] / size[rich] - total[poor] / size[poor] <= constraints.pip_spread:
+            return True
+        a = rng.choice(tiles_of[rich])
+        b = rng.choice(tiles_of[poor])
+        gain = PIPS[numbers[a]] - PIPS[numbers[b]]
+        if gain <= 0:
+            continue
+        if red_check and (numbers[a] in RED_NUMBERS) != (numbers[b] in RED_NUMBERS):
+            # a red number moves, its new place must not touch another one
+            to, came_from = (b, a) if numbers[a] in RED_NUMBERS else (a, b)
+            if any(n != came_from and numbers[n] in RED_NUMBERS for n in neighbors[to]):
+                continue
+        numbers[a], numbers[b] = numbers[b], numbers[a]
+        total[rich] -= gain
+        total[poor] += gain
+    return False
+
+
+def _pick_pairs(topology, resources, num_pairs, constraints, rng):
+    """entangled pairs under the reset_game rules and the distance limits, fewer if the board runs out"""
+    coords = topology.hex_coords
+    lo = constraints.min_pair_distance or 0
+    hi = constraints.max_pair_distance or len(coords)
+    free = [t for t, res in enumerate(resources) if res != DESERT]
+    rng.shuffle(free)
+    used = set()
+    pairs = []
+
+    def fits(a, b):
+        return b not in used and resources[b] != resources[a] and lo <= hex_distance(coords[a], coords[b]) <= hi
+
+    for a in free:
+        if len(pairs) == num_pairs:
+            break
+        if a in used:
+            continue
+        # a few random guesses are enough on an open board, the full scan only runs when they miss
+        b = next((b for b in (rng.choice(free) for _ in range(SWAP_TRIES)) if fits(a, b)), None)
+        if b is None:
+            partners = [b for b in free if fits(a, b)]
+            if not partners:
+                continue
+            b = rng.choice(partners)
+        used.update((a, b))
+        pairs.append((a, b))
+    return pairs
+
+
+def balanced_board(radius=HEX_RADIUS, num_pairs=2, constraints=DEFAULT_CONSTRAINTS, rng=random):
+    """
+    (TileStore, sea_tiles, pairs) meeting the constraints, as GameEngine.reset_game(board=...) takes it.
+    ValueError if no such board was found, the constraints are too strict for this radius.
+    rng: a random.Random (or the random module) every choice is drawn from.
+    """
+    topology = get_topology(radius)
+    neighbors = topology.tile_neighbors
+    count = len(topology.hex_coords)
+    for _ in range(MAX_RESTARTS):
+        deserts = set(rng.sample(range(count), num_deserts(count)))
+        land = [t for t in range(count) if t not in deserts]
+        resources = _place_resources(land, neighbors, constraints, rng)
+        if resources is None:
+            continue
+        numbers = _place_numbers(land, neighbors, resources, constraints, rng)
+        if numbers is None:
+            continue
+        tiles = TileStore(topology.hex_coords, [RESOURCE_NAMES[r] for r in resources], [n or None for n in numbers], rng)
+        pairs = _pick_pairs(topology, resources, num_pairs, constraints, rng)
+        return tiles, generate_sea_ring(topology.sea_coords, rng), pairs
+    raise ValueError("no board found that meets the constraints")
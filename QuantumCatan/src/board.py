@@ -6,6 +6,7 @@ import math
 from collections import defaultdict
 from .util import hex_to_pixel, polygon_corners
 from .constants import HEX_RADIUS, SEA_RING, SQRT3
+from .tiles import TileStore
 
 def generate_hex_coords(radius=HEX_RADIUS):
     coords = []
@@ -41,26 +42,46 @@ STANDARD_NUMBERS = [2,3,3,4,4,5,5,6,6,8,8,9,9,10,10,11,11,12]
 
 RESOURCE_POOL = ["lumber"]*4 + ["brick"]*3 + ["wool"]*4 + ["grain"]*4 + ["ore"]*3
 
-def randomize_tiles():
-    coords = list(HEX_COORDS)
-    resources = RESOURCE_POOL.copy()
-    random.shuffle(resources)
-    numbers = STANDARD_NUMBERS.copy()
-    random.shuffle(numbers)
-    desert_pos = random.randrange(len(coords))
-    tiles = []
-    
-
+PORT_POOL = ["port_brick","port_lumber","port_wool","port_grain","port_ore"] + ["port_any"]*4
+
+# the standard board: 19 tiles, one of them desert
+STANDARD_TILES = len(STANDARD_NUMBERS) + 1
+
+def scaled_pool(pool, n, rng=random):
+    """n items in the proportions of pool: whole copies, the rest a random sample of it"""
+    copies, rest = divmod(n, len(pool))
+    return pool * copies + (rng.sample(pool, rest) if rest else [])
+
+def num_deserts(num_tiles):
+    return max(1, round(num_tiles / STANDARD_TILES))
+
+def randomize_tiles(coords=HEX_COORDS, rng=random):
+    """
+    resources and numbers for any board size, the standard mix repeated (exactly the standard pools at radius 2).
+    rng: a random.Random (or the random module) every choice is drawn from
+    """
+    coords = list(coords)
+    deserts = num_deserts(len(coords))
+    resources = scaled_pool(RESOURCE_POOL, len(coords) - deserts, rng)
+    rng.shuffle(resources)
+    numbers = scaled_pool(STANDARD_NUMBERS, len(coords) - deserts, rng)
+    rng.shuffle(numbers)
+    if deserts == 1:
+        desert_pos = {rng.randrange(len(coords))}
+    else:
+        desert_pos = set(rng.sample(range(len(coords)), deserts))
+    tile_resources = []
+    tile_numbers = []
     
     for i, coord in enumerate(coords):
-        if i == desert_pos:
-            tiles.append({"coord": coord, "resource": "desert", "number": None, "quantum": False, "ent_group": None})
+        if i in desert_pos:
+            tile_resources.append("desert")
+            tile_numbers.append(None)
         else:
-            res = resources.pop()
-            num = numbers.pop()
-            tiles.append({"coord": coord, "resource": res, "number": num, "quantum": False, "ent_group": None})
+            tile_resources.append(resources.pop())
+            tile_numbers.append(numbers.pop())
     
-    return tiles
+    return TileStore(tuple(coords), tile_resources, tile_numbers, rng)
     
     
     
@@ -114,14 +135,15 @@ def randomize_tiles():
     """""
 
 
-def generate_sea_ring():
-    coords = list(SEA_COORDS)
+def generate_sea_ring(coords=SEA_COORDS, rng=random):
+    coords = list(coords)
     n = len(coords)
     pattern = ["port" if i % 2 == 0 else "sea" for i in range(n)]
-    rotation = random.randint(0, n - 1)
+    rotation = rng.randint(0, n - 1)
     pattern = pattern[rotation:] + pattern[:rotation]
-    ports = ["port_brick","port_lumber","port_wool","port_grain","port_ore"] + ["port_any"]*4
-    random.shuffle(ports)
+    # every other sea tile is a port, the standard mix scaled to the length of the ring
+    ports = scaled_pool(PORT_POOL, pattern.count("port"), rng)
+    rng.shuffle(ports)
     sea_tiles = []
     port_i = 0
     for idx,coord in enumerate(coords):
@@ -132,19 +154,19 @@ def generate_sea_ring():
             sea_tiles.append({"coord": coord, "port": "sea"})
     return sea_tiles
 
-def compute_centers_and_polys(origin, hex_size=50):
+def compute_centers_and_polys(origin, hex_size=50, coords=HEX_COORDS):
     centers = []
     polys = []
-    for q,r in HEX_COORDS:
+    for q,r in coords:
         c = hex_to_pixel(q,r,size=hex_size,origin=origin)
         centers.append(c)
         polys.append(polygon_corners(c,size=hex_size))
     return centers, polys
 
-def compute_sea_polys(origin, hex_size=50):
+def compute_sea_polys(origin, hex_size=50, coords=SEA_COORDS):
     centers = []
     polys = []
-    for q,r in SEA_COORDS:
+    for q,r in coords:
         c = hex_to_pixel(q,r,size=hex_size,origin=origin)
         centers.append(c)
         polys.append(polygon_corners(c,size=hex_size))
@@ -0,0 +1,164 @@
+# src/boardgen.py
+# Many random boards at once as NumPy arrays, for simulations and layout studies.
+# Follows the same rules as board.randomize_tiles / generate_sea_ring and the entangle loop
+# in GameEngine.reset_game, but every step works on all boards of a batch together.
+#
+#   batch = generate_boards(100_000, num_entangled_pairs=2, seed=1)
+#   batch.resource[i], batch.number[i], batch.pairs[i]        # arrays of board i
+#   game = new_game(4, 2, board=batch.board(i))                 # play on one of them
+
+import numpy as np
+from .board import RESOURCE_POOL, STANDARD_NUMBERS, PORT_POOL, num_deserts
+from .constants import HEX_RADIUS
+from .resources import RESOURCE_NAMES, RESOURCE_CODES, NUM_RESOURCES, DESERT
+from .tiles import TileStore
+from .topology import get_topology
+
+# port codes in BoardBatch.ports, SEA (-1) for sea tiles without a port
+PORT_NAMES = tuple(sorted(set(PORT_POOL)))
+SEA = -1
+NO_PAIR = -1
+DEFAULT_CHUNK = 100_000
+
+
+class BoardBatch:
+    """
+    n boards of one radius, one row per board:
+
+    resource    (n, tiles) int8   resource codes, DESERT for deserts (the tiles' classical resource,
+                                  entangled tiles keep the resource they had before entangling)
+    number      (n, tiles) int8   dice numbers, 0 on deserts
+    deserts     (n, k)     int16  desert tile indices
+    ports       (n, sea)   int8   index into PORT_NAMES, SEA where the sea tile has no port
+    pairs       (n, p, 2)  int16  entangled tile pairs, always as many as were asked for
+    """
+    def __init__(self, radius, resource, number, deserts, ports, pairs):
+        self.radius = radius
+        self.resource = resource
+        self.number = number
+        self.deserts = deserts
+        self.ports = ports
+        self.pairs = pairs
+
+    def __len__(self):
+        return len(self.resource)
+
+    def board(self, i):
+        """board i as (TileStore, sea_tiles, pairs), what GameEngine.start_game(board=...) takes"""
+        topology = get_topology(self.radius)
+        tiles = TileStore(topology.hex_coords, [RESOURCE_NAMES[c] for c in self.resource[i].tolist()],
+                          [n or None for n in self.number[i].tolist()])
+        sea_tiles = [{"coord": coord, "port": "sea" if p == SEA else PORT_NAMES[p]}
+                     for coord, p in zip(topology.sea_coords, self.ports[i].tolist())]
+        pairs = [tuple(pair) for pair in self.pairs[i].tolist() if pair[0] != NO_PAIR]
+        return tiles, sea_tiles, pairs
+
+
+def _shuffled_rows(rng, n, pool):
+    """n independent shuffles of pool, one per row"""
+    pool = np.asarray(pool)
+    order = rng.random((n, len(pool)), dtype=np.float32).argsort(axis=1)
+    return pool[order]
+
+
+def _scaled_pools(rng, n, pool, size):
+    """like board.scaled_pool, whole copies plus a random sample of the rest, shuffled per row"""
+    copies, rest = divmod(size, len(pool))
+    rows = np.tile(np.asarray(pool), (n, copies))
+    if rest:
+        rows = np.concatenate([rows, _shuffled_rows(rng, n, pool)[:, :rest]], axis=1)
+    order = rng.random(rows.shape, dtype=np.float32).argsort(axis=1)
+    return np.take_along_axis(rows, order, axis=1)
+
+
+def _pick(rng, allowed):
+    """one random True column per row of `allowed`, and whether the row had any"""
+    keys = rng.random(allowed.shape, dtype=np.float32) + 1.0
+    keys[~allowed] = 0.0
+    return keys.argmax(axis=1), allowed.any(axis=1)
+
+
+def _entangle_pairs(rng, resource, num_pairs):
+    """
+    The reset_game rules for all boards at once: both tiles of a pair are classical, not a
+    desert, not already entangled, and have different resources.
+
+    Pairing greedily can strand tiles: with 9 pairs on a radius 2 board every tile is needed, and
+    two early pairs between the rarer resources leave the last tiles of the most common one with
+    nothing to pair with. A board of m free tiles whose largest resource has M of them holds
+    min(m // 2, m - M) pairs, so every step only takes resource combinations that leave enough
+    room for the pairs still to come and the requested number is always reached.
+    """
+    n, t = resource.shape
+    rows = np.arange(n)
+    pairs = np.full((n, num_pairs, 2), NO_PAIR, dtype=np.int16)
+    free = resource != DESERT
+    code = np.minimum(resource, NUM_RESOURCES - 1).astype(np.intp)
+    onehot = resource[:, :, None] == np.arange(NUM_RESOURCES)
+    counts = (onehot & free[:, :, None]).sum(axis=1)    # free tiles per resource
+    room = np.minimum(counts.sum(axis=1) // 2, counts.sum(axis=1) - counts.max(axis=1))
+    if num_pairs and room.min() < num_pairs:
+        raise ValueError(f"a board only has room for {room.min()} entangled pairs, not {num_pairs}")
+    # change[r, s] takes a tile of resource r and one of resource s
+    eye = np.eye(NUM_RESOURCES, dtype=np.int64)
+    change = eye[:, None, :] + eye[None, :, :]
+    different = ~np.eye(NUM_RESOURCES, dtype=bool)
+    for p in range(num_pairs):
+        left = num_pairs - p - 1
+        # any two different resources will do while there is room even if the largest one keeps all its tiles
+        present = counts > 0
+        ok = different & present[:, :, None] & present[:, None, :]
+        m = counts.sum(axis=1) - 2
+        tight = np.flatnonzero(left > np.minimum(m // 2, m - counts.max(axis=1)))
+        if len(tight):
+            after = counts[tight, None, None, :] - change    # (boards, r, s, resource)
+            ok[tight] &= left <= m[tight, None, None] - after.max(axis=3)
+        a, _ = _pick(rng, free & ok.any(axis=2)[rows[:, None], code])
+        res_a = code[rows, a]
+        b, _ = _pick(rng, free & ok[rows, res_a][rows[:, None], code])
+        pairs[:, p, 0] = a
+        pairs[:, p, 1] = b
+        free[rows, a] = False
+        free[rows, b] = False
+        counts[rows, res_a] -= 1
+        counts[rows, code[rows, b]] -= 1
+    return pairs
+
+
+def generate_boards(n, radius=HEX_RADIUS, num_entangled_pairs=2, seed=None):
+    """n random boards as a BoardBatch, see iter_boards() for more than fit in memory at once"""
+    rng = np.random.default_rng(seed)
+    topology = get_topology(radius)
+    t = len(topology.hex_coords)
+    k = num_deserts(t)
+
+    # deserts first, the shuffled pools fill the remaining tiles in board order
+    deserts = np.sort(rng.random((n, t), dtype=np.float32).argsort(axis=1)[:, :k], axis=1).astype(np.int16)
+    is_desert = np.zeros((n, t), dtype=bool)
+    np.put_along_axis(is_desert, deserts.astype(np.intp), True, axis=1)
+    codes = [RESOURCE_CODES[r] for r in RESOURCE_POOL]
+    resource = np.full((n, t), DESERT, dtype=np.int8)
+    resource[~is_desert] = _scaled_pools(rng, n, codes, t - k).ravel()
+    number = np.zeros((n, t), dtype=np.int8)
+    number[~is_desert] = _scaled_pools(rng, n, STANDARD_NUMBERS, t - k).ravel()
+
+    # every other sea tile is a port, the ring pattern is rotated per board
+    s = len(topology.sea_coords)
+    rotation = rng.integers(0, s, size=n)
+    is_port = (np.arange(s)[None, :] + rotation[:, None]) % s % 2 == 0
+    port_codes = [PORT_NAMES.index(p) for p in PORT_POOL]
+    ports = np.full((n, s), SEA, dtype=np.int8)
+    ports[is_port] = _scaled_pools(rng, n, port_codes, int(is_port[0].sum())).ravel()
+
+    pairs = _entangle_pairs(rng, resource, num_entangled_pairs)
+    return BoardBatch(radius, resource, number, deserts, ports, pairs)
+
+
+def iter_boards(total, radius=HEX_RADIUS, num_entangled_pairs=2, seed=None, chunk=DEFAULT_CHUNK):
+    """BoardBatches of at most `chunk` boards until `total` boards were made"""
+    seeds = np.random.SeedSequence(seed)
+    done = 0
+    for child in seeds.spawn((total + chunk - 1) // chunk):
+        size = min(chunk, total - done)
+        yield generate_boards(size, radius, num_entangled_pairs, child)
+        done += size
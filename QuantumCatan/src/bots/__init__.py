@@ -0,0 +1,20 @@
+# src/bots/__init__.py
+# computer players, make_bot("mcts") / make_bot("heuristic") / make_bot("random")
+
+from .base import Bot, RandomBot, new_game, play_game
+from .heuristic import HeuristicBot
+from .mcts import MCTSBot
+
+BOTS = {
+    "random": RandomBot,
+    "heuristic": HeuristicBot,
+    "mcts": MCTSBot,
+}
+
+
+def make_bot(name, **options):
+    try:
+        cls = BOTS[name]
+    except KeyError:
+        raise ValueError(f"unknown bot {name!r}, choose from {', '.join(BOTS)}") from None
+    return cls(**options)
@@ -0,0 +1,74 @@
+# src/bots/base.py
+# What every bot implements, plus the loop that plays a whole game with bots in every seat
+
+import abc, random
+from ..engine import GameEngine
+from ..constants import HEX_RADIUS
+from ..balanced import balanced_board
+from ..actions import legal_actions, apply_action, END_TURN
+
+# games that have not been won after this many rounds are stopped (e.g. everyone blocked)
+DEFAULT_MAX_ROUNDS = 200
+
+
+def frozen_clock():
+    """simulated games do not need wall clock time for their messages"""
+    return 0
+
+
+class Bot(abc.ABC):
+    """picks one of the legal actions for the player that has to move"""
+    name = "bot"
+
+    @abc.abstractmethod
+    def choose(self, game, actions):
+        """one of `actions` (legal_actions(game), never empty) for game.current_player"""
+
+    def close(self):
+        """frees workers and other resources, the bot is not used afterwards"""
+        pass
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class RandomBot(Bot):
+    name = "random"
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def choose(self, game, actions):
+        return self.rng.choice(actions)
+
+
+def new_game(num_players=4, num_entangled_pairs=2, seed=None, board_radius=HEX_RADIUS, board=None, balanced=False):
+    """
+    a started, pygame-free game for simulations, optionally on a given board (see boardgen)
+    or on a balanced one (see balanced.py)
+    """
+    # the game's own generator, seeding the random module would change every other stream in the process
+    rng = random.Random(seed)
+    if balanced and board is None:
+        board = balanced_board(board_radius, num_entangled_pairs, rng=rng)
+    game = GameEngine(num_players, clock=frozen_clock, board_radius=board_radius, rng=rng)
+    game.num_entangled_pairs = num_entangled_pairs
+    game.start_game(board)
+    return game
+
+
+def play_game(game, bots, max_rounds=DEFAULT_MAX_ROUNDS):
+    """
+    Lets bots[i] play seat i until someone wins or max_rounds is reached.
+    Returns the winner's seat, or None when the game was stopped.
+    """
+    while game.runningGame and game.round < max_rounds:
+        actions = legal_actions(game)
+        if not actions:
+            break
+        action = actions[0] if len(actions) == 1 else bots[game.current_player].choose(game, actions)
+        if not apply_action(game, action):
+            # the engine refused (e.g. a port ratio changed), ending the turn always moves on
+            if (END_TURN,) not in actions or not apply_action(game, (END_TURN,)):
+                raise RuntimeError(f"bot {bots[game.current_player]!r} is stuck on {action!r}")
+    return game.scores.winner
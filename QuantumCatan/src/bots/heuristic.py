@@ -0,0 +1,154 @@
+# src/bots/heuristic.py
+# A rule based bot: no lookahead, every decision is a couple of pip counts.
+# Used as the baseline opponent for balance sweeps and as the fast player in simulations.
+
+import random
+from .base import Bot
+from ..tiles import PIPS
+from ..resources import RESOURCES, COSTS
+from ..actions import (ROLL, END_TURN, SETTLEMENT, CITY, ROAD, BUY_DEV, PLAY_DEV, ROBBER, STEAL, ENTANGLE,
+                       INTERFERE, CHOOSE_RESOURCE, BANK_TRADE, ACCEPT_TRADE, DECLINE_TRADE)
+
+# order in which the bot spends its resources in the main phase
+BUILD_ORDER = (CITY, SETTLEMENT, BUY_DEV, ROAD)
+
+
+class HeuristicBot(Bot):
+    """
+    Placements by the pips of the surrounding tiles, builds greedily (cities first), the robber goes
+    where the opponents produce the most, entanglement picks the pair of tiles the bot itself collects from.
+    """
+    name = "heuristic"
+
+    def __init__(self, seed=None, road_chance=0.5):
+        self.rng = random.Random(seed)
+        # how often a road is bought when nothing better is affordable
+        self.road_chance = road_chance
+
+    # -- scoring helpers -------------------------------------------
+    def vertex_pips(self, game, v):
+        number = game.tiles.number
+        return sum(PIPS.get(number[t], 0) for t in game.topology.vertex_tiles[v])
+
+    def production(self, game, player_idx):
+        """
+        Two lists indexed by tile: the pips player_idx collects from each tile and the pips
+        everyone else collects (a city counts twice). One pass over the buildings.
+        """
+        number = game.tiles.number
+        vertex_tiles = game.topology.vertex_tiles
+        own = [0] * len(number)
+        others = [0] * len(number)
+        for v, (owner, typ) in game.settlements_owner.items():
+            weight = 2 if typ == "city" else 1
+            side = own if owner == player_idx else others
+            for t in vertex_tiles[v]:
+                side[t] += weight * PIPS.get(number[t], 0)
+        return own, others
+
+    def road_value(self, game, road_idx):
+        """how good the best free settlement spot at the end of this road is"""
+        best = 0
+        for v in game.roads_list[road_idx]:
+            if game.can_place_settlement(v):
+                best = max(best, self.vertex_pips(game, v))
+        return best
+
+    # -- decisions -------------------------------------------------
+    def choose(self, game, actions):
+        by_kind = {}
+        for a in actions:
+            by_kind.setdefault(a[0], []).append(a)
+        me = game.current_player
+
+        # questions that have to be answered first
+        if STEAL in by_kind:
+            return max(by_kind[STEAL], key=lambda a: game.players[a[1]].resources.total())
+        if ROBBER in by_kind:
+            own, others = self.production(game, me)
+            return max(by_kind[ROBBER], key=lambda a: others[a[1]] - own[a[1]])
+        if ENTANGLE in by_kind:
+            # tokens from both tiles go to whoever builds on them, so prefer our own tiles and avoid theirs
+            own, others = self.production(game, me)
+            return max(by_kind[ENTANGLE], key=lambda a: sum(3 * own[t] - others[t] for t in a[1]) if a[1] else 0)
+        if INTERFERE in by_kind:
+            own, _ = self.production(game, me)
+            return max(by_kind[INTERFERE], key=lambda a: own[a[1]])
+        if CHOOSE_RESOURCE in by_kind:
+            return (CHOOSE_RESOURCE, self._wanted_resource(game, me))
+        if ACCEPT_TRADE in by_kind or DECLINE_TRADE in by_kind:
+            return self._answer_trade(game, by_kind)
+
+        if ROLL in by_kind:
+            # a knight first when the robber sits on our own production
+            if (PLAY_DEV, "knight") in actions and game.robber_idx is not None \
+                    and self.production(game, me)[0][game.robber_idx] > 0:
+                return (PLAY_DEV, "knight")
+            return (ROLL,)
+
+        if (PLAY_DEV, "point") in actions:
+            return (PLAY_DEV, "point")
+        for kind in BUILD_ORDER:
+            options = by_kind.get(kind)
+            if not options:
+                continue
+            if kind == CITY or kind == SETTLEMENT:
+                if game.round < 2:
+                    # initial placement, best spot by pips
+                    return max(options, key=lambda a: self.vertex_pips(game, a[1]) + self.rng.random())
+                return max(options, key=lambda a: self.vertex_pips(game, a[1]))
+            if kind == BUY_DEV:
+                return options[0]
+            if kind == ROAD:
+                free = game.round < 2 or game.has_free_roads
+                if free or self.rng.random() < self.road_chance:
+                    return max(options, key=lambda a: self.road_value(game, a[1]) + self.rng.random())
+        for card in ("roadBuilding", "Year of Plenty", "Monopoly", "knight"):
+            if (PLAY_DEV, card) in actions:
+                return (PLAY_DEV, card)
+        if BANK_TRADE in by_kind:
+            trade = self._bank_trade(game, me, by_kind[BANK_TRADE])
+            if trade is not None:
+                return trade
+        if (END_TURN,) in actions:
+            return (END_TURN,)
+        return self.rng.choice(actions)
+
+    def _target_cost(self, game, me):
+        """what the bot is saving for: a city if it has a settlement to upgrade, otherwise a settlement"""
+        for v, (owner, typ) in game.settlements_owner.items():
+            if owner == me and typ == "settlement":
+                return COSTS["city"]
+        return COSTS["settlement"]
+
+    def _wanted_resource(self, game, me):
+        if game.monopolysing:
+            # the resource the others hold the most of
+            return max(RESOURCES, key=lambda r: sum(p.resources[r] for i, p in enumerate(game.players) if i != me))
+        have = game.players[me].resources.counts
+        cost = self._target_cost(game, me)
+        return RESOURCES[max(range(len(RESOURCES)), key=lambda i: cost[i] - have[i])]
+
+    def _bank_trade(self, game, me, trades):
+        """trades a surplus resource for the one missing most for the next build"""
+        have = game.players[me].resources.counts
+        cost = self._target_cost(game, me)
+        missing = [i for i in range(len(RESOURCES)) if cost[i] > have[i]]
+        if not missing:
+            return None
+        want = RESOURCES[max(missing, key=lambda i: cost[i] - have[i])]
+        best = None
+        for trade in trades:
+            give_idx = RESOURCES.index(trade[1])
+            if trade[2] != want or have[give_idx] - cost[give_idx] < 2:
+                continue
+            if best is None or have[give_idx] > have[RESOURCES.index(best[1])]:
+                best = trade
+        return best
+
+    def _answer_trade(self, game, by_kind):
+        offer = game.tradingAddedResources
+        # the offer is what current_player gets, accept when it is not fewer cards than it gives
+        if ACCEPT_TRADE in by_kind and sum(offer.counts) >= 0:
+            return (ACCEPT_TRADE,)
+        return (DECLINE_TRADE,)
@@ -0,0 +1,168 @@
+# src/bots/mcts.py
+# Monte Carlo tree search over the engine's actions, with rollouts spread over a process pool
+
+import math, os, random, time
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from .base import Bot
+from ..actions import legal_actions, apply_action, ROLL, END_TURN, SETTLEMENT, CITY, ROAD, BUY_DEV, PLAY_DEV
+
+DEFAULT_TIME_BUDGET = 1.0   # seconds per move
+DEFAULT_EXPLORATION = 1.4
+DEFAULT_ROLLOUT_ROUNDS = 30  # a rollout stops this many rounds after the searched position
+
+# how much the rollout policy likes each kind of action, everything else is 1
+ROLLOUT_WEIGHTS = {CITY: 40, SETTLEMENT: 30, BUY_DEV: 6, ROAD: 4, PLAY_DEV: 4, ROLL: 1, END_TURN: 1}
+
+
+class Node:
+    """
+    One action in the tree. The tree is open loop: dice, cards and collapses are sampled again in
+    every iteration, so a node stands for an action sequence and not for one exact position.
+    """
+    __slots__ = ("parent", "action", "player", "children", "visits", "value")
+
+    def __init__(self, parent=None, action=None, player=None):
+        self.parent = parent
+        self.action = action
+        self.player = player    # seat that chose the action, the value is from its point of view
+        self.children = {}
+        self.visits = 0
+        self.value = 0.0
+
+    def ucb(self, log_parent_visits, exploration):
+        return self.value / self.visits + exploration * math.sqrt(log_parent_visits / self.visits)
+
+
+def rollout_action(actions, rng):
+    """cheap default policy: builds when it can, otherwise mostly moves the game along"""
+    return rng.choices(actions, [ROLLOUT_WEIGHTS.get(a[0], 1) for a in actions])[0]
+
+
+def rewards(game):
+    """1 for the winner, otherwise the share of the points needed to win"""
+    if game.scores.winner is not None:
+        return [1.0 if i == game.scores.winner else 0.0 for i in range(game.num_players)]
+    target = game.points_to_win
+    return [min(p.score / target, 1.0) * 0.5 for p in game.players]
+
+
+def rollout(game, rng, max_rounds):
+    last_round = game.round + max_rounds
+    while game.runningGame and game.round < last_round:
+        actions = legal_actions(game, trades=False)
+        if not actions:
+            break
+        if not apply_action(game, actions[0] if len(actions) == 1 else rollout_action(actions, rng)):
+            if not apply_action(game, (END_TURN,)):
+                break
+    return rewards(game)
+
+
+def search(game, time_budget, exploration=DEFAULT_EXPLORATION, rollout_rounds=DEFAULT_ROLLOUT_ROUNDS, seed=None):
+    """
+    Runs MCTS from `game` (left untouched) for time_budget seconds.
+    Returns {action: (visits, total value)} for the actions at the root.
+    This is also what the worker processes run, so it must stay a module level function.
+    """
+    return _search(game, time_budget, exploration, rollout_rounds, random.Random(seed))
+
+
+def _search(game, time_budget, exploration, rollout_rounds, rng):
+    deadline = time.perf_counter() + time_budget
+    root = Node()
+    iterations = 0
+    while iterations == 0 or time.perf_counter() < deadline:
+        iterations += 1
+        g = game.clone()
+        # dice, cards and collapses come from the search's stream, a different one every iteration
+        g.rng = random.Random(rng.getrandbits(64))
+        g.tiles.states.rng = np.random.default_rng(rng.getrandbits(64))
+        node = root
+        # selection and expansion
+        while g.runningGame:
+            actions = legal_actions(g)
+            if not actions:
+                break
+            if len(actions) == 1:
+                # forced moves are played without a node
+                if not apply_action(g, actions[0]):
+                    break
+                continue
+            mover = g.current_player
+            untried = [a for a in actions if a not in node.children]
+            if untried:
+                action = rng.choice(untried)
+                child = Node(node, action, mover)
+                node.children[action] = child
+                node = child
+                apply_action(g, action)
+                break
+            log_visits = math.log(node.visits)
+            node = max((node.children[a] for a in actions), key=lambda c: c.ucb(log_visits, exploration))
+            apply_action(g, node.action)
+        result = rollout(g, rng, rollout_rounds)
+        # backpropagation
+        while node is not None:
+            node.visits += 1
+            if node.player is not None:
+                node.value += result[node.player]
+            node = node.parent
+    return {a: (c.visits, c.value) for a, c in root.children.items()}
+
+
+class MCTSBot(Bot):
+    """
+    Root parallel MCTS: every worker searches its own tree from the current position for the
+    whole time budget and the root statistics are summed. More cores means more rollouts per move.
+
+    workers=1 searches in this process, otherwise a process pool is started on first use.
+    """
+    name = "mcts"
+
+    def __init__(self, time_budget=DEFAULT_TIME_BUDGET, workers=None, exploration=DEFAULT_EXPLORATION,
+                 rollout_rounds=DEFAULT_ROLLOUT_ROUNDS, seed=None):
+        self.time_budget = time_budget
+        self.workers = workers or os.cpu_count() or 1
+        self.exploration = exploration
+        self.rollout_rounds = rollout_rounds
+        self.rng = random.Random(seed)
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            # spawn so the workers do not inherit pygame or the asset loading thread
+            ctx = multiprocessing.get_context("spawn")
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+        return self._pool
+
+    def choose(self, game, actions):
+        if len(actions) == 1:
+            return actions[0]
+        root = game.clone()
+        seeds = [self.rng.getrandbits(32) for _ in range(self.workers)]
+        if self.workers == 1:
+            results = [search(root, self.time_budget, self.exploration, self.rollout_rounds, seeds[0])]
+        else:
+            pool = self._get_pool()
+            futures = [pool.submit(search, root, self.time_budget, self.exploration, self.rollout_rounds, s)
+                       for s in seeds]
+            results = [f.result() for f in futures]
+
+        visits = {}
+        for stats in results:
+            for action, (n, _) in stats.items():
+                visits[action] = visits.get(action, 0) + n
+        legal = [a for a in actions if a in visits]
+        if not legal:
+            return self.rng.choice(actions)
+        return max(legal, key=lambda a: visits[a])
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def __repr__(self):
+        return f"MCTSBot(time_budget={self.time_budget}, workers={self.workers})"
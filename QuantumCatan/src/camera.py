@@ -0,0 +1,91 @@
+# src/camera.py
+# Zoom and pan of the board view. The topology keeps the board in its own space (around (0,0),
+# BOARD_HEX_SIZE), the camera says where that lands on screen:
+#
+#   screen = viewport centre + pan + board * scale
+#
+# At zoom 1 without pan the board fits the window (fit()), which is what the game showed before.
+
+import math
+from .constants import SQRT3
+from .topology import BOARD_HEX_SIZE
+
+MIN_HEX_SIZE = 4        # zoom limits, in pixels per hex
+MAX_HEX_SIZE = 160
+ZOOM_STEP = 1.15        # per mouse wheel notch
+# below this hex size tiles are drawn without their number discs
+LOD_HEX_SIZE = 18
+
+
+class Camera:
+    def __init__(self):
+        self.fit_size = BOARD_HEX_SIZE     # hex size at which the board fits the viewport
+        self.zoom = 1.0
+        self.pan = (0.0, 0.0)
+        self.centre = (0, 0)
+
+    @property
+    def hex_size(self):
+        size = self.fit_size * self.zoom
+        # whole pixels while not zoomed, so the fitted board looks exactly as it always did
+        return size if self.zoom != 1.0 else int(size)
+
+    @property
+    def scale(self):
+        return self.hex_size / BOARD_HEX_SIZE
+
+    @property
+    def origin(self):
+        """screen position of the board centre"""
+        return (self.centre[0] + self.pan[0], self.centre[1] + self.pan[1])
+
+    def key(self):
+        """changes whenever the screen geometry has to be recomputed"""
+        return (self.centre, self.fit_size, self.zoom, self.pan)
+
+    def fit(self, centre, fit_size):
+        """the view the window shows by default, zoom and pan are kept"""
+        self.centre = centre
+        self.fit_size = fit_size
+
+    def reset(self):
+        """back to the whole board in the window"""
+        self.zoom = 1.0
+        self.pan = (0.0, 0.0)
+
+    def pan_by(self, dx, dy):
+        self.pan = (self.pan[0] + dx, self.pan[1] + dy)
+
+    def zoom_at(self, factor, pos):
+        """zooms by factor, the board point under pos stays where it is"""
+        zoom = min(max(self.zoom * factor, MIN_HEX_SIZE / self.fit_size), MAX_HEX_SIZE / self.fit_size)
+        if abs(zoom - 1.0) < 1e-3:
+            zoom = 1.0
+        f = zoom / self.zoom
+        ox, oy = self.origin
+        # keep (pos - origin) / scale fixed
+        new_origin = (pos[0] - (pos[0] - ox) * f, pos[1] - (pos[1] - oy) * f)
+        self.zoom = zoom
+        self.pan = (new_origin[0] - self.centre[0], new_origin[1] - self.centre[1])
+
+    def to_screen(self, x, y):
+        ox, oy = self.origin
+        scale = self.scale
+        return (ox + x * scale, oy + y * scale)
+
+    def visible_coords(self, width, height, radius, margin=1.0):
+        """
+        Axial (q, r) of the hexes within `radius` of the centre that show in a width x height view.
+        Walks only the rows and columns on screen, so the cost follows what is visible.
+        """
+        size = self.hex_size
+        ox, oy = self.origin
+        pad = margin * size
+        r_lo = max(-radius, math.ceil((-pad - oy) / (1.5 * size)))
+        r_hi = min(radius, math.floor((height + pad - oy) / (1.5 * size)))
+        for r in range(r_lo, r_hi + 1):
+            # x = ox + size*sqrt3*(q + r/2), and the board keeps |q|, |r|, |q + r| <= radius
+            q_lo = max(-radius, -radius - r, math.ceil((-pad - ox) / (SQRT3 * size) - r / 2))
+            q_hi = min(radius, radius - r, math.floor((width + pad - ox) / (SQRT3 * size) - r / 2))
+            for q in range(q_lo, q_hi + 1):
+                yield (q, r)
@@ -1,5 +1,7 @@
 # src/constants.py
-import pygame
+# plain values only, importing this module must not pull in pygame
+import colorsys
+
 WIN_W = 1100
 WIN_H = 750
 
@@ -35,6 +37,15 @@ ENT_NUMBER_COLOURS = [
     
 ]
 
+def ent_group_colour(group):
+    """colour of an entanglement group id (1, 2, ...), the fixed list first, generated hues after that"""
+    if group <= len(ENT_NUMBER_COLOURS):
+        return ENT_NUMBER_COLOURS[group - 1]
+    # golden ratio steps keep neighbouring ids far apart on the colour wheel
+    hue = (group * 0.618033988749895) % 1.0
+    r, g, b = colorsys.hsv_to_rgb(hue, 0.85, 0.95)
+    return (int(r * 255), int(g * 255), int(b * 255))
+
 DEV_CARD_COLORS = {
     "knight": (200, 60, 60), # rgb(200, 60, 60)
     "point": (60, 140, 200), # rgb(60, 140, 200)
@@ -53,7 +64,5 @@ SEA_RING = HEX_RADIUS + 1
 SQRT3 = 3 ** 0.5
 
 def getFont(size=18):
-    try:
-        return pygame.font.Font("../fonts/ScienceGothic-Regular.ttf", size)
-    except:
-        return pygame.font.SysFont("Arial", size)
+    from .assets import ASSETS
+    return ASSETS.font(size)
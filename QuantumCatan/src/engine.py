@@ -0,0 +1,949 @@
+# src/engine.py
+# The rules of the game without any drawing: state, placement rules, dice, robber and quantum tiles.
+# Nothing in here imports pygame, so simulations and tests can use it directly.
+
+import time
+import copy
+import bisect
+import heapq
+import random
+import logging
+from .constants import PLAYER_COLORS, HEX_RADIUS
+from .board import randomize_tiles, generate_sea_ring
+from .topology import get_topology
+from .resources import resource_name, Inventory, COSTS, NO_COST, DESERT
+from .player import Player
+from .turn import Action, TurnPhase, TurnStateMachine
+from .scoring import ScoreTracker, WINNING_SCORE
+from .gamelog import get_logger, log_event
+
+log = get_logger("engine")
+
+
+def monotonic_ms():
+    return int(time.monotonic() * 1000)
+
+
+class GameObserver:
+    """
+    Something that follows a game as it happens (statistics, network sync). Add it to
+    game.observers, every hook is a no-op here so subclasses only implement what they need.
+    """
+    def on_roll(self, game, roll): pass
+    def on_produce(self, game, player_idx, resource, amount): pass
+    def on_token(self, game, player_idx, group, amount): pass
+    def on_collapse(self, game, group, tile_indices): pass
+    def on_robber(self, game, tile_idx): pass
+    def on_interference(self, game, tile_idx): pass
+    def on_turn_end(self, game): pass
+
+
+class GameEngine:
+    # attributes a front end adds (window, pixel layout) that clone() leaves out
+    VIEW_ATTRS = frozenset()
+
+    def __init__(self, num_players=4, clock=monotonic_ms, board_radius=HEX_RADIUS, rng=None):
+        # clock returns milliseconds, used for message expiry and animation timing
+        self.clock = clock
+        # random.Random the board, dice and cards are drawn from, pass a seeded one to replay a game
+        self.rng = rng if rng is not None else random.Random()
+        # GameObserver instances, not copied by clone()
+        self.observers = []
+        self.num_players = num_players
+        self.playerWon = False
+        self.num_entangled_pairs = 2
+        # tiles per entanglement group made at the start, 2 to 5 (the entangle step after a
+        # measurement always makes a pair)
+        self.ent_group_size = 2
+        self.points_to_win = WINNING_SCORE
+        self.runningGame = False
+        self.monopolysing = False
+        self.resources_to_collect = 0
+        self.devMode = False
+        # land tiles from the centre to the edge, 2 is the standard 19 tile board
+        self.board_radius = board_radius
+        self.turn = TurnStateMachine()
+        # shared, read-only board graph (see topology.py), every game with this radius uses the same one
+        self.topology = get_topology(self.board_radius)
+
+    def start_game(self, board=None):
+        self.runningGame = True
+        self.reset_game(board)
+    
+    def clone(self):
+        """
+        A plain GameEngine copy of the rules state, without anything the front end added.
+        Bots search on clones and worker processes receive them pickled.
+        """
+        c = GameEngine.__new__(GameEngine)
+        # callbacks bound to this game (the score tracker's) have to point at the copy
+        memo = {id(self): c}
+        state = {k: v for k, v in self.__dict__.items() if k not in self.VIEW_ATTRS and k not in ("observers", "rng")}
+        c.__dict__.update(copy.deepcopy(state, memo))
+        c.observers = []
+        # like the tiles' QuantumState, a copy gets a stream of its own so a bot can't read the coming dice
+        c.rng = random.Random()
+        return c
+
+    # -- messaging helpers ---------------------------------------
+    def push_message(self, text, duration_ms=10000):
+        """
+        Add a transient on-screen message. Rendered by draw().
+        """
+        if not text:
+            return
+        expires = self.clock() + duration_ms
+        self.message_log.append((text, expires))
+        self.messages_pushed += 1
+        # keep it bounded
+        if len(self.message_log) > 20:
+            self.message_log.pop(0)
+
+    def _prune_messages(self):
+        now = self.clock()
+        self.message_log = [(t,e) for (t,e) in self.message_log if e > now]
+
+    # board graph, all of it comes from the shared topology so a game only stores its own mutable state
+    # the rules work on the board laid out around (0,0), the UI only shifts it to the screen
+    # turn flow, see turn.py
+    @property
+    def allowed_actions(self):
+        return self.turn.actions
+
+    @property
+    def has_placed_devcard(self):
+        return self.turn.dev_card_played
+
+    @property
+    def vertex_positions(self):
+        return self.topology.vertex_positions
+
+    @property
+    def hex_vertex_indices(self):
+        return self.topology.hex_vertex_indices
+
+    @property
+    def vertex_neighbors(self):
+        return self.topology.vertex_neighbors
+
+    @property
+    def roads_list(self):
+        return self.topology.roads
+
+    @property
+    def road_mids(self):
+        return self.topology.road_mids
+
+    @property
+    def port_vertex_map(self):
+        # sea index -> vertex pair it serves
+        return self.topology.sea_roads
+
+    def can_place_settlement(self, v_idx):
+        # check adjacent roads
+        if v_idx not in self.settlements_owner and all(n not in self.settlements_owner for n in self.vertex_neighbors.get(v_idx, [])):
+            if self.round >= 2 and self.devMode == False:
+                for neighbor in self.vertex_neighbors.get(v_idx, []):
+                    adjacent_edge = tuple(sorted((v_idx, neighbor)))
+                    if adjacent_edge in self.roads_owner and self.roads_owner[adjacent_edge] == self.current_player:
+                        return True
+            else:
+                return True
+        return False
+
+    def can_upgrade_to_city(self, player_idx, v_idx):
+        owner = self.settlements_owner.get(v_idx)
+        return owner is not None and owner[0] == player_idx and owner[1] == "settlement"
+
+    def can_place_road_slot(self, road_idx):
+        roads = self.roads_list
+        if road_idx is None or road_idx >= len(roads):
+            return False
+        edge = tuple(roads[road_idx])
+        #check if adjacent to existing road or settlement of current player
+        if self.round >=2:
+            if edge not in self.roads_owner:
+                for vertex in edge:
+                    # check adjacent settlements
+                    owner = self.settlements_owner.get(vertex)
+                    if owner is not None and owner[0] == self.current_player:
+                        return True
+                    # check adjacent roads
+                    for neighbor in self.vertex_neighbors.get(vertex, []):
+                        adjacent_edge = tuple(sorted((vertex, neighbor)))
+                        if adjacent_edge in self.roads_owner and self.roads_owner[adjacent_edge] == self.current_player:
+                            return True
+                return False
+            else: return False
+        else:
+            if edge not in self.roads_owner:
+                for vertex in edge:
+                    owner = self.settlements_owner.get(vertex)
+                    if owner is not None and vertex == self.last_settlement_pos and owner[0] == self.current_player:
+                        return True
+        return False
+
+    def player_can_afford(self, player_idx, item_key):
+        # COSTS holds one fixed length vector per item (see resources.py)
+        return self.players[player_idx].resources.can_afford(COSTS.get(item_key, NO_COST))
+
+    def player_buy(self, player_idx, item_key):
+        resources = self.players[player_idx].resources
+        cost = COSTS[item_key]
+        if not resources.can_afford(cost):
+            return False
+        resources.pay(cost)
+        return True
+    
+    def _index_ports(self):
+        # vertex -> ports it gives access to, the sea ring does not change during a game
+        self.vertex_ports = {}
+        for i, s_tile in enumerate(self.sea_tiles):
+            if s_tile["port"] != "sea":
+                for v in self.port_vertex_map[i]:
+                    self.vertex_ports.setdefault(v, []).append(s_tile["port"])
+
+    #check the best trade ratio (outputs either 2, 3, or 4 depending on ports the player is connected to)
+    def check_best_trade_ratio(self, resource):
+        best_trade_ratio = 4
+        port = f"port_{resource}"
+        # only the player's own buildings can sit on a port
+        for v in self.players[self.current_player].buildables_placed["settlements"]:
+            for s_port in self.vertex_ports.get(v, ()):
+                if s_port == "port_any":
+                    best_trade_ratio = 3
+                elif s_port == port:
+                    best_trade_ratio = 2
+                    break
+            if best_trade_ratio == 2:
+                break
+        log_event(log, logging.DEBUG, "trade_ratio", player=self.current_player, resource=resource, ratio=best_trade_ratio)
+        return best_trade_ratio
+
+    def give_player_devcard(self, player_idx):
+        """a function that gives the current player a random devcard and adds it to the player's held_dev_card"""
+        self.rng.shuffle(self.possible_cards)
+        if len(self.possible_cards) > 0:
+            card = self.possible_cards.pop()
+        else:
+            self.push_message("cards are empty")
+            return
+        self.players[player_idx].held_dev_cards[card] += 1
+        # messages go to every client of a hosted game, which card it was stays in the hand
+        self.push_message(f"{self.players[player_idx].name} bought a development card")
+    
+    def play_dev_card(self, player_idx, card_type):
+        """checks if the player has a dev card of that type, if so it removes one from the players inventory and adds it to
+        the players played_dev_cards and does the thing it need to do"""
+        # stops the function if the player has no such devcards
+        if self.players[player_idx].held_dev_cards.get(card_type) == 0:
+            self.push_message(f"No {card_type}cards in inventory")
+            return
+        if not self.devMode and not self.turn.allows(Action.DEV_CARD):
+            if self.has_placed_devcard:
+                self.push_message("already played a Devcard this turn")
+            else:
+                self.push_message("Cannot play development card right now.")
+            return
+        # very important, can only be once per turn
+        self.turn.played_dev_card()
+        self.players[player_idx].held_dev_cards[card_type] -= 1
+        self.players[player_idx].played_dev_cards[card_type] += 1
+        
+        # gives the player a point
+        if card_type == "point":
+            self.scores.vp_card_played(player_idx)
+            self.push_message(f"{self.players[player_idx].name} received a point")           
+        # aplies knight card
+        elif card_type == "knight":
+            # adds to the players army
+            self.players[player_idx].knightmight += 1
+            self.push_message(f"{self.players[player_idx].name} has an army size of {self.players[player_idx].knightmight}")
+            # initiates the robber moving process
+            self.push_message("Please move the robber.")
+            self.check_for_greatest_knightmight()
+            self.moving_robber = True
+            self.turn.enter(TurnPhase.ROBBER)
+            return
+        elif card_type == "interference":
+            self.push_message("Please select the quantum tile of which you want to raise the propability for the left side")
+            self.push_message("The propability for right side of the corresponding tile will be raised")
+            self.interfering = True
+            self.turn.enter(TurnPhase.INTERFERE)
+        elif card_type == "Monopoly":
+            self.push_message("Please type the first letter of the resource you would like to steal from the other players")
+            self.monopolysing = True
+        elif card_type == "Year of Plenty":
+            self.push_message("Please type the first letter of the resource you would like to recieve")
+            self.resources_to_collect = 2
+        elif card_type == "roadBuilding":
+            self.push_message("Place two roads")
+            self.sel = "road"
+            self.placing = self.sel
+            self.has_free_roads = True
+            self.roads_left_to_build = 2
+
+    def steal_every_ones_resource(self, choosen_resource, player_idx):
+        """import a resource and it checks for every player how many of that resource is in the inventory, they grab the resource and
+        add it to players inventory"""
+        amount_of_resources = 0
+        for n in range(len(self.players)):
+            if n != player_idx:
+                amount_of_resources += self.players[n].resources.take_all(choosen_resource)
+        self.players[player_idx].resources[choosen_resource] += amount_of_resources
+        self.push_message(f"{self.players[player_idx].name} has stolen everyone's {choosen_resource}")
+        self.push_message(f"{self.players[player_idx].name} has recieved {amount_of_resources} {choosen_resource}")
+        self.monopolysing = False
+
+    def check_for_greatest_knightmight(self):
+        """should check if a player already has the greatest knightmight, then if a player has a knightmight of three or greater
+        and should change this. if the knightmight changes, the variable should be set to false, two points should be reducted etc
+        """
+        highest_score = 0
+        highest_player_idx = None
+        already_has_knightmight = False
+        someone_wrongly_posseses_the_army = False
+        current_highest_army = 0
+        # finds the highest score and
+        for i,player in enumerate(self.players):
+            if player.knightmight > highest_score:
+                highest_score = player.knightmight
+                highest_player_idx = i
+            if player.has_greatest_knightmight:
+                current_highest_army = player.knightmight
+                current_highest_army_holder_idx = i
+        # makes sure the highest_player_idx matches the current holder's
+        if current_highest_army == highest_score:
+            highest_player_idx = current_highest_army_holder_idx
+        # checks if the highest player already has the biggest army, otherwise if another player has it, it stores that players index
+        for i,player in enumerate(self.players):
+            if player.has_greatest_knightmight and i == highest_player_idx:
+                already_has_knightmight = True
+            elif player.has_greatest_knightmight:
+                wrongly_possesses_biggest_army_idx = i
+                someone_wrongly_posseses_the_army = True
+        # in these cases nothing has to change
+        if already_has_knightmight or highest_score < 3:
+            return
+        # the tracker moves the 2 points from the old holder to the new one
+        if someone_wrongly_posseses_the_army:
+            self.players[wrongly_possesses_biggest_army_idx].has_greatest_knightmight = False
+            self.push_message(f"{self.players[wrongly_possesses_biggest_army_idx].name} has lost the biggest army, 2 subtracted from score")
+        self.players[highest_player_idx].has_greatest_knightmight = True
+        self.push_message(f"{self.players[highest_player_idx].name} has aquired the biggest army, 2 added to score")
+        self.scores.award("largest_army", highest_player_idx)
+
+    def place_settlement(self, v_idx, player_idx, typ="settlement"):
+        self.push_message(f"{self.players[player_idx].name} placed a settlement.")
+        self.settlements_owner[v_idx] = (player_idx, typ)
+        self.dirty_vertices.add(v_idx)
+        number = self.tiles.number
+        for ti in self.topology.vertex_tiles[v_idx]:
+            if number[ti]:
+                built = self.producing_tiles.setdefault(number[ti], [])
+                if ti not in built:
+                    bisect.insort(built, ti)
+        self.last_settlement_pos = v_idx
+        self.players[player_idx].buildables_placed["settlements"].append(v_idx)
+        self.scores.building_placed(player_idx, typ)
+
+    def upgrade_to_city(self, v_idx, player_idx):
+        self.push_message(f"{self.players[player_idx].name} placed a city.")
+        self.settlements_owner[v_idx] = (player_idx, "city")
+        self.dirty_vertices.add(v_idx)
+        self.players[player_idx].buildables_placed["cities"].append(v_idx)
+        # city gives +1 score relative to settlement
+        self.scores.city_upgraded(player_idx)
+
+    def place_road(self, road_idx, player_idx):
+        self.push_message(f"{self.players[player_idx].name} placed a road.")
+        roads = self.roads_list
+        edge = tuple(roads[road_idx])
+        self.roads_owner[edge] = player_idx
+        self.dirty_roads.add(road_idx)
+        self.players[player_idx].buildables_placed["roads"].append(road_idx)
+        
+        #check longest road update
+        roads_in_road = [edge]
+        longest_road = 1
+        for vertex in edge:
+            self.find_longest_road(vertex, roads_in_road, longest_road, player_idx)      
+        
+    def find_longest_road(self, vertex, roads_in_road, longest_road, player_idx):
+        for neighbor in self.vertex_neighbors.get(vertex, []):
+            adjacent_edge = tuple(sorted((vertex, neighbor)))
+            if adjacent_edge in self.roads_owner and self.roads_owner[adjacent_edge] == self.current_player and adjacent_edge not in roads_in_road:
+                roads_in_road.append(adjacent_edge)
+                for v in adjacent_edge:
+                    if v != vertex:
+                        self.find_longest_road(v, roads_in_road, longest_road, player_idx)
+                        roads_in_road.pop()
+            else:
+                if len(roads_in_road) > longest_road:
+                    longest_road = len(roads_in_road)
+        if longest_road >= 5:
+            if self.longest_road is None or longest_road > self.longest_road[1]:
+                if self.longest_road is not None and self.longest_road[0] == player_idx:
+                    self.push_message(f"{self.players[player_idx].name} has increased their Longest Road to length {longest_road}!")
+                elif self.longest_road is not None:
+                    prev_player_idx = self.longest_road[0]
+                    self.push_message(f"{self.players[player_idx].name} takes Longest Road from {self.players[prev_player_idx].name} with length {longest_road}!")
+                else:
+                    self.push_message(f"{self.players[player_idx].name} has claimed Longest Road with length {longest_road}!")
+                self.longest_road = (player_idx, longest_road)
+                self.scores.award("longest_road", player_idx)
+                 
+    def give_initial_settlement_resources(self, v_idx, player_idx):
+        # give resources from adjacent tiles to player
+        for ti in self.topology.vertex_tiles[v_idx]:
+            tile = self.tiles[ti]
+            res = tile.get('resource')
+            if res and res != "desert":
+                self.players[player_idx].resources[res] += 1
+                self.push_message(f"{self.players[player_idx].name} received 1 {res} from initial settlement.")
+            if tile.get("quantum", False):
+                token = {"type":"entangled","group":tile["ent_group"], "possible": tile.get("superposed")[:], "tile_coord": tile['coord']}
+                token["from_tile_idx"] = ti
+                self.players[player_idx].tokens.append(token)
+                self.push_message(f"{self.players[player_idx].name} received one superposed token from initial settlement.")
+
+    # dice & distribution using quantum tokens
+    def roll_and_distribute(self, number):
+        self.moving_robber = False
+        self.activated_settlements = []
+        roll = 0
+        self.milliseconds_passed_at_roll = self.milliseconds_passed
+        if number == None: 
+            roll = self.rng.randint(1,6) + self.rng.randint(1,6) 
+        else: 
+            roll = int(number)
+        self.push_message(f"Dice rolled: {roll}")
+        log_event(log, logging.INFO, "dice_rolled", player=self.current_player, roll=roll)
+        for obs in self.observers:
+            obs.on_roll(self, roll)
+        self.last_roll = roll
+        self.turn.rolled_dice(roll == 7)
+        if roll == 7:
+            self.push_message("Please move the robber.")
+            self.moving_robber = True
+            return
+
+        # collect tokens or classical resources to players
+        # for each tile with a building next to it: if its number matches roll:
+        tiles = self.tiles
+        for ti in self.producing_tiles.get(roll, ()):
+                # skip robber tile
+                if ti == getattr(self, "robber_idx", None):
+                    continue
+                # for each adjacent vertex, give token or resource to owner
+                for v in self.hex_vertex_indices[ti]:
+                    owner = self.settlements_owner.get(v)
+                    if owner:
+                        player_idx, typ = owner
+                        amt = 2 if typ == "city" else 1
+                        if typ == "settlement": self.activated_settlements.append(v)
+                        else: self.activated_cities.append(v)
+                        if tiles.quantum[ti]:
+                            tile = tiles[ti]
+                            token = {"type":"entangled","group":tile["ent_group"], "possible": tile.get("superposed")[:], "tile_coord": tile['coord']}
+                            # store token with player
+                            token["from_tile_idx"] = ti
+                            for k in range(amt):
+                                self.players[player_idx].tokens.append(token)
+                                self.push_message(f"{self.players[player_idx].name} received one superposed token")
+                            for obs in self.observers:
+                                obs.on_token(self, player_idx, token["group"], amt)
+                                    
+                        else:
+                            # classical payout
+                            
+                            res = resource_name(tiles.resource[ti])
+                            self.players[player_idx].resources[res] += amt
+                            self.push_message(f"{self.players[player_idx].name} received {amt}: {res}.")
+                            for obs in self.observers:
+                                obs.on_produce(self, player_idx, tiles.resource[ti], amt)
+
+    
+    def steal_from_victim(self, thief_idx, victim_idx):
+        victim = self.players[victim_idx]
+        thief = self.players[thief_idx]
+        # gather all resources of victim
+        available_resources = victim.resources.nonzero()
+        self.possible_victims = []
+        if not available_resources:
+            self.push_message(f"{victim.name} has no resources to steal.")
+            self._resolve_robber()
+            return
+        stolen_resource = self.rng.choice(available_resources)
+        victim.resources[stolen_resource] -= 1
+        thief.resources[stolen_resource] += 1
+        log_event(log, logging.INFO, "resource_stolen", thief=thief_idx, victim=victim_idx, resource=stolen_resource)
+        self.push_message(f"{thief.name} stole 1 {stolen_resource} from {victim.name}.")
+        self._resolve_robber()
+
+    def _resolve_robber(self):
+        """stays in the robber phase while a victim or a new entanglement still has to be chosen"""
+        if self.moving_robber or self.entangling or self.possible_victims:
+            self.turn.enter(TurnPhase.ROBBER)
+        else:
+            self.turn.resume()
+
+    # robber movement: puts or breaks quantum state
+    def move_robber_to(self, tile_idx):
+        t = self.tiles[tile_idx]
+        self.robber_idx = tile_idx
+        self.moving_robber = False
+        log_event(log, logging.INFO, "robber_moved", player=self.current_player, tile=tile_idx, quantum=bool(t.get("quantum", False)))
+        for obs in self.observers:
+            obs.on_robber(self, tile_idx)
+        if t.get("quantum", False) and t.get("ent_group") is not None:
+            self.unentangle_pair_of_quantum_tiles(t)
+            self.push_message(f"Robber moved to entangled quantum tile at index {tile_idx}, unentangling the pair.")
+            self.push_message("Now entangle a pair of normal tiles.")
+            self.entangling = True
+        #check if another player is on this tile and steal a resource
+        for v in self.hex_vertex_indices[tile_idx]:
+            owner = self.settlements_owner.get(v)
+            if owner and self.current_player not in owner:
+                owner_idx, btype = owner
+                if owner_idx not in self.possible_victims:
+                    self.possible_victims.append(owner_idx)
+        self._resolve_robber()
+    # switches a pair of normal tiles to a pair of entangeled tiles
+    def entangle_pair_of_normal_tiles(self, pair_of_tiles, ent_group_number, start=False):
+        """ A list with two (tile_idx, tile) pairs needs to be passed in this function, both tiles in the
+        tile store get turned into quantum tiles, entgroup_number should come from the previous pair of entangled tiles.
+        Does assume the tiles are not quantum"""
+        self.entangle_tiles([tile_idx for tile_idx, tile in pair_of_tiles], ent_group_number, start)
+
+    def entangle_tiles(self, tile_indices, ent_group_number, start=False):
+        """2 to 5 classical tiles with different resources into one group, see quantum.py"""
+        self.tiles.entangle(tile_indices, ent_group_number)
+        log_event(log, logging.DEBUG, "tiles_entangled", group=ent_group_number,
+                  tiles=list(tile_indices), initial=start)
+        if not start:
+            self.entangling = False
+            self._resolve_robber()
+
+    def unentangle_pair_of_quantum_tiles(self, robber_tile):
+        """measures the group of the robber tile: every member becomes classical and the tokens
+        of that group turn into the resources their tiles collapsed to"""
+        ent_group_number = robber_tile.get("ent_group")
+        outcome = self.tiles.measure(ent_group_number)
+        members = sorted(outcome)
+        # the group number can be used again for the next entanglement
+        heapq.heappush(self.unused_ent_group_numbers, ent_group_number)
+        log_event(log, logging.INFO, "group_collapsed", group=ent_group_number,
+                  outcome={ti: resource_name(res) for ti, res in outcome.items()})
+        for obs in self.observers:
+            obs.on_collapse(self, ent_group_number, members)
+        for player in self.players:
+            # one pass over the hand, tokens of other groups stay
+            kept = []
+            for token in player.tokens:
+                if token.get("group") == ent_group_number:
+                    msg = player.add_resource(resource_name(outcome[token.get("from_tile_idx")]), None)
+                    self.push_message(msg)
+                else:
+                    kept.append(token)
+            player.tokens = kept
+
+    def change_ditribution(self, chosen_tile):
+        """input the tile which's distribution will increase, this function will increase it's distribution
+        and decrease the rest of its group, also adds the allowed actions back"""
+        tiles = self.tiles
+        tiles.interfere(chosen_tile.idx)
+        for ti in tiles.group_members(chosen_tile.get("ent_group")):
+            self.push_message(f"changed distribution of tile {tiles.coords[ti]} ")
+        for obs in self.observers:
+            obs.on_interference(self, chosen_tile.idx)
+        # back to the normal turn, a second dev card stays blocked
+        self.interfering = False
+        self.turn.resume()
+
+    # -- moves shared by the UI and the bots (see actions.py) ---------
+    # each returns True when the move was made, the UI keeps its own selection state around them
+
+    def build_settlement(self, v_idx):
+        """a free settlement in the placement rounds, a bought one afterwards"""
+        player_idx = self.current_player
+        if not self.can_place_settlement(v_idx):
+            return False
+        if self.round < 2:
+            if self.settlements_placed != 0:
+                self.push_message("Cannot place more settlements this round.")
+                return False
+            self.place_settlement(v_idx, player_idx, "settlement")
+            self.settlements_placed += 1
+            if self.round == 1:
+                # give resources for 2nd settlement
+                self.give_initial_settlement_resources(v_idx, player_idx)
+            return True
+        if not self.player_buy(player_idx, "settlement"):
+            return False
+        self.place_settlement(v_idx, player_idx, "settlement")
+        self.settlements_placed += 1
+        return True
+
+    def build_city(self, v_idx):
+        player_idx = self.current_player
+        if not self.can_upgrade_to_city(player_idx, v_idx) or not self.player_buy(player_idx, "city"):
+            return False
+        self.upgrade_to_city(v_idx, player_idx)
+        return True
+
+    def build_road(self, road_idx):
+        """a placement round road, a road from the road building card or a bought one"""
+        player_idx = self.current_player
+        if not self.can_place_road_slot(road_idx):
+            return False
+        if self.round < 2:
+            if self.roads_placed != 0:
+                self.push_message("Cannot place more roads this round.")
+                return False
+            self.place_road(road_idx, player_idx)
+            self.roads_placed += 1
+            if self.settlements_placed == 1:
+                self.turn.placed_setup_pieces()
+            return True
+        # incase the player played a development card
+        if self.has_free_roads:
+            self.place_road(road_idx, player_idx)
+            self.roads_left_to_build -= 1
+            self.roads_placed += 1
+            if self.roads_left_to_build == 0:
+                self.has_free_roads = False
+            else:
+                self.push_message("place second road")
+            return True
+        # incase the player bought a road
+        if not self.player_buy(player_idx, "road"):
+            return False
+        self.place_road(road_idx, player_idx)
+        self.roads_placed += 1
+        return True
+
+    def buy_dev_card(self):
+        player_idx = self.current_player
+        if not self.possible_cards:
+            self.push_message("No development cards left to buy.")
+            return False
+        if not self.player_buy(player_idx, "dev"):
+            return False
+        self.give_player_devcard(player_idx)
+        return True
+
+    def choose_resource(self, resource):
+        """the resource picked for a monopoly or year of plenty card"""
+        if self.monopolysing:
+            self.steal_every_ones_resource(resource, self.current_player)
+            return True
+        if self.resources_to_collect <= 0:
+            return False
+        # year of plenty card
+        self.push_message(self.players[self.current_player].add_resource(resource, 0))
+        if self.resources_to_collect == 2:
+            self.push_message("Please type the first letter of the second resource you would like to recieve")
+        self.resources_to_collect -= 1
+        return True
+
+    def place_robber(self, tile_idx):
+        if not self.moving_robber or tile_idx is None or tile_idx == self.robber_idx:
+            return False
+        self.move_robber_to(tile_idx)
+        return True
+
+    def interfere(self, tile_idx):
+        """the interference card on a quantum tile"""
+        if not self.interfering or tile_idx is None:
+            return False
+        tile = self.tiles[tile_idx]
+        if not tile.get("quantum"):
+            self.push_message("please select a quantum tile")
+            return False
+        self.change_ditribution(tile)
+        return True
+
+    def can_entangle_tile(self, tile_idx, chosen=()):
+        """a classical, non desert tile without the robber, with a different resource than the chosen tiles"""
+        tiles = self.tiles
+        if tile_idx is None or tile_idx == self.robber_idx or tile_idx in chosen or tiles.quantum[tile_idx]:
+            return False
+        res = tiles.resource[tile_idx]
+        if res < 0 or res == DESERT:
+            return False
+        return all(tiles.resource[c] != res for c in chosen)
+
+    def select_entangle_tile(self, tile_idx):
+        """adds a tile to the pair being entangled after a measurement, the pair is entangled once it has two"""
+        if not self.entangling or tile_idx is None or tile_idx == self.robber_idx:
+            return False
+        tile = self.tiles[tile_idx]
+        chosen = [idx for idx, t in self.entangling_pair]
+        if tile_idx in chosen:
+            self.push_message("Already selected this tile. Select a different quantum tile.")
+            return False
+        if tile.get("quantum", False):
+            self.push_message("Selected tile is quantum. Select a classical tile.")
+            return False
+        if tile.get("resource") == "desert":
+            self.push_message("Cannot entangle desert tile. Select a different tile.")
+            return False
+        if not self.can_entangle_tile(tile_idx, chosen):
+            self.push_message("Cannot entangle two tiles of the same resource type. Select a different tile.")
+            return False
+        self.entangling_pair.append((tile_idx, tile))
+        if len(self.entangling_pair) == 2:
+            self.entangle_pair_of_normal_tiles(self.entangling_pair, heapq.heappop(self.unused_ent_group_numbers))
+            self.entangling_pair = []
+            self.entangling = False
+        return True
+
+    def _random_entangle_group(self, size):
+        """`size` random tiles that may be entangled together, None if no such group is left"""
+        candidates = [t for t in range(len(self.tiles)) if self.can_entangle_tile(t)]
+        self.rng.shuffle(candidates)
+        for i, a in enumerate(candidates):
+            group = [a]
+            rest = candidates[i+1:]
+            while len(group) < size:
+                partners = [b for b in rest if self.can_entangle_tile(b, group)]
+                if not partners:
+                    break
+                group.append(self.rng.choice(partners))
+            if len(group) == size:
+                return tuple(group)
+        return None
+
+    def skip_entangling(self):
+        """ends the entangling step when no valid pair of tiles is left on the board"""
+        if not self.entangling:
+            return False
+        self.entangling = False
+        self.entangling_pair = []
+        self._resolve_robber()
+        return True
+
+    def bank_trade(self, give, get):
+        """trades give for one get at the best ratio the player's ports allow"""
+        resources = self.players[self.current_player].resources
+        ratio = self.check_best_trade_ratio(give)
+        if give == get or resources[give] < ratio:
+            return False
+        resources[give] -= ratio
+        resources[get] += 1
+        return True
+
+    def offer_trade(self, partner_idx, delta):
+        """
+        The current player offers a trade to partner_idx. delta is from the offering player's side
+        (negative: gives, positive: wants). The partner becomes current_player until they answer,
+        the offer is kept from their side in tradingAddedResources.
+        """
+        sender = self.current_player
+        delta = delta if isinstance(delta, Inventory) else Inventory(delta)
+        if not self.turn.allows(Action.TRADE) or partner_idx == sender or not 0 <= partner_idx < self.num_players:
+            return False
+        if not delta.any() or not self.players[sender].resources.can_apply(delta):
+            return False
+        self.trading = True
+        self.trading_partner = sender
+        self.current_player = partner_idx
+        log_event(log, logging.INFO, "trade_offered", sender=sender, receiver=partner_idx, offer=dict(delta.items()))
+        self.tradingAddedResources = delta.copy()
+        self.tradingAddedResources.negate()
+        self.turn.enter(TurnPhase.TRADE_RESPONSE)
+        return True
+
+    def accept_trade(self):
+        """the trading partner (current_player while the offer is open) takes the offer"""
+        offer = self.tradingAddedResources
+        if not self.turn.allows(Action.ACCEPT_TRADE) or not self.players[self.current_player].resources.can_apply(offer):
+            return False
+        self.players[self.current_player].resources.add(offer)
+        self.current_player = self.trading_partner
+        self.trading = False
+        offer.negate()
+        self.players[self.current_player].resources.add(offer)
+        self.tradingAddedResources = Inventory()
+        self.turn.resume()
+        return True
+
+    def decline_trade(self):
+        if not self.turn.allows(Action.ACCEPT_TRADE):
+            return False
+        self.current_player = self.trading_partner
+        self.trading = False
+        self.tradingAddedResources = Inventory()
+        self.turn.resume()
+        return True
+
+    def end_turn(self):
+        
+        self.trading = False
+        # for road build card
+        self.has_free_roads = False
+        self.roads_left_to_build = 0
+        self.resources_to_collect = 0
+        self.monopolysing = False
+        self.trading_partner = None
+        self.possible_trading_partners = []
+        self.possible_victims = []
+        self.settlements_placed = 0
+        self.roads_placed = 0
+        self.push_message(f"{self.players[self.current_player].name} ended their turn.")
+        log_event(log, logging.DEBUG, "turn_ended", player=self.current_player, round=self.round)
+        for obs in self.observers:
+            obs.on_turn_end(self)
+        if self.round == 0:
+            if self.current_player == self.num_players -1:
+                self.push_message("First round of placement complete. Starting second round.") 
+                self.round += 1
+            else:
+                self.current_player += 1
+                
+        elif self.round == 1:
+            if self.current_player == 0:
+                self.push_message("Second round of placement complete. Starting second round.")
+                self.round += 1
+            else:
+                self.current_player -= 1
+        
+        else:
+            if self.current_player == self.num_players -1:
+                self.push_message("Turn cycle complete. Starting new round.")
+                self.current_player = 0
+                self.round += 1
+            else:
+                self.current_player = (self.current_player + 1) % self.num_players
+
+        # placement rounds only allow building, later turns start with the dice (or a dev card)
+        self.turn.start_turn(setup=self.round < 2)
+
+        self.last_roll = None
+
+    def reset_game(self, board=None):
+        """board: an optional pregenerated (tiles, sea_tiles, pairs), see boardgen.BoardBatch.board()"""
+        self.round = 0
+        self.current_player = 0
+        self.turn = TurnStateMachine()
+        self.last_roll = None
+        
+        # initialize players
+        self.players = [Player(i) for i in range(self.num_players)]
+        for i,p in enumerate(self.players):
+            p.color = PLAYER_COLORS[i]
+            p.resources = Inventory()
+            p.tokens = []
+        # victory points are only changed through the tracker
+        self.scores = ScoreTracker(self.players, self.points_to_win, on_victory=self._declare_winner)
+        # geometry & tiles, the board graph is built once per radius and shared
+        self.topology = get_topology(self.board_radius)
+        if board is not None:
+            self.tiles, self.sea_tiles, pairs = board
+        else:
+            self.tiles = randomize_tiles(self.topology.hex_coords, self.rng)
+            self.sea_tiles = generate_sea_ring(self.topology.sea_coords, self.rng)
+            pairs = None
+        # free group ids as a min-heap, the lowest free id is used first; a pair needs two tiles
+        self.unused_ent_group_numbers = list(range(1, len(self.tiles) // 2 + 1))
+        # randomly select 3 entangled pairs
+        self._index_ports()
+        self.moving_robber = False
+        self.entangling = False
+        self.interfering = False
+        self.entangling_pair = []
+        
+        # for road build devcard
+        self.has_free_roads = False
+        self.roads_left_to_build = 0
+        # for monopoly devcard
+        self.monopolysing = False
+        self.resources_to_collect = 0
+
+        self.settlements_placed = 0
+        self.roads_placed = 0
+        
+        self.trading = False
+        self.trading_partner = None  # player index or "bank/port"
+        self.possible_trading_partners = []  # list of player indices
+        
+        self.victim = None  # player index to steal from
+        self.possible_victims = []  # list of (player_idx, building_type) adjacent to robber tile
+        
+        self.placing = None  # whether in placement mode
+        self.sel = None
+        
+        # message/notification log (text, expires_at_ms)
+        self.message_log = []   # list of (text, expiry_timestamp_ms)
+        self.message_max = 6    # max messages shown
+        self.messages_pushed = 0  # total ever pushed, remote clients use it to fetch only new ones
+
+        # owners
+        self.roads_owner = {}  # edge tuple -> player index
+        self.settlements_owner = {}  # vertex idx -> (player, type)
+        # buildings changed since the last delta was sent to remote clients (see sync.py)
+        self.dirty_vertices = set()
+        self.dirty_roads = set()
+        # dice number -> tiles with at least one building, in board order. A roll only visits
+        # these, so it costs the same on a small board as on a huge one
+        self.producing_tiles = {}
+        # robber
+        self.robber_idx = None
+        
+        self.tradingAddedResources = Inventory()
+        
+        self.inspecting = False
+        
+        self.devMode = False
+        self.last_settlement_pos = None
+        self.milliseconds_passed = 0
+        self.milliseconds_passed_at_roll = 0
+        self.activated_settlements = []
+        self.activated_cities = []
+        self.possible_cards = ["knight"] * 14 + ["point"] * 5 + ["interference"] * 14 + ["Year of Plenty"] * 3 + ["Monopoly"] * 3 + ["roadBuilding"] * 3
+        
+        self.longest_road = None
+        
+        for p in range(self.num_entangled_pairs):
+            if pairs is not None:
+                pair = pairs[p] if p < len(pairs) else None
+            else:
+                pair = self._random_entangle_group(self.ent_group_size)
+            if pair is None:
+                # with many pairs the classical tiles left can all have the same resource
+                log_event(log, logging.WARNING, "entangle_pairs_exhausted", requested=self.num_entangled_pairs, placed=p)
+                break
+            self.entangle_tiles(pair, heapq.heappop(self.unused_ent_group_numbers), start=True)
+            self.entangling_pair = []   
+
+    def _declare_winner(self, player_idx, score):
+        """called by the score tracker the moment a player reaches points_to_win"""
+        if not self.runningGame:
+            return
+        self.push_message(f"{self.players[player_idx].name} has won the game with a score of {score}!")
+        log_event(log, logging.INFO, "game_won", player=player_idx, score=score,
+                  breakdown=self.scores.breakdown(player_idx))
+        self.playerWon = True
+        self.runningGame = False
+        self.turn.game_over()
+
+    # one logic step, main.py calls it at a fixed rate of game time (see timestep.py)
+    def update(self, dt):
+        """
+        One logic step of dt milliseconds of game time (timestep.STEP_MS in the window, the clock
+        has already moved on by dt). Keeps the state the rules derive from the turn in line: an
+        open trade closes when the phase no longer allows trading, and a setup turn may end once its
+        settlement and road are placed. Wins are not checked here, _declare_winner does that
+        as soon as the score tracker sees enough points.
+        """
+        if self.runningGame:
+            if not self.devMode and not self.turn.allows(Action.TRADE | Action.ACCEPT_TRADE):
+                self.trading = False
+                self.trading_partner = None
+                self.possible_trading_partners = []
+
+            if self.round < 2:
+                if (self.roads_placed == 1) and (self.settlements_placed == 1):
+                    self.turn.placed_setup_pieces()
+            self.milliseconds_passed = self.clock()
@@ -1,727 +1,252 @@
 # src/game_state.py
 # The central glue: game state, handlers, drawing of board and UI rectangles used by UI
 
-import pygame, math, time, os
-import random
-from .constants import WIN_W, WIN_H, BG_COLOR, PANEL_BG, LINE_COLOR, TEXT_COLOR, WHITE, BLACK, PLAYER_COLORS, BUTTON_COLOR, getFont, PREVIEW_COLOR, ENT_NUMBER_COLOURS, DEV_CARD_COLORS
-from .board import (
-    compute_centers_and_polys,
-    randomize_tiles,
-    generate_sea_ring,
-    HEX_COORDS,
-    SEA_COORDS
-)
-from .board import compute_centers_and_polys as board_centers_polys
-from .board import compute_sea_polys
-from .util import hex_to_pixel, polygon_corners, dist
-from .resources import *
+import pygame, math
+import numpy as np
+from .constants import WIN_W, WIN_H, BG_COLOR, PANEL_BG, LINE_COLOR, TEXT_COLOR, WHITE, BLACK, PLAYER_COLORS, BUTTON_COLOR, getFont, PREVIEW_COLOR, DEV_CARD_COLORS, HEX_RADIUS, ent_group_colour
+from .board import compute_centers_and_polys, compute_sea_polys
 from .rendering import draw_text
-from .buildings import compute_vertex_adjacency
-#from .robber import initial_robber_tile
-from .player import Player
+from .assets import ASSETS, LOGO_PATH, LOGO_SIZE, MUSIC_PATH
+from .engine import GameEngine, monotonic_ms
+from .topology import BOARD_HEX_SIZE, HEX_DIRECTIONS
+from .camera import Camera, LOD_HEX_SIZE
+from .sprites import SPRITES, blit
+from .panels import game_panels, ShopPanel
+from .hittest import HitRegistry, LAYER_BUTTON
+from .util import pixel_to_hex
+from .resources import RESOURCES
+from .turn import Action
 from .constants import WIN_W as W, WIN_H as H
 
-os.chdir(os.path.dirname(os.path.realpath(__file__)))
 
-
-class GameState:
-    def __init__(self, num_players=4, screen=None):
+# corner directions of a pointy top hex, as util.polygon_corners walks them
+HEX_CORNERS = np.array([(math.cos(math.radians(30 + 60*i)), math.sin(math.radians(30 + 60*i))) for i in range(6)])
+
+
+class GameState(GameEngine):
+    """
+    The rules live in GameEngine, this adds the screen: pixel geometry, button rects and drawing.
+    """
+    # left out of clone(), bots and worker processes only get the rules state. Everything in here is
+    # pixels or pygame objects: a clone pickled to the spawn worker pool must not make it import pygame
+    VIEW_ATTRS = frozenset({"screen", "origin", "centers", "polys", "sea_centers", "sea_polys", "intersections", "_layout_key",
+                            "camera", "visible_tiles", "visible_sea", "_visible_set", "panels", "shop_panel",
+                            "hits", "_buttons_key", "hex_size", "required_placed",
+                            # buttons (layout_buttons)
+                            "num_player_buttons", "entanglement_buttons", "start_button", "restart_button",
+                            "reset_rect", "dice_rect", "end_turn_rect", "trade_rect", "devMode_rect", "inspect_rect",
+                            "sendTrade_rect", "acceptTrade_rect", "declineTrade_rect",
+                            # click rects the panels hand out (panels.py)
+                            "shop_rects", "dev_card_rects", "trading_partners_rects", "possible_victims_rects",
+                            "plusSignRects", "minusSignRects"})
+
+    def __init__(self, num_players=4, screen=None, board_radius=HEX_RADIUS, clock=monotonic_ms):
+        # main.py passes a timestep.GameClock, so game time only moves in logic steps
+        super().__init__(num_players, clock=clock, board_radius=board_radius)
         self.screen = screen
-        self.num_players = num_players
-        self.playerWon = False
-        self.num_entangled_pairs = 2
-        self.runningGame = False
-        self.monopolysing = False
-        self.resources_to_collect = 0
         self.hex_size = 50
-        self.devMode = False
-        self.origin = (self.screen.get_width()//2, self.screen.get_height()//2 - 10)
-        self.centers, self.polys = compute_centers_and_polys(self.origin)
-        self.sea_centers, self.sea_polys = compute_sea_polys(self.origin)
-        self.num_player_buttons = []
-        self.entanglement_buttons = []
-        self.start_button = pygame.Rect(W//2 - 90, H//2 + 250, 180, 40)
-        self.restart_button = pygame.Rect(W//2 - 105, H//2 + 200, 210, 40)
-        
-
-    def start_game(self,):
-        self.runningGame = True
-        self.reset_game()
-    
-    # -- messaging helpers ---------------------------------------
-    def push_message(self, text, duration_ms=10000):
+        # zoom and pan of the board (see camera.py), the geometry below follows it
+        self.camera = Camera()
+        # inventory, tokens, dev cards, trade panel and shop, each keeps its own surface
+        self.panels = game_panels()
+        self.shop_panel = ShopPanel()
+        # screen geometry is computed on first use, see _update_layout()
+        self._layout_key = None
+        # what every click target stands for, by screen (see hittest.py and GameUI._handle_click)
+        self.hits = HitRegistry()
+        self._buttons_key = None
+        self.layout_buttons()
+
+    def _update_layout(self):
+        """(re)computes the pixel geometry of the board, only when the screen size or the camera changed"""
+        w, h = self.screen.get_width(), self.screen.get_height()
+        # larger boards are drawn with smaller hexes so the whole board and its sea ring fit
+        rings = self.board_radius + 1
+        fit = min((w - 450) / (math.sqrt(3) * (2*rings + 1)), (h - 40) / (3*rings + 2))
+        self.camera.fit((w//2, h//2 - 10), max(8, min(50, int(fit))))
+        key = (w, h, self.camera.key())
+        if key == self._layout_key:
+            return
+        self._layout_key = key
+        self.hex_size = self.camera.hex_size
+        self.origin = self.camera.origin
+        # the topology has everything in board space, one scale and shift brings it on screen
+        scale = self.camera.scale
+        origin = np.asarray(self.origin, dtype=float)
+        corners = self.hex_size * HEX_CORNERS
+        centers = np.asarray(self.topology.tile_centers) * scale + origin
+        self.centers = list(map(tuple, centers.tolist()))
+        self.polys = (centers[:, None, :] + corners).tolist()
+        sea_centers = np.asarray(self.topology.sea_centers) * scale + origin
+        self.sea_centers = list(map(tuple, sea_centers.tolist()))
+        self.sea_polys = (sea_centers[:, None, :] + corners).tolist()
+        self.intersections = list(map(tuple, (np.asarray(self.vertex_positions) * scale + origin).tolist()))
+
+        # what is on screen, drawing and picking only look at these
+        index = self.topology.tile_index
+        self.visible_tiles = [index[c] for c in self.camera.visible_coords(w, h, self.board_radius) if c in index]
+        self._visible_set = frozenset(self.visible_tiles)
+        pad = self.hex_size
+        self.visible_sea = [i for i, (x, y) in enumerate(self.sea_centers) if -pad < x < w + pad and -pad < y < h + pad]
+
+    def layout_buttons(self):
         """
-        Add a transient on-screen message. Rendered by draw().
+        Rects of the fixed buttons of the three screens, registered with self.hits. Only redone
+        when the window size changes (or dev mode hides its button), not every frame.
         """
-        if not text:
+        w, h = self.screen.get_size() if self.screen is not None else (W, H)
+        key = (w, h, self.devMode)
+        if key == self._buttons_key:
             return
-        expires = pygame.time.get_ticks() + duration_ms
-        self.message_log.append((text, expires))
-        # keep it bounded
-        if len(self.message_log) > 20:
-            self.message_log.pop(0)
-
-    def _prune_messages(self):
-        now = pygame.time.get_ticks()
-        self.message_log = [(t,e) for (t,e) in self.message_log if e > now]
-
-    # geometry helpers
-    def _build_vertex_list(self):
-        # create intersections by rounding corners of polygons
-        vmap = {}
-        idx = 0
-        for poly in self.polys:
-            for corner in poly:
-                key = (round(corner[0],4), round(corner[1],4))
-                if key not in vmap:
-                    vmap[key] = idx
-                    self.intersections.append(corner)
-                    idx += 1
-        # now compute hex_vertex_indices mapping to vmap indexes
-        # reuse earlier logic to find indices
-        self.hex_vertex_indices = []
-        for poly in self.polys:
-            idxs = []
-            for corner in poly:
-                key = (round(corner[0],4), round(corner[1],4))
-                idxs.append(vmap[key])
-            self.hex_vertex_indices.append(idxs)
-
-    def _compute_roads_list(self):
-        road_set = set()
-        for idxs in self.hex_vertex_indices:
-            for i in range(6):
-                a = idxs[i]; b = idxs[(i+1)%6]
-                if a != b:
-                    road_set.add(tuple(sorted((a,b))))
-        self.roads_list = sorted(list(road_set))
-        return self.roads_list
-
+        self._buttons_key = key
+        # start screen: 2-4 players, 1-9 entangled pairs
+        self.num_player_buttons = [(i, pygame.Rect(w//2 - 105 + (i-2)*70, h//2 + 10, 60, 40)) for i in range(2, 5)]
+        self.entanglement_buttons = [(i, pygame.Rect(w//2 - 315 + (i-1)*70, h//2 + 130, 60, 40)) for i in range(1, 10)]
+        self.start_button = pygame.Rect(w//2 - 90, h//2 + 250, 180, 40)
+        self.hits.set("start", "buttons", [(r, LAYER_BUTTON, "players", i) for i, r in self.num_player_buttons]
+                      + [(r, LAYER_BUTTON, "pairs", i) for i, r in self.entanglement_buttons]
+                      + [(self.start_button, LAYER_BUTTON, "start", None)])
+        self.restart_button = pygame.Rect(w//2 - 105, h//2 + 200, 210, 40)
+        self.hits.set("game_over", "buttons", [(self.restart_button, LAYER_BUTTON, "restart", None)])
+        # game screen
+        self.reset_rect = pygame.Rect(20, 20, 120, 40)
+        self.dice_rect = pygame.Rect(20, 70, 120, 40)
+        self.devMode_rect = pygame.Rect(150, 20, 120, 40)
+        self.inspect_rect = pygame.Rect(280, 20, 120, 40)
+        self.end_turn_rect = pygame.Rect(20, h - 66, 120, 44)
+        self.trade_rect = pygame.Rect(w - 190, 340, 80, 20)
+        # these three belong to the trade panel, which registers them while it shows them
+        self.sendTrade_rect = pygame.Rect(w - 220, 500, 140, 20)
+        self.acceptTrade_rect = pygame.Rect(w - 250, 520, 140, 20)
+        self.declineTrade_rect = pygame.Rect(w - 100, 520, 140, 20)
+        buttons = [(self.reset_rect, "reset"), (self.dice_rect, "roll"), (self.inspect_rect, "inspect"),
+                   (self.end_turn_rect, "end_turn"), (self.trade_rect, "trade")]
+        if self.devMode == False:
+            buttons.append((self.devMode_rect, "dev_mode"))
+        self.hits.set("game", "buttons", [(r, LAYER_BUTTON, action, None) for r, action in buttons])
+
+    def on_screen(self, pos, pad=30):
+        x, y = pos
+        return -pad < x < self.screen.get_width() + pad and -pad < y < self.screen.get_height() + pad
+
+    def _tiles_around(self, pos):
+        """land tiles in and next to the hex under pos, the nearest tile, corner or edge is one of theirs"""
+        q, r = pixel_to_hex(pos[0], pos[1], self.hex_size, self.origin)
+        index = self.topology.tile_index
+        around = [(q, r)] + [(q+dq, r+dr) for dq, dr in HEX_DIRECTIONS]
+        return [index[c] for c in around if c in index]
+
+    def reset_game(self, board=None):
+        super().reset_game(board)
+        self._layout_key = None
+        # button rects (and dev mode's button) are laid out again on the next layout_buttons()
+        self._buttons_key = None
+        # panel rects are handed out by the panels when they draw
+        self.shop_rects = []
+        self.dev_card_rects = []
+        self.trading_partners_rects = []  # list of rects for clicking
+        self.possible_victims_rects = []  # list of rects for clicking
+        
+        self.plusSignRects = []
+        self.minusSignRects = []
+        # the mixer is only started once the first game begins
+        if pygame.mixer.get_init() is None:
+            try:
+                pygame.mixer.init()
+            except pygame.error:
+                pass
+        ASSETS.play_music(MUSIC_PATH, volume=0.2)
 
-    def _compute_road_mids(self):
-        # recompute from current intersections and roads
-        road_list = self._compute_roads_list()
-        mids = []
-        for a,b in road_list:
-            ax,ay = self.intersections[a]
-            bx,by = self.intersections[b]
-            mids.append(((ax+bx)/2, (ay+by)/2))
-        self.road_list = road_list
-        #print(mids)
-        return mids
+    def end_turn(self):
+        super().end_turn()
+        self.trading_partners_rects = []
+        self.possible_victims_rects = []
 
-    def _assign_ports_to_vertices(self):
-        mapping = {}
-        for i, st in enumerate(self.sea_tiles):
-            c = self.sea_centers[i]
-            road = self.roads_list[self.find_nearest_road(c)]
-            print(road)
-            mapping[i] = road
-            
-        print(mapping)         
-        return mapping
+    def update(self, dt):
+        self.layout_buttons()
+        super().update(dt)
 
     # gameplay helpers
+    # the pick distances are for 50 pixel hexes and shrink or grow with the zoom. They stay below a
+    # hex size, so the tiles around the mouse (_tiles_around) hold every candidate
     def find_nearest_intersection(self, pos, max_dist=48):
+        self._update_layout()
         x,y = pos
         best = None
-        bd = max_dist
-        for i,(ix,iy) in enumerate(self.intersections):
-            d = math.hypot(ix-x, iy-y)
-            if d < bd:
-                bd = d
-                best = i
+        bd = max_dist * self.hex_size / BOARD_HEX_SIZE
+        for ti in self._tiles_around(pos):
+            for i in self.hex_vertex_indices[ti]:
+                ix, iy = self.intersections[i]
+                d = math.hypot(ix-x, iy-y)
+                if d < bd or (d == bd and best is not None and i < best):
+                    bd = d
+                    best = i
         return best
 
     def find_nearest_road(self, pos, max_dist=48):
+        self._update_layout()
         x,y = pos
         best = None
-        bd = max_dist
-        roads = self._compute_roads_list()
-        for i,(a,b) in enumerate(roads):
-            ax,ay = self.intersections[a]; bx,by = self.intersections[b]
-            mx,my = (ax+bx)/2, (ay+by)/2
-            d = math.hypot(mx-x, my-y)
-            if d < bd:
-                bd = d
-                best = i
+        bd = max_dist * self.hex_size / BOARD_HEX_SIZE
+        road_index = self.topology.road_index
+        for ti in self._tiles_around(pos):
+            corners = self.hex_vertex_indices[ti]
+            for k in range(6):
+                a, b = corners[k], corners[(k+1) % 6]
+                i = road_index[(a, b) if a < b else (b, a)]
+                ax,ay = self.intersections[a]; bx,by = self.intersections[b]
+                mx,my = (ax+bx)/2, (ay+by)/2
+                d = math.hypot(mx-x, my-y)
+                if d < bd or (d == bd and best is not None and i < best):
+                    bd = d
+                    best = i
         return best
 
     def find_nearest_tile(self, pos, max_dist=60):
         """
         Returns the index of the tile whose center is closest to the mouse position.
-        If no tile is within max_dist pixels, returns None.
+        If no tile is within max_dist pixels (at the standard hex size), returns None.
         """
+        self._update_layout()
         x, y = pos
         best_idx = None
-        dist = max_dist
+        dist = max_dist * self.hex_size / BOARD_HEX_SIZE
 
-        for i, (cx, cy) in enumerate(self.centers):
+        for i in self._tiles_around(pos):
+            cx, cy = self.centers[i]
             d = math.hypot(cx - x, cy - y)
-            if d < dist:
+            if d < dist or (d == dist and best_idx is not None and i < best_idx):
                 dist = d
                 best_idx = i
 
         return best_idx
 
-    def can_place_settlement(self, v_idx):
-        # check adjacent roads
-        if v_idx not in self.settlements_owner and all(n not in self.settlements_owner for n in self.vertex_neighbors.get(v_idx, [])):
-            if self.round >= 2 and self.devMode == False:
-                for neighbor in self.vertex_neighbors.get(v_idx, []):
-                    adjacent_edge = tuple(sorted((v_idx, neighbor)))
-                    if adjacent_edge in self.roads_owner and self.roads_owner[adjacent_edge] == self.current_player:
-                        return True
-            else:
-                return True
-        return False
-
-    def can_upgrade_to_city(self, player_idx, v_idx):
-        owner = self.settlements_owner.get(v_idx)
-        return owner is not None and owner[0] == player_idx and owner[1] == "settlement"
-
-    def can_place_road_slot(self, road_idx):
-        roads = self._compute_roads_list()
-        if road_idx is None or road_idx >= len(roads):
-            return False
-        edge = tuple(roads[road_idx])
-        #print(edge)
-        #check if adjacent to existing road or settlement of current player
-        if self.round >=2:
-            if edge not in self.roads_owner:
-                for vertex in edge:
-                    # check adjacent settlements
-                    owner = self.settlements_owner.get(vertex)
-                    if owner is not None and owner[0] == self.current_player:
-                        return True
-                    # check adjacent roads
-                    for neighbor in self.vertex_neighbors.get(vertex, []):
-                        adjacent_edge = tuple(sorted((vertex, neighbor)))
-                        if adjacent_edge in self.roads_owner and self.roads_owner[adjacent_edge] == self.current_player:
-                            return True
-                return False
-            else: return False
-        else:
-            if edge not in self.roads_owner:
-                for vertex in edge:
-                    owner = self.settlements_owner.get(vertex)
-                    if owner is not None and vertex == self.last_settlement_pos and owner[0] == self.current_player:
-                        return True
-        return False
-
-    def player_can_afford(self, player_idx, item_key):
-        # use COSTS mapping minimal (recreate simple mapping)
-        COSTS = {
-            "road": {"lumber":1,"brick":1},
-            "settlement": {"lumber":1,"brick":1,"wool":1,"grain":1},
-            "city": {"grain":2,"ore":3},
-            "dev": {"wool":1,"grain":1,"ore":1}
-        }
-        cost = COSTS.get(item_key, {})
-        res = self.players[player_idx].resources
-        for k,v in cost.items():
-            if res.get(k,0) < v:
-                return False
-        return True
-
-    def player_buy(self, player_idx, item_key):
-        COSTS = {
-            "road": {"lumber":1,"brick":1},
-            "settlement": {"lumber":1,"brick":1,"wool":1,"grain":1},
-            "city": {"grain":2,"ore":3},
-            "dev": {"wool":1,"grain":1,"ore":1}
-        }
-        if not self.player_can_afford(player_idx, item_key):
-            return False
-        cost = COSTS[item_key]
-        for k,v in cost.items():
-            self.players[player_idx].resources[k] -= v
-        return True
-    
-    #check the best trade ratio (outputs either 2, 3, or 4 depending on ports the player is connected to)
-    def check_best_trade_ratio(self, resource):
-        best_trade_ratio = 4
-        for i, s_tile in enumerate(self.sea_tiles):
-            if s_tile["port"] != "sea":
-                for k in range(2):
-                    #print(self.port_vertex_map[i][k])
-                    if self.settlements_owner.get(self.port_vertex_map[i][k]) and self.settlements_owner.get(self.port_vertex_map[i][k])[0] == self.current_player:
-                        if s_tile["port"] == "port_any": 
-                            best_trade_ratio = 3
-                            print(best_trade_ratio)
-                        if s_tile["port"] == f"port_{resource}":
-                            best_trade_ratio = 2
-                            print(best_trade_ratio)
-                            return best_trade_ratio
-        print(best_trade_ratio)
-        return best_trade_ratio
-
-    def give_player_devcard(self, player_idx):
-        """a function that gives the current player a random devcard and adds it to the player's held_dev_card"""
-        random.shuffle(self.possible_cards)
-        if len(self.possible_cards) > 0:
-            card = self.possible_cards.pop()
-        else:
-            self.push_message("cards are empty")
-            return
-        self.players[player_idx].held_dev_cards[card] += 1
-        self.push_message(f"{self.players[player_idx].name} got a {card} card")
-    
-    def play_dev_card(self, player_idx, card_type):
-        """checks if the player has a dev card of that type, if so it removes one from the players inventory and adds it to
-        the players played_dev_cards and does the thing it need to do"""
-        # stops the function if the player has no such devcards
-        if self.players[player_idx].held_dev_cards.get(card_type) == 0:
-            self.push_message(f"No {card_type}cards in inventory")
-            return
-        # both should be True, else somthing is going on
-        if not self.devMode: 
-            if "placeDevCard" not in self.allowed_actions and self.has_placed_devcard:
-                self.push_message("already played a Devcard this turn")
-                return
-        # random debug line which im not sure if were ever gonna need
-            elif "placeDevCard" not in self.allowed_actions or self.has_placed_devcard:
-                self.push_message("ey check ff of dit goed gaat in de play_dev_cards functie")
-                return
-            self.allowed_actions.remove("placeDevCard")
-        # very important, can only be once per turn
-        self.has_placed_devcard = True
-        self.players[player_idx].held_dev_cards[card_type] -= 1
-        self.players[player_idx].played_dev_cards[card_type] += 1
-        
-        # gives the player a point
-        if card_type == "point":
-            self.players[player_idx].score += 1
-            self.push_message(f"{self.players[player_idx].name} received a point")           
-        # aplies knight card
-        elif card_type == "knight":
-            # adds to the players army
-            self.players[player_idx].knightmight += 1
-            self.push_message(f"{self.players[player_idx].name} has an army size of {self.players[player_idx].knightmight}")
-            # initiates the robber moving process
-            self.push_message("Please move the robber.")
-            self.check_for_greatest_knightmight()
-            self.moving_robber = True
-            if self.devMode == False: 
-                for k in self.allowed_actions:
-                    self.allowed_actions.remove(k)
-            return
-        elif card_type == "interference":
-            self.push_message("Please select the quantum tile of which you want to raise the propability for the left side")
-            self.push_message("The propability for right side of the corresponding tile will be raised")
-            self.interfering = True
-            if self.devMode == False: 
-                for k in self.allowed_actions:
-                    self.allowed_actions.remove(k)
-        elif card_type == "Monopoly":
-            self.push_message("Please type the first letter of the resource you would like to steal from the other players")
-            self.monopolysing = True
-        elif card_type == "Year of Plenty":
-            self.push_message("Please type the first letter of the resource you would like to recieve")
-            self.resources_to_collect = 2
-        elif card_type == "roadBuilding":
-            self.push_message("Place two roads")
-            self.sel = "road"
-            self.placing = self.sel
-            self.has_free_roads = True
-            self.roads_left_to_build = 2
-
-    def steal_every_ones_resource(self, choosen_resource, player_idx):
-        """import a resource and it checks for every player how many of that resource is in the inventory, they grab the resource and
-        add it to players inventory"""
-        amount_of_resources = 0
-        for n in range(len(self.players)):
-            if n != player_idx:
-                amount_of_resources += self.players[n].resources.get(choosen_resource)
-                self.players[n].resources[choosen_resource] = 0
-        self.players[player_idx].resources[choosen_resource] += amount_of_resources
-        self.push_message(f"{self.players[player_idx].name} has stolen everyone's {choosen_resource}")
-        self.push_message(f"{self.players[player_idx].name} has recieved {amount_of_resources} {choosen_resource}")
-        self.monopolysing = False
-
-    def check_for_greatest_knightmight(self):
-        """should check if a player already has the greatest knightmight, then if a player has a knightmight of three or greater
-        and should change this. if the knightmight changes, the variable should be set to false, two points should be reducted etc
-        """
-        highest_score = 0
-        highest_player_idx = None
-        already_has_knightmight = False
-        someone_wrongly_posseses_the_army = False
-        current_highest_army = 0
-        # finds the highest score and
-        for i,player in enumerate(self.players):
-            if player.knightmight > highest_score:
-                highest_score = player.knightmight
-                highest_player_idx = i
-            if player.has_greatest_knightmight:
-                current_highest_army = player.knightmight
-                current_highest_army_holder_idx = i
-        # makes sure the highest_player_idx matches the current holder's
-        if current_highest_army == highest_score:
-            highest_player_idx = current_highest_army_holder_idx
-        # checks if the highest player already has the biggest army, otherwise if another player has it, it stores that players index
-        for i,player in enumerate(self.players):
-            if player.has_greatest_knightmight and i == highest_player_idx:
-                already_has_knightmight = True
-            elif player.has_greatest_knightmight:
-                wrongly_possesses_biggest_army_idx = i
-                someone_wrongly_posseses_the_army = True
-        # in these cases nothing has to change
-        if already_has_knightmight or highest_score < 3:
-            return
-        # updates the scores of the involved players
-        self.players[highest_player_idx].has_greatest_knightmight = True
-        self.players[highest_player_idx].score += 2
-        self.push_message(f"{self.players[highest_player_idx].name} has aquired the biggest army, 2 added to score")
-        if someone_wrongly_posseses_the_army:
-            self.players[wrongly_possesses_biggest_army_idx].has_greatest_knightmight = False
-            self.players[wrongly_possesses_biggest_army_idx].score -= 2
-            self.push_message(f"{self.players[wrongly_possesses_biggest_army_idx].name} has lost the biggest army, 2 subtracted from score")
-
-    def place_settlement(self, v_idx, player_idx, typ="settlement"):
-        self.push_message(f"{self.players[player_idx].name} placed a settlement.")
-        self.settlements_owner[v_idx] = (player_idx, typ)
-        self.last_settlement_pos = v_idx
-        self.players[player_idx].buildables_placed["settlements"].append(v_idx)
-        self.players[player_idx].score += (1 if typ=="settlement" else 2)
-
-    def upgrade_to_city(self, v_idx, player_idx):
-        self.push_message(f"{self.players[player_idx].name} placed a city.")
-        self.settlements_owner[v_idx] = (player_idx, "city")
-        self.players[player_idx].buildables_placed["cities"].append(v_idx)
-        # city gives +1 score relative to settlement
-        self.players[player_idx].score += 1
-
-    def place_road(self, road_idx, player_idx):
-        self.push_message(f"{self.players[player_idx].name} placed a road.")
-        roads = self._compute_roads_list()
-        edge = tuple(roads[road_idx])
-        self.roads_owner[edge] = player_idx
-        self.players[player_idx].buildables_placed["roads"].append(road_idx)
-        
-        #check longest road update
-        roads_in_road = [edge]
-        longest_road = 1
-        for vertex in edge:
-            self.find_longest_road(vertex, roads_in_road, longest_road, player_idx)      
-        
-    def find_longest_road(self, vertex, roads_in_road, longest_road, player_idx):
-        for neighbor in self.vertex_neighbors.get(vertex, []):
-            adjacent_edge = tuple(sorted((vertex, neighbor)))
-            if adjacent_edge in self.roads_owner and self.roads_owner[adjacent_edge] == self.current_player and adjacent_edge not in roads_in_road:
-                roads_in_road.append(adjacent_edge)
-                for v in adjacent_edge:
-                    if v != vertex:
-                        self.find_longest_road(v, roads_in_road, longest_road, player_idx)
-                        roads_in_road.pop()
-            else:
-                if len(roads_in_road) > longest_road:
-                    longest_road = len(roads_in_road)
-        if longest_road >= 5:
-            if self.longest_road is None or longest_road > self.longest_road[1]:
-                if self.longest_road is not None and self.longest_road[0] == player_idx:
-                    self.push_message(f"{self.players[player_idx].name} has increased their Longest Road to length {longest_road}!")
-                elif self.longest_road is not None:
-                    prev_player_idx = self.longest_road[0]
-                    self.push_message(f"{self.players[player_idx].name} takes Longest Road from {self.players[prev_player_idx].name} with length {longest_road}!")
-                    self.players[prev_player_idx].score -= 2
-                    self.players[player_idx].score += 2
-                else:
-                    self.push_message(f"{self.players[player_idx].name} has claimed Longest Road with length {longest_road}!")
-                    self.players[player_idx].score += 2
-                self.longest_road = (player_idx, longest_road)
-                 
-    def give_initial_settlement_resources(self, v_idx, player_idx):
-        # give resources from adjacent tiles to player
-        adjacent_tiles = []
-        for ti, hex_vidxs in enumerate(self.hex_vertex_indices):
-            if v_idx in hex_vidxs:
-                adjacent_tiles.append(ti)
-        for ti in adjacent_tiles:
-            tile = self.tiles[ti]
-            res = tile.get('resource')
-            #print(res)
-            if res and res != "desert":
-                self.players[player_idx].resources[res] += 1
-                self.push_message(f"{self.players[player_idx].name} received 1 {res} from initial settlement.")
-            if tile.get("quantum", False):
-                token = {"type":"entangled","group":tile["ent_group"], "possible": tile.get("superposed")[:], "tile_coord": tile['coord']}
-                token["from_tile_idx"] = ti
-                self.players[player_idx].tokens.append(token)
-                self.push_message(f"{self.players[player_idx].name} received one superposed token from initial settlement.")
-
-    # dice & distribution using quantum tokens
-    def roll_and_distribute(self, number):
-        #print("Rolling dice and distributing resources...")
-        self.moving_robber = False
-        self.activated_settlements = []
-        if self.devMode == False: self.allowed_actions.remove("rolling")
-        roll = 0
-        self.milliseconds_passed_at_roll = self.milliseconds_passed
-        if number == None: 
-            roll = random.randint(1,6) + random.randint(1,6) 
-        else: 
-            roll = int(number)
-        self.push_message(f"Dice rolled: {roll}")
-        self.last_roll = roll
-        if roll == 7:
-            self.push_message("Please move the robber.")
-            self.moving_robber = True
-            if self.devMode == False: 
-                for k in self.allowed_actions:
-                    self.allowed_actions.remove(k)
-            return
-        else:
-            if self.devMode == False: 
-                for k in ("endTurn", "trading", "building", "placeDevCard"):
-                    self.allowed_actions.append(k)
-
-        # collect tokens or classical resources to players
-        # for each tile: if its number matches roll:
-        for ti,tile in enumerate(self.tiles):
-            if tile.get("number") == roll:
-                #print(f"Tile at coord: {tile.get('coord')} activated for roll {roll}.")
-                # skip robber tile
-                if ti == getattr(self, "robber_idx", None):
-                    #print("Robber present, no resources distributed from this tile.")
-                    continue
-                # for each adjacent vertex, give token or resource to owner
-                for v in self.hex_vertex_indices[ti]:
-                    owner = self.settlements_owner.get(v)
-                    #print(owner)
-                    if owner:
-                        player_idx, typ = owner
-                        amt = 2 if typ == "city" else 1
-                        if typ == "settlement": self.activated_settlements.append(v)
-                        else: self.activated_cities.append(v)
-                        if tile.get("quantum", False):
-                            #print(f"Tile is quantum, giving token to Player {player_idx}.")
-                            token = {"type":"entangled","group":tile["ent_group"], "possible": tile.get("superposed")[:], "tile_coord": tile['coord']}
-                            # store token with player
-                            token["from_tile_idx"] = ti
-                            for k in range(amt):
-                                self.players[player_idx].tokens.append(token)
-                                #print(f"all resources of player are now: {self.players[player_idx].resources}. And all tokens of player are now: {self.players[player_idx].tokens}.")
-                                self.push_message(f"{self.players[player_idx].name} received one superposed token")
-                                #print(self.players[player_idx].tokens)
-                                    
-                        else:
-                            # classical payout
-                            #print(f"Tile is classical, giving resource to Player {player_idx}.")
-                            
-                            self.players[player_idx].resources[tile['resource']] += amt
-                            #print(f"Player {player_idx} received {amt} of {tile.get('resource')}.")
-                            #print(f"all resources of player are now: {self.players[player_idx].resources}. And all tokens of player are now: {self.players[player_idx].tokens}.")
-                            self.push_message(f"{self.players[player_idx].name} received {amt}: {tile.get('resource')}.")
-
-    
-    def steal_from_victim(self, thief_idx, victim_idx):
-        victim = self.players[victim_idx]
-        thief = self.players[thief_idx]
-        # gather all resources of victim
-        available_resources = [res for res, amt in victim.resources.items() if amt > 0]
-        if not available_resources:
-            self.push_message(f"{victim.name} has no resources to steal.")
-            return
-        stolen_resource = random.choice(available_resources)
-        victim.resources[stolen_resource] -= 1
-        thief.resources[stolen_resource] += 1
-        for k in ("endTurn", "trading", "building", "placeDevCard"):
-            self.allowed_actions.append(k)
-        self.push_message(f"{thief.name} stole 1 {stolen_resource} from {victim.name}.")
-
-    # robber movement: puts or breaks quantum state
-    def move_robber_to(self, tile_idx):
-        t = self.tiles[tile_idx]
-        self.robber_idx = tile_idx
-        if t.get("quantum", False) and t.get("ent_group") is not None:
-            self.unentangle_pair_of_quantum_tiles(t)
-            self.push_message(f"Robber moved to entangled quantum tile at index {tile_idx}, unentangling the pair.")
-            self.push_message("Now entangle a pair of normal tiles.")
-            self.entangling = True
-        else:
-            if self.devMode == False:
-                if not self.has_placed_devcard:
-                    for n in ("endTurn", "trading", "building", "placeDevCard"):
-                        self.allowed_actions.append(n)
-                else:
-                    for n in ("endTurn", "trading", "building"):
-                        self.allowed_actions.append(n)
-        #check if another player is on this tile and steal a resource
-        for v in self.hex_vertex_indices[tile_idx]:
-            owner = self.settlements_owner.get(v)
-            if owner and self.current_player not in owner:
-                owner_idx, btype = owner
-                if owner_idx not in self.possible_victims:
-                    self.possible_victims.append(owner_idx)
-    # switches a pair of normal tiles to a pair of entangeled tiles
-    def entangle_pair_of_normal_tiles(self, pair_of_tiles, ent_group_number, start=False):
-        """ A list with a two pairs needs to be passed in this function, next it checks with which of the 
-        tiles in the self.tiles list it matches and changes the atributes of the dictionary belonging to the tile in 
-        the self.tiles list, entgroup_number should come from the previous pair of entangled tiles.
-        Does assume the tiles are not quantum"""
-        
-        if self.devMode == False and start == False:
-            for n in ("endTurn", "trading", "building", "placeDevCard"):
-                self.allowed_actions.append(n)
-        # saves the resources of the normal tiles
-        resource1 = pair_of_tiles[0][1].get("resource")
-        resource2 = pair_of_tiles[1][1].get("resource")
-        # checks for every tile in the self.riles list if one of the given tiles equals it
-        for n in range(len(self.tiles)):
-            for idx, (i, tile) in enumerate(pair_of_tiles):
-                if tile == self.tiles[n]:
-                    # changes all the atributes of the tile in self.tiles
-                    self.tiles[n]["quantum"] = True
-                    self.tiles[n]["ent_group"] = ent_group_number
-                    self.tiles[n]["resource"] = None
-                    self.tiles[n]["distribution"] = 0.5
-                    self.tiles[n]["superposed"] = [resource1, resource2]
-                    
-
-
-    def unentangle_pair_of_quantum_tiles(self, robber_tile):
-        """same principle as the other function, assumes the two quantum tiles contained in the list have the 
-        same superposition and shit"""
-        # gets a list of the tiles which will change
-        pair_of_q_tiles = []
-        ent_group_number = robber_tile.get("ent_group")
-        #print(ent_group_number)
-        for tile in self.tiles:
-            if tile.get("ent_group") == ent_group_number:
-                    pair_of_q_tiles.append(tile)
-        # gets the superposed list from one of the tiles, other should match so no problem there            
-        possible_resources = robber_tile.get("superposed")[:]
-        possible_resources_lesser_dis = possible_resources[:]
-        possible_resources_greater_dis = possible_resources[:]
-        # modifies the possible resources to account for the distribution, by adding the first resourche a couple times
-        n = pair_of_q_tiles[0].get("distribution") / pair_of_q_tiles[1].get("distribution")
-        if n < 1:
-            amount_of_most_res = round(1/n)
-        else:
-            amount_of_most_res = round(n)
-        for i in range(amount_of_most_res - 1):
-            possible_resources_greater_dis.append(possible_resources_greater_dis[0])
-            possible_resources_lesser_dis.append(possible_resources_lesser_dis[1])
-
-        # shuffles the lists to create randomness   
-        random.shuffle(possible_resources_lesser_dis)
-        random.shuffle(possible_resources_greater_dis)
-
-        # idk MAURITS ZET NOTITIES NEER
-        self.unused_ent_group_numbers.append(ent_group_number)
-        
-        # checks for every tile in the self.tiles list if one of the given tiles equals it
-        already_used_resource = None
-        for n in range(len(self.tiles)):
-            for tile in pair_of_q_tiles:
-                if tile == self.tiles[n]:
-                    # changes all the atributes of the tile in self.tiles
-                    self.tiles[n]["quantum"] = False
-                    self.tiles[n]["ent_group"] = None
-                    # gives one tile one of the possible resources, the other the other resource
-                    if already_used_resource == None:
-                        if self.tiles[n].get("distribution") >= 0.49:
-                            already_used_resource = possible_resources_greater_dis.pop()
-                        else:
-                            already_used_resource = possible_resources_lesser_dis.pop()
-                        self.tiles[n]["resource"] = already_used_resource
-                    else:
-                        possible_res = possible_resources.pop()
-                        # makes sure the resource is different from the one already used 
-                        while possible_res == already_used_resource:
-                            possible_res = possible_resources.pop()
-                        self.tiles[n]["resource"] = possible_res
-                    del self.tiles[n]["superposed"]
-                    del self.tiles[n]["distribution"]
-        for player in self.players:
-            # checks all tokens of every player
-            for token in player.tokens[:]:
-                # if the token belonged to one of the unentangled tiles, it is removed
-                if token.get("group") == ent_group_number:
-                    #print(f"Token from tile {token.get("tile_coord")} belonging to entangled group {ent_group_number} has collapsed and is converted from Player {player.idx}'s inventory.")
-                    msg = player.add_resource(self.tiles[token.get("from_tile_idx")].get("resource"), self.screen)
-                    self.push_message(msg)
-                    player.tokens.remove(token)
-                    
-    def change_ditribution(self, chosen_tile):
-        """input the tile which's distribution will increase, this function will increase it's distribution
-        and decrease its pair's, also adds the allowed actions back"""
-        # finding both tiles and putting them in a list, also getting the index of the tile which will increase
-        group_id = chosen_tile.get("ent_group")
-        both_tiles = []
-        increase_tile_idx = None
-        for tile in self.tiles:
-            if tile.get("ent_group") == group_id:
-                both_tiles.append(tile) 
-                if tile == chosen_tile:
-                    increase_tile_idx = len(both_tiles) - 1
-        # finding the tile with the lesser distribution and extracting this
-        if both_tiles[0].get("distribution") <= both_tiles[1].get("distribution"):
-            lesser_idx = 0
-        else:
-            lesser_idx = 1
-        lesser_prob = both_tiles[lesser_idx].get("distribution")
-        # really smart way of changing the distribution values by finding through which number  
-        probnum = round(1/lesser_prob)
-        if probnum != 2:
-            for n in range(len(self.tiles)):    
-                for i,tile in enumerate(both_tiles):
-                    # the tile were are about to change is the tile which will increase in distribution
-                    if both_tiles[i] == self.tiles[n] and i == increase_tile_idx:
-                        if increase_tile_idx == lesser_idx:
-                            self.tiles[n]["distribution"] = (1 / (probnum -1))
-                        else:
-                            self.tiles[n]["distribution"] = ((probnum) / (probnum + 1))
-                        self.push_message(f"changed distribution of tile {self.tiles[n].get('coord')} ")
-                    # the tile we're about to change will decrease in distribution
-                    elif both_tiles[i] == self.tiles[n]:
-                        if increase_tile_idx == lesser_idx:
-                            self.tiles[n]["distribution"] = ((probnum-2) / (probnum -1))
-                        else:       
-                            self.tiles[n]["distribution"] = (1/(probnum + 1)) 
-                        self.push_message(f"changed distribution of tile {self.tiles[n].get('coord')} ")  
-        # its the first time getting changed so both distribution values are 0.5          
-        else:
-            for n in range(len(self.tiles)):    
-                for i,tile in enumerate(both_tiles):
-                    if both_tiles[i] == self.tiles[n] and i == increase_tile_idx:
-                        self.tiles[n]["distribution"] = probnum/(probnum+1)
-                        self.push_message(f"changed distribution of tile {self.tiles[n].get('coord')} ")
-                    elif both_tiles[i] == self.tiles[n]:
-                        self.tiles[n]["distribution"] = (1/(probnum+1))
-                        self.push_message(f"changed distribution of tile {self.tiles[n].get('coord')} ")
-        # reallows teh actions except Placedevcard
-        for n in ("endTurn", "trading", "building"):
-            self.allowed_actions.append(n)
-
     # draw everything (board + UI overlays)
-    def draw(self):
+    # now: the game time the frame shows, between two logic steps (see timestep.py), animations and
+    # message fades are drawn for that moment
+    def draw(self, now=None):
+        now = self.clock() if now is None else now
         s = self.screen
         s.fill(BG_COLOR)
-        # store some UI rects for UI handler
-        self.reset_rect = self.reset_rect
-        self.dice_rect = self.dice_rect
-        self.trade_rect = self.trade_rect
-        self.sendTrade_rect = pygame.Rect(self.screen.get_width()-220, 500, 140, 20)
-        self.acceptTrade_rect = pygame.Rect(self.screen.get_width()-250, 520, 140, 20)
-        self.declineTrade_rect = pygame.Rect(self.screen.get_width()-100, 520, 140, 20)
-        self.hex_size = 50 
-        self.origin = (self.screen.get_width()//2, self.screen.get_height()//2 - 10)
-        self.centers, self.polys = compute_centers_and_polys(self.origin, self.hex_size)
-        self.sea_centers, self.sea_polys = compute_sea_polys(self.origin, self.hex_size)
-        self.intersections = []
-        self._build_vertex_list()
+        self.layout_buttons()
+        self._update_layout()
         
         #s.blit(self.bgImage, (0,0))    
+        # only what is on screen is drawn (see camera.py), zoomed far out tiles lose their numbers
+        detailed = self.hex_size >= LOD_HEX_SIZE
+        outline = 3 if detailed else 1
         # sea
-        for i, s_tile in enumerate(self.sea_tiles):
+        for i in self.visible_sea:
+            s_tile = self.sea_tiles[i]
             color = (165,190,220) if s_tile.get("port") == "sea" else (150,170,210)
             pygame.draw.polygon(s, color, self.sea_polys[i])
-            pygame.draw.polygon(s, LINE_COLOR, self.sea_polys[i], 2)
+            pygame.draw.polygon(s, LINE_COLOR, self.sea_polys[i], min(2, outline))
 
+        # the pieces come pre-drawn at this hex size (sprites.py), number discs shrink with the hexes
+        sheet = SPRITES.sheet(self.hex_size)
         # land tiles
-        for i, tile in enumerate(self.tiles):
+        for i in self.visible_tiles:
+            tile = self.tiles[i]
             res = tile.get('resource')
             mapping = {"lumber":(120,180,80),"brick":(200,140,100),"wool":(160,210,140),"grain":(230,210,100),"ore":(140,140,170),"desert":(230,200,160)}
             if tile.get("quantum", False):
@@ -729,40 +254,36 @@ class GameState:
                 # because of the superposition the resources need to be pulled from the "superposed" part pf tile, next
                 #the color value will be paired
                 
-                res1 = tile.get("superposed")[0]
-                res2 = tile.get("superposed")[1]
-                col1 = mapping.get(res1,(200,200,200))
-                col2 = mapping.get(res2, (200,200,200))
-                # divides the hexagons in half and fills in both halves
-                lefthalf_polys = [self.polys[i][1],self.polys[i][2],self.polys[i][3],self.polys[i][4]]
-                righthalf_polys = [self.polys[i][4],self.polys[i][5],self.polys[i][0],self.polys[i][1]]
-                pygame.draw.polygon(s, col1, lefthalf_polys)
-                pygame.draw.polygon(s, col2, righthalf_polys)
+                superposed = tile.get("superposed")
+                if len(superposed) == 2:
+                    col1 = mapping.get(superposed[0],(200,200,200))
+                    col2 = mapping.get(superposed[1], (200,200,200))
+                    # divides the hexagons in half and fills in both halves
+                    lefthalf_polys = [self.polys[i][1],self.polys[i][2],self.polys[i][3],self.polys[i][4]]
+                    righthalf_polys = [self.polys[i][4],self.polys[i][5],self.polys[i][0],self.polys[i][1]]
+                    pygame.draw.polygon(s, col1, lefthalf_polys)
+                    pygame.draw.polygon(s, col2, righthalf_polys)
+                else:
+                    # bigger groups: the six corner wedges shared out over the resources
+                    for c in range(6):
+                        col = mapping.get(superposed[c * len(superposed) // 6], (200,200,200))
+                        pygame.draw.polygon(s, col, [self.centers[i], self.polys[i][c], self.polys[i][(c+1) % 6]])
                 
-                pygame.draw.polygon(s, LINE_COLOR, self.polys[i], 3)
+                pygame.draw.polygon(s, LINE_COLOR, self.polys[i], outline)
                 
 
             else:
                 col = mapping.get(res, (200,200,200))
                 pygame.draw.polygon(s, col, self.polys[i])
-                pygame.draw.polygon(s, LINE_COLOR, self.polys[i], 3)
+                pygame.draw.polygon(s, LINE_COLOR, self.polys[i], outline)
             # draw number
-            if tile.get("number") is not None:
-                font = getFont(18)
-                num_surf = font.render(str(tile["number"]), True, BLACK)
-                cx = sum(p[0] for p in self.polys[i]) / 6
-                cy = sum(p[1] for p in self.polys[i]) / 6
-                # white circle behind
-                pygame.draw.circle(s, WHITE, (int(cx), int(cy)), 18)
-                s.blit(num_surf, (cx - num_surf.get_width()/2, cy - num_surf.get_height()/2))
-        for tile in self.tiles:
-            if tile.get("quantum", False):
-                for i, t in enumerate(self.tiles):
-                    if t.get("ent_group") == tile.get("ent_group"):
-                        cx, cy = self.centers[i]
-                        group = t.get("ent_group")
-                        colour = ENT_NUMBER_COLOURS[group - 1]
-                        pygame.draw.circle(s, colour, (int(cx), int(cy)), 20, width=4)
+            if detailed and tile.get("number") is not None:
+                blit(s, sheet.number(tile["number"]), self.centers[i])
+        for group in self.tiles.groups():
+            ring = sheet.ring(ent_group_colour(group))
+            for i in self.tiles.group_members(group):
+                if i in self._visible_set:
+                    blit(s, ring, self.centers[i])
 
 
         #draw selection hexagon highlight
@@ -789,49 +310,45 @@ class GameState:
             if self.entangling and len(self.entangling_pair) == 1:
                 q, r = self.entangling_pair[0][1]["coord"]
                 selected_tile = self.entangling_pair[0][0]
-                self.unused_ent_group_numbers.sort()
-                pygame.draw.polygon(s, ENT_NUMBER_COLOURS[self.unused_ent_group_numbers[0]-1], self.polys[selected_tile], 5)
+                # the heap's first entry is the id the new pair will get
+                pygame.draw.polygon(s, ent_group_colour(self.unused_ent_group_numbers[0]), self.polys[selected_tile], 5)
 
         
         # draw roads
         for (a,b), owner in self.roads_owner.items():
             ax,ay = self.intersections[a]; bx,by = self.intersections[b]
+            if not (self.on_screen((ax,ay)) or self.on_screen((bx,by))):
+                continue
             pygame.draw.line(s, (60,40,20), (ax,ay), (bx,by), 10)
             pygame.draw.line(s, PLAYER_COLORS[owner], (ax,ay), (bx,by), 6)
 
 
         #draw port vertices
-        for i, s_tile in enumerate(self.sea_tiles):
+        for i in self.visible_sea:
+            s_tile = self.sea_tiles[i]
             if s_tile["port"] != "sea":
                 for k in range(2):
-                    size = 8
-                    for player in self.players:
-                        if self.settlements_owner.get(self.port_vertex_map[i][k]) and self.settlements_owner.get(self.port_vertex_map[i][k])[0] == player.idx:
-                            size = 16.5
-                    pygame.draw.circle(s, (0, 70, 100), (self.intersections[self.port_vertex_map[i][k]]) , size)
+                    v = self.port_vertex_map[i][k]
+                    # bigger once someone built on it
+                    blit(s, sheet.port(v in self.settlements_owner), self.intersections[v])
         #[0] + 0.3 * (self.sea_centers[i][0] - self.intersections[self.port_vertex_map[i][k]][0]), self.intersections[self.port_vertex_map[i][k]][1] + 0.3 * (self.sea_centers[i][1] - self.intersections[self.port_vertex_map[i][k]][1])
         
         # draw settlements
         for idx, (owner, typ) in self.settlements_owner.items():
             x,y = self.intersections[idx]
+            if not self.on_screen((x,y)):
+                continue
             col = PLAYER_COLORS[owner]
-            deltaseconds = (self.milliseconds_passed - self.milliseconds_passed_at_roll)/1000.0
-            if typ == "settlement":
-                pygame.draw.circle(s, col, (int(x), int(y)), 12)
-                pygame.draw.circle(s, BLACK, (int(x), int(y)), 2)
-                if deltaseconds < 0.5 and idx in self.activated_settlements:
-                    pygame.draw.circle(s, (255, 255, 0), (int(x), int(y)), 12, width=3)
-                elif deltaseconds >= 0.5 and deltaseconds < 1 and idx in self.activated_settlements:
-                    pygame.draw.circle(s, col, (int(x) + (self.screen.get_width()-200-int(x))/0.5*(deltaseconds-0.5), int(y) - (int(y)-100)/0.5*(deltaseconds-0.5)), 12)
-
-
-            else: # city
-                pygame.draw.rect(s, col, (x-13, y-13, 26, 26))
-                pygame.draw.rect(s, BLACK, (x-13, y-13, 26, 26), 2)
-                if deltaseconds < 0.5 and idx in self.activated_cities:
-                    pygame.draw.rect(s, (255, 255, 0), (x-13, y-13, 26, 26), width=3)
-                if deltaseconds >= 0.5 and deltaseconds < 1 and idx in self.activated_cities:
-                    pygame.draw.rect(s, col, (int(x) + (self.screen.get_width()-200-int(x))/0.5*(deltaseconds-0.5), int(y) - (int(y)-100)/0.5*(deltaseconds-0.5), 26, 26))
+            deltaseconds = (now - self.milliseconds_passed_at_roll)/1000.0
+            piece = sheet.settlement if typ == "settlement" else sheet.city
+            activated = self.activated_settlements if typ == "settlement" else self.activated_cities
+            if deltaseconds < 0.5 and idx in activated:
+                blit(s, piece(col, "active"), (x, y))
+            else:
+                blit(s, piece(col), (x, y))
+                if deltaseconds >= 0.5 and deltaseconds < 1 and idx in activated:
+                    # a copy flies to the inventory
+                    blit(s, piece(col), (int(x) + (self.screen.get_width()-200-int(x))/0.5*(deltaseconds-0.5), int(y) - (int(y)-100)/0.5*(deltaseconds-0.5)))
             
         # draw placement preview
         if self.placing and self.sel:
@@ -841,11 +358,8 @@ class GameState:
                 can_place = self.can_place_settlement(nearest) if self.sel == "settlement" else self.can_upgrade_to_city(self.current_player, nearest)
                 #print(can_place)
                 if nearest is not None:
-                    vx, vy = self.intersections[nearest]
-                    if self.sel == "settlement":
-                        pygame.draw.circle(s, PREVIEW_COLOR["good" if can_place else "bad"], (int(vx), int(vy)), 12, width=2)
-                    else:
-                        pygame.draw.rect(s, PREVIEW_COLOR["good" if can_place else "bad"], (vx-13, vy-13, 26, 26), width=2)
+                    piece = sheet.settlement if self.sel == "settlement" else sheet.city
+                    blit(s, piece(None, "good" if can_place else "bad"), self.intersections[nearest])
             elif self.sel == "road":
                 nearest = self.find_nearest_road((mouse_x, mouse_y))
                 can_place = self.can_place_road_slot(nearest)
@@ -858,147 +372,26 @@ class GameState:
         
         # UI panels (basic)
         
-        # inventory panel
-        ix = self.screen.get_width() - 240
-        #s.blit(self.board, (ix-68, -80))
-        pygame.draw.rect(s, PANEL_BG, (ix, 5, 235, 330), border_radius=8)
-        font = getFont(16)
-        title = font.render(f"P{self.current_player+1}  (Score = {self.players[self.current_player].score})", True, PLAYER_COLORS[self.current_player])
-        #f"You have longest road of: {self.longest_road[1]} long" if self.longest_road is not None and self.longest_road[0] == self.current_player else ""
-        s.blit(title, (ix+10, 10))
-        sub = getFont(16).render("Inventory:", True, TEXT_COLOR)
-        s.blit(sub, (ix+10, 36))
-        # show resources
-        for i,res in enumerate(["lumber","brick","wool","grain","ore"]):
-            if self.tradingAddedResources[res] == 0:
-                txt = getFont(14).render(f"{res.capitalize()}: {self.players[self.current_player].resources.get(res,0)}", True, TEXT_COLOR)
-            elif self.tradingAddedResources[res] < 0:
-                txt = getFont(14).render(f"{res.capitalize()}: {self.players[self.current_player].resources.get(res,0)} ({self.tradingAddedResources[res]})", True, TEXT_COLOR)
-            else:
-                txt = getFont(14).render(f"{res.capitalize()}: {self.players[self.current_player].resources.get(res,0)} (+{self.tradingAddedResources[res]})", True, TEXT_COLOR)
-            s.blit(txt, (ix+12, 60 + i*20))
-            
-            #trading buttons
-            if self.trading and self.trading_partner is not None:
-                plusSign = pygame.Rect(ix+170, 60 + i*20, 25, 18)
-                if not any(k[0] == plusSign for k in self.plusSignRects):
-                    self.plusSignRects.append((plusSign, res)) 
-                minusSign = pygame.Rect(ix+200, 60 + i*20, 25, 18)
-                if self.players[self.current_player].resources.get(res,0) > 0:
-                    if not any(k[0] == minusSign for k in self.minusSignRects):
-                        self.minusSignRects.append((minusSign, res))
-                pygame.draw.rect(s, (150, 100, 100) if "accepting_trade" not in self.allowed_actions else (100, 100, 100), plusSign, border_radius=6)#if getting robbed, resource greyed out
-                pygame.draw.rect(s, (150, 200, 200) if self.players[self.current_player].resources.get(res,0) + self.tradingAddedResources[res] > 0 and "accepting_trade" not in self.allowed_actions else (100, 100, 100), minusSign, border_radius=6) #cannot go under 0
-                draw_text(s, "+", ix+175,  60 + i*20, size=14, color=BLACK)
-                draw_text(s, "-", ix+205,  60 + i*20, size=14, color=BLACK)
-        # show tokens
-        tokensMessage = getFont(16).render(f"Tokens: ({len(self.players[self.current_player].tokens)})" + f"(18 shown)" if len(self.players[self.current_player].tokens)>18 else f"Tokens: ({len(self.players[self.current_player].tokens)})", True, TEXT_COLOR)
-        s.blit(tokensMessage, (ix+12, 170))
-        for i, token in enumerate(self.players[self.current_player].tokens if len(self.players[self.current_player].tokens)<=18 else self.players[self.current_player].tokens[-18:]):
-            dis = round((self.tiles[token.get("from_tile_idx")].get("distribution") if self.tiles[token.get("from_tile_idx")].get("quantum", False) else 1.0), 2)
-            possibleOne = str(token.get("possible")[0])
-            possibleTwo = str(token.get("possible")[1])
-            size = 14
-            distance = 20
-            if len(self.players[self.current_player].tokens) > 6:
-                size = 12
-                distance = 16
-                if len(self.players[self.current_player].tokens) > 9:
-                    size = 10
-                    distance = 12
-                    if len(self.players[self.current_player].tokens) > 12:
-                        size = 8
-                        distance = 8
-            txt = getFont(size).render(f"{possibleOne.capitalize()}: {dis}, {possibleTwo.capitalize()}: {round(1-dis, 2)}", True, TEXT_COLOR)
-            s.blit(txt, (ix+12, 190 + i*distance))
-            
-            
-        #dev cards at bottom of screen
-        helddevcards = []
-        for cardType in ("knight", "point", "interference", "Year of Plenty", "Monopoly", "roadBuilding"):
-            for i in range(self.players[self.current_player].held_dev_cards[cardType]):
-                helddevcards.append(cardType)
-        ixdev = self.screen.get_width()/2 - (len(helddevcards) * 110)/2
-        self.dev_card_rects = []
-        for i, card in enumerate(helddevcards):
-            addingDev = [pygame.Rect(ixdev + i*110, self.screen.get_height() - 60, 100, 60), card]
-            if addingDev not in self.dev_card_rects:
-                self.dev_card_rects.append(addingDev)
-            pygame.draw.rect(s, DEV_CARD_COLORS[card], self.dev_card_rects[i][0], border_radius=8)
-            draw_text(s, helddevcards[i].replace("point","Victory Point").replace("Year of Plenty","Year of Plenty").replace("roadBuilding","Road Building").capitalize(), ixdev + i*110 + 50, self.screen.get_height() - 50, size=12, color=WHITE, centered=True)
-        
-        #trading / robber stealing panel
-        if self.possible_victims or self.trading:
-            selectBrightFactor = 1.2
-            hoverBrightFactor = 1.1
-            self.possible_trading_partners = []
-            self.trading_partners_rects = []
-            self.possible_victims_rects = []
-            pygame.draw.rect(s, PANEL_BG, (ix, 360, 235, 160), border_radius=8)
-            if self.possible_victims:
-                draw_text(s, "Steal from:", ix+10, 365, size=16)
-                for i, pidx in enumerate(self.possible_victims):
-                    addingRect = pygame.Rect(ix+10, 390 + i*20, 215, 18)
-                    self.possible_victims_rects.append(addingRect)
-                    pygame.draw.rect(s, self.players[pidx].color, self.possible_victims_rects[i], border_radius=6)
-                    draw_text(s, f"{self.players[pidx].name}", ix+12, 388 + i*20, size=14, color=WHITE)
-            elif self.trading:
-                draw_text(s, "Trade with:", ix+10, 365, size=16)
-                k = 0
-                if "accepting_trade" not in self.allowed_actions:
-                    self.possible_trading_partners.append("bank/port")
-                    self.trading_partners_rects.append(pygame.Rect(ix+10, 390 + k*20, 215, 18))
-                    pygame.draw.rect(s, (250, 250, 250) if self.trading_partner == 'bank/port' else (200, 200, 200) if self.trading_partners_rects[0].collidepoint(pygame.mouse.get_pos())   else (150, 150, 150) , self.trading_partners_rects[0], border_radius=6)
-                    draw_text(s, f"Bank/port", ix+12, 388 + k*20, size=14, color=BLACK)
-                    k+=1
-                for i in range(len(self.players)):
-                    if i == self.current_player:
-                        continue
-                    else:
-                        colour = self.players[i].color
-                        if len(self.trading_partners_rects) >= k+1 and self.trading_partners_rects[k].collidepoint(pygame.mouse.get_pos()):
-                            colour = tuple([hoverBrightFactor*x for x in self.players[i].color])
-                        if self.trading_partner == self.players[i].idx:
-                            colour = tuple([selectBrightFactor*x for x in self.players[i].color])
-                        if self.players[i].idx not in self.possible_trading_partners:
-                            self.possible_trading_partners.append(self.players[i].idx)
-                            self.trading_partners_rects.append(pygame.Rect(ix+10, 390 + (k)*20, 215, 18))
-                        pygame.draw.rect(s, colour, self.trading_partners_rects[k], border_radius=6)
-                        draw_text(s, f"{self.players[i].name}", ix+12, 388 + (k)*20, size=14, color=WHITE)
-                        k+=1
-                """print(self.trading_partner)
-                print(self.tradingAddedResources)"""
-                if "accepting_trade" in self.allowed_actions:
-                    pygame.draw.rect(s, (150, 200, 100) if all(self.tradingAddedResources[k] + self.players[self.current_player].resources[k] >= 0 for k in ("lumber","brick","wool","grain","ore")) else (100, 100, 100), self.acceptTrade_rect, border_radius=6)
-                    draw_text(s, f"Accept Trade", self.acceptTrade_rect.x+1, self.acceptTrade_rect.y +1, size=14, color=WHITE)
-                    pygame.draw.rect(s, (150, 0, 50), self.declineTrade_rect, border_radius=6)
-                    draw_text(s, f"Decline Trade", self.declineTrade_rect.x+1, self.declineTrade_rect.y +1, size=14, color=WHITE)
-                elif self.trading_partner is not None and any(self.tradingAddedResources[k] != 0 for k in ("lumber","brick","wool","grain","ore")):
-                    pygame.draw.rect(s, (150, 200, 100), self.sendTrade_rect, border_radius=6)
-                    draw_text(s, f"Send Offer", self.sendTrade_rect.x+1, self.sendTrade_rect.y +1, size=14, color=WHITE)
-            else:
-                self.trading_partner = None
+        # inventory and tokens, dev cards, trade/steal panel: cached, redrawn only when what they show changed (panels.py)
+        for panel in self.panels:
+            panel.draw(s, self)
         #trading button:
-        self.trade_rect = pygame.Rect(self.screen.get_width() - 190, 340, 80, 20)
-        pygame.draw.rect(s, ((150,100,200) if "trading" in self.allowed_actions  or self.devMode == True else (128, 128, 128)), self.trade_rect, border_radius=6)
+        pygame.draw.rect(s, ((150,100,200) if self.turn.allows(Action.TRADE)  or self.devMode == True else (128, 128, 128)), self.trade_rect, border_radius=6)
         draw_text(s, "Trade", self.trade_rect.x+16, self.trade_rect.y+2, size=14, color=WHITE)
         
         # top-left buttons
         pygame.draw.rect(s, BUTTON_COLOR, self.reset_rect, border_radius=8)
         draw_text(s, "Reset", self.reset_rect.x+16, self.reset_rect.y+6, size=18, color=WHITE)
-        pygame.draw.rect(s, ((100,100,200) if "rolling" in self.allowed_actions or self.devMode == True else (128, 128, 128)) , self.dice_rect, border_radius=8)
+        pygame.draw.rect(s, ((100,100,200) if self.turn.allows(Action.ROLL) or self.devMode == True else (128, 128, 128)) , self.dice_rect, border_radius=8)
         draw_text(s, "Roll Dice", self.dice_rect.x+12, self.dice_rect.y+8, size=18, color=WHITE)
-        self.devMode_rect = pygame.Rect(150, 20, 120, 40)
         if self.devMode == False: pygame.draw.rect(s, (150, 110, 160), self.devMode_rect, border_radius=8)
         if self.devMode == False: draw_text(s, "DevMode", self.devMode_rect.x+12, self.devMode_rect.y+8, size=18, color=WHITE)
         
-        self.inspect_rect = pygame.Rect(280, 20, 120, 40)
         pygame.draw.rect(s,  (150*1.2, 110*1.2, 160*1.2)if self.inspecting else (150, 110, 160), self.inspect_rect, border_radius=8)
         draw_text(s, "Inspect", self.inspect_rect.x+12, self.inspect_rect.y+8, size=18, color=WHITE)
         
         #End Turn button
-        self.end_turn_rect = pygame.Rect(20, self.screen.get_size()[1] - 66, 120, 44)
-        pygame.draw.rect(s, ((80,150,90) if "endTurn" in self.allowed_actions or self.devMode == True else (128, 128, 128)), self.end_turn_rect, border_radius=8)
+        pygame.draw.rect(s, ((80,150,90) if self.turn.allows(Action.END_TURN) or self.devMode == True else (128, 128, 128)), self.end_turn_rect, border_radius=8)
         draw_text(s, "End Turn", self.end_turn_rect.x+12, self.end_turn_rect.y+8, size=18, color=WHITE)
         
         
@@ -1007,47 +400,8 @@ class GameState:
 
 
         # shop
-        sx, sy = self.screen.get_width()-245, self.screen.get_height()-210
-        pygame.draw.rect(s, PANEL_BG, (sx, sy, 240, 180), border_radius=8)
-        draw_text(s, "Shop", sx+10, sy+8, size=18)
-        # populate shop rects and store them in state
-        self.shop_rects = []
-        opts = [("road","Road (1L, 1B)"),("settlement","Settlement (1L, 1B, 1W, 1G)"),("city","City (2G, 3O)"),("dev","Dev Card (1W, 1G, 1O)")]
-        selectBrightFactor = 1.2
-        hoverBrightFactor = 1.1
-        
         self.required_placed = self.num_players*self.round + self.current_player+1
-         
-        for i,(k,l) in enumerate(opts):
-            r = pygame.Rect(sx+10, sy+40 + i*36, 200, 30)
-            colour = (128, 128, 128)
-            
-            if self.round < 2:
-                if k == "settlement":
-                    if self.settlements_placed == 0:
-                        colour = self.players[self.current_player].color
-                        if r.collidepoint(pygame.mouse.get_pos()):
-                            colour = tuple([hoverBrightFactor*x for x in self.players[self.current_player].color])
-                elif k == "road":
-                    if self.settlements_placed == 1:
-                        if self.roads_placed == 0:
-                            colour = self.players[self.current_player].color
-                            if r.collidepoint(pygame.mouse.get_pos()):
-                                colour = tuple([hoverBrightFactor*x for x in self.players[self.current_player].color])
-            elif self.player_can_afford(self.current_player, k):
-                if "building" in self.allowed_actions or self.devMode == True:
-                    colour = self.players[self.current_player].color
-                    if k == "dev" and self.possible_cards == []:
-                        colour = (128, 128, 128)
-                    if r.collidepoint(pygame.mouse.get_pos()):
-                        colour = tuple([hoverBrightFactor*x for x in self.players[self.current_player].color])
-            
-            if self.sel == k:
-                colour = tuple([selectBrightFactor*x for x in self.players[self.current_player].color])
-                    
-            pygame.draw.rect(s, colour, r, border_radius=6)
-            draw_text(s, f"{l}", r.x+8, r.y+6, size=14, color=WHITE)
-            self.shop_rects.append((k,r))
+        self.shop_panel.draw(s, self)
 
         # small dice last roll text
         if hasattr(self, "last_roll") and self.last_roll is not None:
@@ -1055,17 +409,14 @@ class GameState:
 
         # port info overlay small
         # draw port markers
-        for i, st in enumerate(self.sea_tiles):
+        for i in (self.visible_sea if detailed else ()):
+            st = self.sea_tiles[i]
             if st.get("port") != "sea":
-                cx = sum(p[0] for p in self.sea_polys[i]) / 6
-                cy = sum(p[1] for p in self.sea_polys[i]) / 6
-                txt = getFont(12).render(st["port"].replace("port_","").upper(), True, BLACK)
-                s.blit(txt, (cx - txt.get_width()/2, cy - txt.get_height()/2))
+                blit(s, sheet.port_label(st["port"]), self.sea_centers[i])
         
         #draw robber
-        if self.robber_idx is not None:
-            cx, cy = self.centers[self.robber_idx]
-            pygame.draw.circle(s, BLACK, (int(cx), int(cy)), 24, width=8)
+        if self.robber_idx is not None and self.robber_idx in self._visible_set:
+            blit(s, sheet.robber(), self.centers[self.robber_idx])
 
         
 
@@ -1085,7 +436,7 @@ class GameState:
             start_y = 130
             for i, (text, expiry) in enumerate(to_draw):
                 # fade based on remaining time
-                remaining = expiry - pygame.time.get_ticks()
+                remaining = expiry - now
                 alpha = max(0, min(255, int(255 * (remaining / 4000.0))))
                 # create a temporary surface to render text with alpha
                 font = getFont(14)
@@ -1108,37 +459,29 @@ class GameState:
         else:
             img_W = 460
             img_H = 3
-        self.num_player_buttons = []
-        self.entanglement_buttons = []
-        self.start_button = self.start_button
-        # finds the image and reforms it
-        img = pygame.image.load("../img/QuatanLogo.png")
-        image_size = (600,400)
-        reformed_img = pygame.transform.scale(img, image_size)
+        self.layout_buttons()
+        # the scaled logo is cached by the asset manager, so it is only decoded once
+        reformed_img = ASSETS.image(LOGO_PATH, LOGO_SIZE)
         # draws the image
         self.screen.blit(reformed_img, (img_W, img_H))
         #draw_text(s, "Quantum Catan", W//2, H//4, size=48, color=TEXT_COLOR, centered=True)
         draw_text(s, "Select number of players:", W//2, H//2 - 40, size=24, color=TEXT_COLOR, centered=True)
         # draw buttons for 2-4 players
-        for i in range(2,5):
+        for i, r in self.num_player_buttons:
             if self.num_players == i:
                 button_color = (100, 200, 100)
             else:
                 button_color = BUTTON_COLOR
-            r = pygame.Rect(W//2 - 105 + (i-2)*70, H//2 + 10, 60, 40)
             pygame.draw.rect(s, button_color, r, border_radius=8)
             draw_text(s, str(i), r.x + 22, r.y + 8, size=24, color=WHITE)
-            self.num_player_buttons.append((i,r))
         draw_text(s, "Select number of entanglements:", W//2, H//2 + 80, size=24, color=TEXT_COLOR, centered=True)
-        for i in range(1,10):
+        for i, r in self.entanglement_buttons:
             if self.num_entangled_pairs == i:
                 button_color = (100, 200, 100)
             else:
                 button_color = BUTTON_COLOR
-            r = pygame.Rect(W//2 - 315 + (i-1)*70, H//2 + 130, 60, 40)
             pygame.draw.rect(s, button_color, r, border_radius=8)
             draw_text(s, str(i), r.x + 22, r.y + 8, size=24, color=WHITE)
-            self.entanglement_buttons.append((i,r))
         draw_text(s, "Click start button to start the game.", W//2, H//2 + 200, size=18, color=TEXT_COLOR, centered=True)
         pygame.draw.rect(s, BUTTON_COLOR, self.start_button, border_radius=8)
         draw_text(s, "Start Game", self.start_button.x + 12, self.start_button.y + 8, size=24, color=WHITE)
@@ -1146,223 +489,16 @@ class GameState:
     def draw_game_over_screen(self):
         s = self.screen
         s.fill(BG_COLOR)
+        self.layout_buttons()
         draw_text(s, "Quantum Catan", W//2, H//4, size=48, color=TEXT_COLOR, centered=True)
-        winner = max(self.players, key=lambda p: p.score)
+        standings = self.scores.standings()
+        winner_idx = self.scores.winner if self.scores.winner is not None else standings[0]
+        winner = self.players[winner_idx]
         draw_text(s, f"Game Over! Winner: {winner.name} (Score: {winner.score})", W//2, H//2 - 40, size=24, color=TEXT_COLOR, centered=True)
         draw_text(s, "Final Scores:", W//2, H//2 + 10, size=20, color=TEXT_COLOR, centered=True)
-        for i, p in enumerate(sorted(self.players, key=lambda p: p.score, reverse=True)):
-            draw_text(s, f"{p.name}: {p.score}", W//2, H//2 + 50 + i*30, size=18, color=TEXT_COLOR, centered=True) 
+        for i, idx in enumerate(standings):
+            p = self.players[idx]
+            draw_text(s, f"{p.name}: {p.score}   ({self.scores.describe(idx)})", W//2, H//2 + 50 + i*30, size=18, color=TEXT_COLOR, centered=True)
         pygame.draw.rect(s, BUTTON_COLOR, self.restart_button, border_radius=8)
         draw_text(s, "Restart Game", self.restart_button.x + 12, self.restart_button.y + 8, size=24, color=WHITE)
         
-    def end_turn(self):
-        
-        self.trading = False
-        # for road build card
-        self.has_free_roads = False
-        self.roads_left_to_build = 0
-        self.resources_to_collect = 0
-        self.monopolysing = False
-        self.has_placed_devcard = False
-        self.trading_partner = None
-        self.possible_trading_partners = []
-        self.trading_partners_rects = []
-        self.possible_victims = []
-        self.possible_victims_rects = []
-        self.settlements_placed = 0
-        self.roads_placed = 0
-        self.push_message(f"{self.players[self.current_player].name} ended their turn.")
-        if self.round == 0:
-            if self.current_player == self.num_players -1:
-                self.push_message("First round of placement complete. Starting second round.") 
-                self.round += 1
-            else:
-                self.current_player += 1
-                
-        elif self.round == 1:
-            if self.current_player == 0:
-                self.push_message("Second round of placement complete. Starting second round.")
-                self.round += 1
-            else:
-                self.current_player -= 1
-        
-        else:
-            if self.current_player == self.num_players -1:
-                self.push_message("Turn cycle complete. Starting new round.")
-                self.current_player = 0
-                self.round += 1
-            else:
-                self.current_player = (self.current_player + 1) % self.num_players
-
-        if self.round >= 2:
-            if self.devMode == False: self.allowed_actions.append("rolling")
-            if self.devMode == False: self.allowed_actions.append("placeDevCard")
-        else:
-            if self.devMode == False: self.allowed_actions.append("building")
-        if self.devMode == False: 
-            for k in ("trading", "building", "endTurn", "placeDevCard"):
-                if k in self.allowed_actions:
-                    self.allowed_actions.remove(k)
-
-        self.last_roll = None
-
-    def reset_game(self):
-        self.round = 0
-        self.current_player = 0
-        self.allowed_actions = ["building"]
-        self.last_roll = None
-        
-        # initialize players
-        self.players = [Player(i) for i in range(self.num_players)]
-        for i,p in enumerate(self.players):
-            p.color = PLAYER_COLORS[i]
-            p.resources = {"lumber":0,"brick":0,"wool":0,"grain":0,"ore":0}
-            p.tokens = []
-        # geometry & tiles
-        self.unused_ent_group_numbers = [i+1 for i in range(10)]
-        self.tiles = randomize_tiles()
-        # randomly select 3 entangled pairs
-        #print(self.tiles)
-        self.sea_tiles = generate_sea_ring()
-        self.moving_robber = False
-        self.entangling = False
-        self.has_placed_devcard = False
-        self.interfering = False
-        self.entangling_pair = []
-        
-        # for road build devcard
-        self.has_free_roads = False
-        self.roads_left_to_build = 0
-        # for monopoly devcard
-        self.monopolysing = False
-        self.resources_to_collect = 0
-
-        self.settlements_placed = 0
-        self.roads_placed = 0
-        
-        self.trading = False
-        self.trading_partner = None  # player index or "bank/port"
-        self.possible_trading_partners = []  # list of player indices
-        self.trading_partners_rects = []  # list of rects for clicking
-        
-        self.victim = None  # player index to steal from
-        self.possible_victims = []  # list of (player_idx, building_type) adjacent to robber tile
-        self.possible_victims_rects = []  # list of rects for clicking
-        
-        self.placing = None  # whether in placement mode
-        self.sel = None
-        
-        # message/notification log (text, expires_at_ms)
-        self.message_log = []   # list of (text, expiry_timestamp_ms)
-        self.message_max = 6    # max messages shown
-
-        # build graph
-        _, self.hex_vertex_indices = compute_centers_and_polys(self.origin)
-        #print(self.hex_vertex_indices)
-        self.intersections = []  # create by extracting vertices in build_graphFrom polygons-like manner
-        self._build_vertex_list()
-        # derived
-        self.road_mids = self._compute_road_mids()
-        self.roads = self._compute_roads_list()
-        # owners
-        self.roads_owner = {}  # edge tuple -> player index
-        self.settlements_owner = {}  # vertex idx -> (player, type)
-        # adjacency for settlement placement
-        self.vertex_neighbors = compute_vertex_adjacency(self.hex_vertex_indices)
-        # ports map: sea index -> vertex indices it serves
-        self.port_vertex_map = self._assign_ports_to_vertices()
-        # robber
-        self.robber_idx = None
-        # UI rectangles (placeholders)
-        self.reset_rect = pygame.Rect(20,20,120,40)
-        self.dice_rect = pygame.Rect(20,70,120,40)
-        self.end_turn_rect = pygame.Rect(20, H-66, 120, 40)
-
-        self.trade_rect = pygame.Rect(W-220, 240, 80, 20)
-        
-        self.sendTrade_rect = pygame.Rect(W-220, 280, 80, 20)
-        self.acceptTrade_rect = pygame.Rect(W-220, 280, 80, 20)
-        self.declineTrade_rect = pygame.Rect(W-120, 280, 80, 20)
-        # shop rects are computed each draw
-        self.shop_rects = []
-        self.shop_rects = []
-        
-        self.plusSignRects = []
-        self.minusSignRects = []
-        
-        self.tradingAddedResources = {"lumber":0,"brick":0,"wool":0,"grain":0,"ore":0}
-        
-        self.inspecting = False
-        
-        self.devMode = False
-        self.last_settlement_pos = None
-        self.milliseconds_passed = 0
-        self.milliseconds_passed_at_roll = 0
-        self.activated_settlements = []
-        self.activated_cities = []
-        self.possible_cards = ["knight"] * 14 + ["point"] * 5 + ["interference"] * 14 + ["Year of Plenty"] * 3 + ["Monopoly"] * 3 + ["roadBuilding"] * 3
-        self.dev_card_rects = []
-        
-        self.longest_road = None
-        
-        pygame.mixer.music.load("../music/Quantum_Catan.wav")
-        pygame.mixer.music.play()
-        pygame.mixer.music.set_volume(0.2)
-        
-        """
-        self.bgImage = pygame.image.load("QuantumCatan/img/bg.jpg")
-        self.bgImage = pygame.transform.smoothscale(self.bgImage, (W, H))
-       
-        
-        self.board = pygame.image.load("QuantumCatan/img/bg.png").convert_alpha()
-        self.board = pygame.transform.smoothscale(self.board, (370, 490))
-        """
-        for p in range(self.num_entangled_pairs):
-            while len(self.entangling_pair) < 2:
-                tile_idx = random.randint(0, len(self.tiles)-1)
-                resource_list = [t[1].get('resource') for t in self.entangling_pair]
-                tile = self.tiles[tile_idx]
-                if not (tile in self.entangling_pair or tile.get("quantum", False) or tile.get('resource') == "desert" or tile.get('resource') in resource_list):
-                    self.entangling_pair.append((tile_idx, tile))
-            self.unused_ent_group_numbers.sort()
-            self.entangle_pair_of_normal_tiles(self.entangling_pair, self.unused_ent_group_numbers.pop(0), start=True)
-            self.entangling_pair = []   
-
-    # simple update hook called from main loop
-    def update(self, dt):
-        self.start_button = pygame.Rect(self.screen.get_width()//2 - 90, self.screen.get_height()//2 + 250, 180, 40)
-        self.restart_button = pygame.Rect(self.screen.get_width()//2 - 105, self.screen.get_height()//2 + 200, 210, 40)
-        if self.runningGame:
-            if "trading" not in self.allowed_actions and not self.devMode and not "accepting_trade" in self.allowed_actions:
-                self.trading = False
-                self.trading_partner = None
-                self.possible_trading_partners = []
-                self.trading_partners_rects = []       
-                
-            if self.round < 2:
-                if (self.roads_placed == 1) and (self.settlements_placed == 1):
-                    if "endTurn" not in self.allowed_actions:
-                        if self.devMode == False: self.allowed_actions.append("endTurn")
-                        
-            if self.possible_victims != []:
-                for k in ("building", "endTurn", "trading"):
-                    if k in self.allowed_actions:
-                        self.allowed_actions.remove(k)
-            
-            for player in self.players:
-                if player.score >= 10 and self.runningGame:
-                    self.push_message(f"{player.name} has won the game with a score of {player.score}!")
-                    self.playerWon = True
-                    self.runningGame = False
-                    self.allowed_actions = []
-            self.milliseconds_passed = pygame.time.get_ticks()
-                
-        """
-        dt: milliseconds since last frame.
-        Currently a no-op placeholder. Extend this to:
-         - advance animations
-         - process token timers / measurements
-         - handle background game logic
-        """
-        # Example: if you later add per-player token timers, process them here.
-        return
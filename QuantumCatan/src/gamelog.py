@@ -0,0 +1,148 @@
+# src/gamelog.py
+# Leveled, structured logging for the game. Silent unless configure() is called.
+# Built on the stdlib logging module, every record carries an event name plus a dict of fields.
+
+import json, logging, logging.handlers, os, time
+from collections import deque
+
+ROOT_NAME = "quatan"
+DEFAULT_RING_SIZE = 2000
+DEFAULT_BATCH_SIZE = 256
+
+_root = logging.getLogger(ROOT_NAME)
+_root.addHandler(logging.NullHandler())
+_root.propagate = False          # never leak into whatever the host application logs
+_root.setLevel(logging.WARNING)
+
+_ring = None
+_file_sink = None
+
+
+def get_logger(name):
+    """child logger, e.g. get_logger("engine") -> quatan.engine"""
+    return _root.getChild(name)
+
+
+def log_event(logger, level, event, **fields):
+    """
+    Logs `event` with structured fields. The level check comes first, so a disabled
+    event costs one int compare and the fields are never formatted.
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"fields": fields})
+
+
+def event_dict(record):
+    """the record as a plain dict, used by the ring buffer and the file sink"""
+    out = {
+        "t": round(record.created, 6),
+        "level": record.levelname,
+        "logger": record.name,
+        "event": record.getMessage(),
+    }
+    out.update(getattr(record, "fields", None) or {})
+    return out
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps(event_dict(record), default=str)
+
+
+class RingBufferHandler(logging.Handler):
+    """keeps the last `capacity` events in memory as dicts, old ones fall off the end"""
+    def __init__(self, capacity=DEFAULT_RING_SIZE):
+        super().__init__()
+        self.events = deque(maxlen=capacity)
+
+    def emit(self, record):
+        self.events.append(event_dict(record))
+
+    def recent(self, n=None):
+        if n is None:
+            return list(self.events)
+        return list(self.events)[-n:]
+
+    def clear(self):
+        self.events.clear()
+
+
+def configure(level=logging.INFO, ring_size=DEFAULT_RING_SIZE, file_path=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Turns logging on. Events at `level` and above go to an in-memory ring buffer and,
+    if file_path is given, to a JSON lines file. File writes are batched: records are
+    held until batch_size of them are queued (or an ERROR arrives, or flush() is called).
+    Calling configure() again replaces the previous setup.
+    """
+    global _ring, _file_sink
+    shutdown()
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+    _root.setLevel(level)
+
+    if ring_size:
+        _ring = RingBufferHandler(ring_size)
+        _root.addHandler(_ring)
+
+    if file_path:
+        target = logging.FileHandler(file_path, encoding="utf-8")
+        target.setFormatter(JsonLinesFormatter())
+        _file_sink = logging.handlers.MemoryHandler(batch_size, flushLevel=logging.ERROR, target=target)
+        _root.addHandler(_file_sink)
+    return _ring
+
+
+def configure_from_env(environ=None):
+    """
+    QUATAN_LOG=debug|info|warning|error enables logging, QUATAN_LOG_FILE adds the file sink.
+    Nothing set means nothing is logged.
+    """
+    environ = os.environ if environ is None else environ
+    level = environ.get("QUATAN_LOG")
+    if not level:
+        return None
+    return configure(level, file_path=environ.get("QUATAN_LOG_FILE"))
+
+
+def recent(n=None):
+    """the last n events from the ring buffer (all of them if n is None), [] when logging is off"""
+    return _ring.recent(n) if _ring is not None else []
+
+
+def flush():
+    if _file_sink is not None:
+        _file_sink.flush()
+
+
+def shutdown():
+    """flushes and removes the handlers added by configure(), back to silent"""
+    global _ring, _file_sink
+    target = _file_sink.target if _file_sink is not None else None
+    for handler in (_ring, _file_sink):
+        if handler is not None:
+            _root.removeHandler(handler)
+            handler.close()  # MemoryHandler.close() flushes the pending batch first
+    if target is not None:
+        target.close()
+    _ring = None
+    _file_sink = None
+    _root.setLevel(logging.WARNING)
+
+
+class timed:
+    """
+    with timed(log, "board_generated", radius=2): ...
+    logs the event with the elapsed milliseconds when the block ends (only if the level is enabled)
+    """
+    def __init__(self, logger, event, level=logging.DEBUG, **fields):
+        self.logger, self.event, self.level, self.fields = logger, event, level, fields
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.logger.isEnabledFor(self.level):
+            self.fields["ms"] = round((time.perf_counter() - self.t0) * 1000, 3)
+            self.logger.log(self.level, self.event, extra={"fields": self.fields})
+        return False
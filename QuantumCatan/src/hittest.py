@@ -0,0 +1,74 @@
+# src/hittest.py
+# Where a click goes. Buttons and panels register their rects with the action they stand for,
+# per screen ("start", "game", "game_over") and layer; a click looks at the grid cell under the
+# mouse and gets the top target there, instead of testing every rect of the screen in turn.
+#
+#   hits.set("game", "shop", [(rect, LAYER_PANEL, "shop", "road"), ...])   # replaces the shop's targets
+#   hits.hit("game", pos)  ->  ("shop", "road") or None
+
+# higher layers get the click when targets overlap
+LAYER_BUTTON = 10
+LAYER_PANEL = 20
+LAYER_POPUP = 30
+
+CELL_SIZE = 64
+
+
+class HitRegistry:
+    """
+    Targets by screen and owner, an owner (a panel, the button bar) replaces all of its targets at
+    once when it lays out again. Every screen has a grid of CELL_SIZE cells listing the targets that
+    overlap the cell, top layer first.
+    """
+    def __init__(self, cell=CELL_SIZE):
+        self.cell = cell
+        self._owned = {}    # (screen, owner) -> list of targets
+        self._grids = {}    # screen -> {(cx, cy): [targets]}
+
+    def _cells(self, rect):
+        c = self.cell
+        for cx in range(rect.left // c, (rect.right - 1) // c + 1):
+            for cy in range(rect.top // c, (rect.bottom - 1) // c + 1):
+                yield (cx, cy)
+
+    def set(self, screen, owner, targets):
+        """targets: (rect, layer, action, payload) tuples, replacing what owner registered before"""
+        self.clear(screen, owner)
+        targets = [t for t in targets if t[0].width > 0 and t[0].height > 0]
+        self._owned[(screen, owner)] = targets
+        grid = self._grids.setdefault(screen, {})
+        touched = set()
+        for target in targets:
+            for cell in self._cells(target[0]):
+                grid.setdefault(cell, []).append(target)
+                touched.add(cell)
+        for cell in touched:
+            # once per cell; stable, so within a layer the first registered wins
+            grid[cell].sort(key=lambda t: -t[1])
+
+    def clear(self, screen, owner):
+        targets = self._owned.pop((screen, owner), None)
+        if not targets:
+            return
+        grid = self._grids[screen]
+        gone = {id(t) for t in targets}
+        touched = {cell for target in targets for cell in self._cells(target[0])}
+        for cell in touched:
+            cell_targets = grid.get(cell)
+            if cell_targets is None:
+                continue
+            cell_targets[:] = [t for t in cell_targets if id(t) not in gone]
+            if not cell_targets:
+                del grid[cell]
+
+    def hit(self, screen, pos):
+        """(action, payload) of the top target under pos, None if there is none"""
+        x, y = int(pos[0]), int(pos[1])
+        for rect, layer, action, payload in self._grids.get(screen, {}).get((x // self.cell, y // self.cell), ()):
+            if rect.collidepoint(x, y):
+                return action, payload
+        return None
+
+    def targets(self, screen):
+        """every target of a screen, for debugging"""
+        return [t for (s, _), targets in self._owned.items() if s == screen for t in targets]
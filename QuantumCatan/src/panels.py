@@ -0,0 +1,324 @@
+# src/panels.py
+# The side panels of the game screen (inventory, tokens, dev card bar, trade/steal panel, shop) in
+# retained mode: every panel keeps its picture on a surface and its click rects, and only redraws
+# them when what it shows changes. In a frame where nothing changed a panel is one blit.
+
+import abc
+import pygame
+from .constants import PANEL_BG, TEXT_COLOR, WHITE, BLACK, PLAYER_COLORS, DEV_CARD_COLORS, getFont
+from .rendering import draw_text
+from .resources import RESOURCES
+from .turn import Action
+from .hittest import LAYER_PANEL
+
+SELECT_BRIGHT = 1.2
+HOVER_BRIGHT = 1.1
+DEV_CARD_ORDER = ("knight", "point", "interference", "Year of Plenty", "Monopoly", "roadBuilding")
+SHOP_ITEMS = [("road","Road (1L, 1B)"),("settlement","Settlement (1L, 1B, 1W, 1G)"),("city","City (2G, 3O)"),("dev","Dev Card (1W, 1G, 1O)")]
+MAX_TOKENS_SHOWN = 18
+
+
+def _bright(color, factor):
+    return tuple([factor*x for x in color])
+
+
+class Panel(abc.ABC):
+    """
+    A widget with a cached surface. Subclasses say where they are (place), what their picture
+    depends on (key) and how to draw it (render, in the panel's own coordinates). Its click targets
+    (targets) go into the game's hit registry when it is redrawn and out again when it hides;
+    publish() still hands the rect lists to the game every frame.
+    Children are drawn after (on top of) their parent and cache on their own.
+    """
+    def __init__(self, children=()):
+        self.children = list(children)
+        self.surface = None
+        self.rect = None
+        self._key = None
+        self.redraws = 0
+
+    @abc.abstractmethod
+    def place(self, game, w, h):
+        """screen rect of the panel, None while it is hidden"""
+
+    def key(self, game):
+        return None
+
+    @abc.abstractmethod
+    def render(self, game, surf):
+        """draws the panel on surf, a surface of the panel's size"""
+
+    def targets(self, game):
+        """(rect, action, payload) per click target, see GameUI._handle_click for the actions"""
+        return []
+
+    def publish(self, game):
+        pass
+
+    def hide(self, game):
+        """called in frames the panel is hidden"""
+
+    def hovered(self, rects):
+        """index of the rect under the mouse, part of the key of panels with hover effects"""
+        pos = pygame.mouse.get_pos()
+        return next((i for i, r in enumerate(rects) if r.collidepoint(pos)), None)
+
+    def local(self, rect):
+        """a screen rect in the panel's coordinates"""
+        return rect.move(-self.rect.x, -self.rect.y)
+
+    def draw(self, screen, game):
+        rect = self.place(game, screen.get_width(), screen.get_height())
+        if rect is None:
+            if self._key is not None:
+                game.hits.clear("game", self)
+            self._key = None
+            self.hide(game)
+            return
+        key = (tuple(rect), self.key(game))
+        if key != self._key or self.surface is None:
+            self.rect = rect
+            self.surface = pygame.Surface(rect.size, pygame.SRCALPHA)
+            self.render(game, self.surface)
+            self._key = key
+            game.hits.set("game", self, [(r, LAYER_PANEL, action, payload) for r, action, payload in self.targets(game)])
+            self.redraws += 1
+        self.publish(game)
+        screen.blit(self.surface, rect.topleft)
+        for child in self.children:
+            child.draw(screen, game)
+
+
+class InventoryPanel(Panel):
+    """current player, score, resources and the +/- buttons of a trade offer"""
+    def place(self, game, w, h):
+        return pygame.Rect(w - 240, 5, 235, 330)
+
+    def _trade_buttons(self, game):
+        return game.trading and game.trading_partner is not None
+
+    def key(self, game):
+        player = game.players[game.current_player]
+        return (game.current_player, player.score, player.resources.values(), game.tradingAddedResources.values(),
+                self._trade_buttons(game), game.turn.allows(Action.ACCEPT_TRADE))
+
+    def render(self, game, s):
+        cp = game.current_player
+        player = game.players[cp]
+        pygame.draw.rect(s, PANEL_BG, (0, 0, 235, 330), border_radius=8)
+        s.blit(getFont(16).render(f"P{cp+1}  (Score = {player.score})", True, PLAYER_COLORS[cp]), (10, 5))
+        s.blit(getFont(16).render("Inventory:", True, TEXT_COLOR), (10, 31))
+        self.plus, self.minus = [], []
+        answering = game.turn.allows(Action.ACCEPT_TRADE)
+        for i, res in enumerate(RESOURCES):
+            have, added = player.resources.get(res, 0), game.tradingAddedResources[res]
+            extra = "" if added == 0 else f" ({added})" if added < 0 else f" (+{added})"
+            s.blit(getFont(14).render(f"{res.capitalize()}: {have}{extra}", True, TEXT_COLOR), (12, 55 + i*20))
+            if not self._trade_buttons(game):
+                continue
+            plus = pygame.Rect(self.rect.x+170, self.rect.y+55 + i*20, 25, 18)
+            minus = pygame.Rect(self.rect.x+200, self.rect.y+55 + i*20, 25, 18)
+            self.plus.append((plus, res))
+            if have > 0:
+                self.minus.append((minus, res))
+            # greyed out while answering an offer, - also when it would go below 0
+            pygame.draw.rect(s, (150, 100, 100) if not answering else (100, 100, 100), self.local(plus), border_radius=6)
+            pygame.draw.rect(s, (150, 200, 200) if have + added > 0 and not answering else (100, 100, 100), self.local(minus), border_radius=6)
+            draw_text(s, "+", 175, 55 + i*20, size=14, color=BLACK)
+            draw_text(s, "-", 205, 55 + i*20, size=14, color=BLACK)
+
+    def targets(self, game):
+        return [(r, "plus", res) for r, res in self.plus] + [(r, "minus", res) for r, res in self.minus]
+
+    def publish(self, game):
+        game.plusSignRects = self.plus
+        game.minusSignRects = self.minus
+
+
+class TokenPanel(Panel):
+    """the current player's tokens with the chance of every resource, the last 18 if there are more"""
+    def place(self, game, w, h):
+        return pygame.Rect(w - 240, 170, 235, 165)
+
+    def key(self, game):
+        tokens = game.players[game.current_player].tokens
+        states = game.tiles.states
+        shown = tokens[-MAX_TOKENS_SHOWN:]
+        groups = {t["group"] for t in shown}
+        # interference changes the odds without touching the tokens
+        odds = tuple((g, states.resources_of(g), states.weights_of(g)) for g in sorted(groups) if g in states)
+        return (len(tokens), tuple((t["group"], t["from_tile_idx"], tuple(t["possible"])) for t in shown), odds)
+
+    def render(self, game, s):
+        tokens = game.players[game.current_player].tokens
+        n = len(tokens)
+        s.blit(getFont(16).render(f"Tokens: ({n})" + ("(18 shown)" if n > MAX_TOKENS_SHOWN else ""), True, TEXT_COLOR), (12, 0))
+        # smaller print the more tokens there are
+        size, distance = (14, 20) if n <= 6 else (12, 16) if n <= 9 else (10, 12) if n <= 12 else (8, 8)
+        for i, token in enumerate(tokens[-MAX_TOKENS_SHOWN:]):
+            # chance of every resource the token can become, from its group's state
+            chances = game.tiles.states.tile_probabilities(token.get("group"), token.get("from_tile_idx"))
+            # names are shortened for groups of more than two tiles to fit the panel
+            short = len(chances) > 2
+            txt = getFont(size).render(", ".join(f"{str(res)[:3] if short else str(res).capitalize()}: {round(float(p), 2)}"
+                                                 for res, p in zip(token.get("possible"), chances)), True, TEXT_COLOR)
+            s.blit(txt, (12, 20 + i*distance))
+
+
+class DevCardBar(Panel):
+    """the held development cards along the bottom of the screen, click one to play it"""
+    def _cards(self, game):
+        held = game.players[game.current_player].held_dev_cards
+        return [card for card in DEV_CARD_ORDER for _ in range(held[card])]
+
+    def place(self, game, w, h):
+        cards = self._cards(game)
+        if not cards:
+            return None
+        self.x = w/2 - (len(cards) * 110)/2
+        return pygame.Rect(int(self.x), h - 60, len(cards) * 110, 60)
+
+    def key(self, game):
+        return tuple(self._cards(game))
+
+    def render(self, game, s):
+        self.rects = []
+        for i, card in enumerate(self._cards(game)):
+            r = pygame.Rect(self.x + i*110, self.rect.y, 100, 60)
+            self.rects.append([r, card])
+            pygame.draw.rect(s, DEV_CARD_COLORS[card], self.local(r), border_radius=8)
+            name = card.replace("point","Victory Point").replace("roadBuilding","Road Building").capitalize()
+            draw_text(s, name, self.x - self.rect.x + i*110 + 50, 10, size=12, color=WHITE, centered=True)
+
+    def targets(self, game):
+        return [(r, "dev_card", card) for r, card in self.rects]
+
+    def publish(self, game):
+        game.dev_card_rects = self.rects
+
+    def hide(self, game):
+        game.dev_card_rects = []
+
+
+class TradePanel(Panel):
+    """who to steal from after the robber moved, or who to trade with and the offer buttons"""
+    def place(self, game, w, h):
+        if not (game.possible_victims or game.trading):
+            return None
+        self.box = pygame.Rect(w - 240, 360, 235, 160)
+        return self.box.unionall([game.sendTrade_rect, game.acceptTrade_rect, game.declineTrade_rect])
+
+    def _partners(self, game):
+        """(partner, label, colour) per row: the bank first unless answering an offer, then the other players"""
+        rows = [] if game.turn.allows(Action.ACCEPT_TRADE) else [("bank/port", "Bank/port", None)]
+        rows += [(p.idx, p.name, p.color) for i, p in enumerate(game.players) if i != game.current_player]
+        return rows
+
+    def key(self, game):
+        if game.possible_victims:
+            return ("steal", tuple(game.possible_victims))
+        answering = game.turn.allows(Action.ACCEPT_TRADE)
+        offer = game.players[game.current_player].resources.can_apply(game.tradingAddedResources) if answering else game.tradingAddedResources.any()
+        return ("trade", game.current_player, answering, game.trading_partner, offer,
+                self.hovered(getattr(self, "partner_rects", ())))
+
+    def render(self, game, s):
+        x = self.box.x
+        pygame.draw.rect(s, PANEL_BG, self.local(self.box), border_radius=8)
+        top = self.box.y - self.rect.y
+        self.partners, self.partner_rects, self.victim_rects = [], [], []
+        if game.possible_victims:
+            draw_text(s, "Steal from:", x+10 - self.rect.x, top+5, size=16)
+            for i, pidx in enumerate(game.possible_victims):
+                r = pygame.Rect(x+10, 390 + i*20, 215, 18)
+                self.victim_rects.append(r)
+                pygame.draw.rect(s, game.players[pidx].color, self.local(r), border_radius=6)
+                draw_text(s, f"{game.players[pidx].name}", x+12 - self.rect.x, 388 + i*20 - self.rect.y, size=14, color=WHITE)
+            return
+        draw_text(s, "Trade with:", x+10 - self.rect.x, top+5, size=16)
+        hover = self.key(game)[-1]
+        for k, (partner, label, color) in enumerate(self._partners(game)):
+            r = pygame.Rect(x+10, 390 + k*20, 215, 18)
+            self.partners.append(partner)
+            self.partner_rects.append(r)
+            if color is None:
+                colour = (250, 250, 250) if game.trading_partner == partner else (200, 200, 200) if k == hover else (150, 150, 150)
+            else:
+                colour = _bright(color, SELECT_BRIGHT) if game.trading_partner == partner else _bright(color, HOVER_BRIGHT) if k == hover else color
+            pygame.draw.rect(s, colour, self.local(r), border_radius=6)
+            draw_text(s, label, x+12 - self.rect.x, 388 + k*20 - self.rect.y, size=14, color=BLACK if color is None else WHITE)
+        offer = self.key(game)[4]
+        if game.turn.allows(Action.ACCEPT_TRADE):
+            accept, decline = self.local(game.acceptTrade_rect), self.local(game.declineTrade_rect)
+            pygame.draw.rect(s, (150, 200, 100) if offer else (100, 100, 100), accept, border_radius=6)
+            draw_text(s, "Accept Trade", accept.x+1, accept.y+1, size=14, color=WHITE)
+            pygame.draw.rect(s, (150, 0, 50), decline, border_radius=6)
+            draw_text(s, "Decline Trade", decline.x+1, decline.y+1, size=14, color=WHITE)
+        elif game.trading_partner is not None and offer:
+            send = self.local(game.sendTrade_rect)
+            pygame.draw.rect(s, (150, 200, 100), send, border_radius=6)
+            draw_text(s, "Send Offer", send.x+1, send.y+1, size=14, color=WHITE)
+
+    def targets(self, game):
+        if game.possible_victims:
+            return [(r, "victim", pidx) for r, pidx in zip(self.victim_rects, game.possible_victims)]
+        targets = [(r, "partner", partner) for r, partner in zip(self.partner_rects, self.partners)]
+        if game.turn.allows(Action.ACCEPT_TRADE):
+            targets += [(game.acceptTrade_rect, "accept", None), (game.declineTrade_rect, "decline", None)]
+        elif game.trading_partner is not None and self.key(game)[4]:
+            targets.append((game.sendTrade_rect, "send_offer", None))
+        return targets
+
+    def publish(self, game):
+        if game.possible_victims:
+            game.possible_victims_rects = self.victim_rects
+        else:
+            # the rules clear the partner list when trading is no longer allowed, it is handed out again every frame
+            game.possible_trading_partners = list(self.partners)
+            game.trading_partners_rects = self.partner_rects
+
+
+class ShopPanel(Panel):
+    """the four things to buy, in the player's colour when they can be bought now"""
+    def place(self, game, w, h):
+        return pygame.Rect(w - 245, h - 210, 240, 180)
+
+    def _buyable(self, game):
+        """per item whether its button is lit"""
+        if game.round < 2:
+            return (game.settlements_placed == 1 and game.roads_placed == 0, game.settlements_placed == 0, False, False)
+        if not (game.turn.allows(Action.BUILD) or game.devMode == True):
+            return (False,) * len(SHOP_ITEMS)
+        return tuple(game.player_can_afford(game.current_player, k) and not (k == "dev" and game.possible_cards == [])
+                     for k, _ in SHOP_ITEMS)
+
+    def key(self, game):
+        return (game.current_player, self._buyable(game), game.sel, self.hovered([r for _, r in getattr(self, "rects", ())]))
+
+    def render(self, game, s):
+        pygame.draw.rect(s, PANEL_BG, (0, 0, 240, 180), border_radius=8)
+        draw_text(s, "Shop", 10, 8, size=18)
+        color = game.players[game.current_player].color
+        _, buyable, sel, hover = self.key(game)
+        self.rects = []
+        for i, (k, label) in enumerate(SHOP_ITEMS):
+            r = pygame.Rect(self.rect.x+10, self.rect.y+40 + i*36, 200, 30)
+            colour = (128, 128, 128)
+            if buyable[i]:
+                colour = _bright(color, HOVER_BRIGHT) if i == hover else color
+            if sel == k:
+                colour = _bright(color, SELECT_BRIGHT)
+            pygame.draw.rect(s, colour, self.local(r), border_radius=6)
+            draw_text(s, f"{label}", 18, 46 + i*36, size=14, color=WHITE)
+            self.rects.append((k, r))
+
+    def targets(self, game):
+        return [(r, "shop", k) for k, r in self.rects]
+
+    def publish(self, game):
+        game.shop_rects = self.rects
+
+
+def game_panels():
+    """the panels on the right and bottom of the game screen in drawing order, the shop is drawn later"""
+    return [InventoryPanel(children=[TokenPanel()]), DevCardBar(), TradePanel()]
@@ -1,17 +1,19 @@
 # src/player.py
 # Player data structure and helpers
-from .rendering import draw_text
+from .resources import Inventory
+
+
 class Player:
     def __init__(self, idx):
         self.idx = idx
         self.name = f"Player {idx+1}"
         self.color = None  # set by game_state
-        # classical resources
-        self.resources = {"lumber":0,"brick":0,"wool":0,"grain":0,"ore":0}
+        # classical resources, an array backed Inventory (assigning a dict converts it)
+        self.resources = Inventory()
         # quantum tokens (list of token dicts from quantum.py)
         self.tokens = []
         # owned buildings tracked in game_state dictionaries (roads_owner / settlements_owner)
-        # convenience: track score (number of settlements*1 + cities*2)
+        # victory points, kept up to date by the ScoreTracker (scoring.py)
         self.score = 0
         self.held_dev_cards = {"knight": 0, "point": 0, "interference": 0, "Year of Plenty": 0, "Monopoly": 0, "roadBuilding": 0}
         self.played_dev_cards = {"knight": 0, "point": 0, "interference": 0, "Year of Plenty": 0, "Monopoly": 0, "roadBuilding": 0}
@@ -19,6 +21,19 @@ class Player:
         self.knightmight = 0
         self.has_greatest_knightmight = False
         self.longest_road_roads = []
+        # on a sync mirror (sync.py): how many cards, tokens and dev cards an opponent holds that
+        # this client is not allowed to see
+        self.hidden_cards = 0
+        self.hidden_tokens = 0
+        self.hidden_dev_cards = 0
+
+    @property
+    def resources(self):
+        return self._resources
+
+    @resources.setter
+    def resources(self, value):
+        self._resources = value if isinstance(value, Inventory) else Inventory(value)
 
     def add_resource(self, resource, screen, amount=1, ):
         if resource in self.resources:
@@ -28,11 +43,8 @@ class Player:
             return f"{self.name} attempted to receive unknown resource '{resource}'."
 
     def can_afford(self, cost):
-        for k,v in cost.items():
-            if self.resources.get(k,0) < v:
-                return False
-        return True
+        # cost is a vector from resources.COSTS
+        return self._resources.can_afford(cost)
 
     def pay_cost(self, cost):
-        for k,v in cost.items():
-            self.resources[k] -= v
+        self._resources.pay(cost)
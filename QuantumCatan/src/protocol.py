@@ -0,0 +1,39 @@
+# src/protocol.py
+# What goes over the wire in network play: newline separated JSON messages and actions
+# converted back from JSON. Game state itself is sent by sync.py (full snapshots and deltas).
+
+import json
+
+# one request per line, anything longer is a broken or hostile client
+MAX_MESSAGE_BYTES = 64 * 1024
+# server messages can hold a full snapshot, large boards need more room
+MAX_STATE_BYTES = 4 * 1024 * 1024
+
+
+def encode(message):
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def decode(line):
+    """bytes of one line -> dict, ValueError for anything that is not a JSON object"""
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError("message must be a JSON object")
+    return message
+
+
+def _as_tuple(value):
+    if isinstance(value, list):
+        return tuple(_as_tuple(v) for v in value)
+    return value
+
+
+def decode_action(value):
+    """
+    JSON has no tuples, ["road", 12] -> ("road", 12) and ["entangle", [3, 7]] -> ("entangle", (3, 7)),
+    so the result compares equal to what legal_actions() lists.
+    """
+    if not isinstance(value, list) or not value or not isinstance(value[0], str):
+        raise ValueError("an action is a list starting with its kind")
+    return _as_tuple(value)
+
@@ -0,0 +1,218 @@
+# src/quantum.py
+# The superpositions on the board, one state per entanglement group.
+#
+# A group of k tiles (2..5, every tile ends up with a different resource) has k possible outcomes.
+# In outcome j the i-th member (in board order) becomes resources[(i + j) % k], so measuring one
+# tile decides all of them, like a GHZ state. The state of a group is a small integer weight per
+# outcome, the chance of an outcome is its weight over the total. Integers keep repeated
+# interference exact (no float drift) and make sampling a single integer draw. All groups are rows
+# of the same arrays, so measuring or reading many groups at once is a few NumPy operations
+# instead of a Python loop per group.
+
+import math, random
+import numpy as np
+from .resources import NUM_RESOURCES
+
+# a tile per resource at most, otherwise two tiles would have to share one
+MAX_GROUP_SIZE = NUM_RESOURCES
+NO_TILE = -1
+
+
+class QuantumState:
+    """
+    Entanglement groups by id, one row per group in each of these arrays:
+
+    members     tile indices in board order, NO_TILE padded
+    resources   resource codes, member i gets resources[(i + j) % size] in outcome j
+    weights     weight of every outcome (at least 1), 0 padded
+    size        number of tiles in the group
+
+    Rows of removed groups are reused. `dirty` collects the groups that were added, changed or
+    removed since the last sync delta (see sync.py).
+    """
+    def __init__(self, seed=None):
+        self._row = {}      # group id -> row
+        self._free = []     # rows no group uses
+        self.members = np.full((0, MAX_GROUP_SIZE), NO_TILE, dtype=np.int32)
+        self.resources = np.zeros((0, MAX_GROUP_SIZE), dtype=np.int8)
+        self.weights = np.zeros((0, MAX_GROUP_SIZE), dtype=np.int32)
+        self.size = np.zeros(0, dtype=np.int8)
+        # TileStore passes a seed drawn from the game's generator, so a seeded game measures the same way every time
+        self.rng = np.random.default_rng(random.getrandbits(64) if seed is None else seed)
+        self.dirty = set()
+
+    def _grow(self):
+        old = len(self.size)
+        extra = max(8, old)
+        self.members = np.concatenate([self.members, np.full((extra, MAX_GROUP_SIZE), NO_TILE, dtype=np.int32)])
+        self.resources = np.concatenate([self.resources, np.zeros((extra, MAX_GROUP_SIZE), dtype=np.int8)])
+        self.weights = np.concatenate([self.weights, np.zeros((extra, MAX_GROUP_SIZE), dtype=np.int32)])
+        self.size = np.concatenate([self.size, np.zeros(extra, dtype=np.int8)])
+        self._free.extend(range(old + extra - 1, old - 1, -1))
+
+    def __len__(self):
+        return len(self._row)
+
+    def __contains__(self, group):
+        return group in self._row
+
+    def copy(self, rng=None):
+        """
+        The same groups and weights with a generator of its own: rng if given, otherwise a fresh
+        unseeded one. A copy must not share the original's random stream, or a bot searching on a
+        clone would know how every group of the real game collapses.
+        """
+        c = QuantumState.__new__(QuantumState)
+        c._row = dict(self._row)
+        c._free = list(self._free)
+        c.members = self.members.copy()
+        c.resources = self.resources.copy()
+        c.weights = self.weights.copy()
+        c.size = self.size.copy()
+        c.rng = rng if rng is not None else np.random.default_rng()
+        c.dirty = set(self.dirty)
+        return c
+
+    # GameEngine.clone() deep copies the game
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    # -- groups ----------------------------------------------------
+    def add(self, group, members, resources, weights=None):
+        """a new group, all outcomes equally likely unless weights are given"""
+        k = len(members)
+        if not 2 <= k <= MAX_GROUP_SIZE or len(resources) != k:
+            raise ValueError(f"a group needs 2 to {MAX_GROUP_SIZE} tiles and one resource per tile")
+        if weights is None:
+            weights = [1] * k
+        elif len(weights) != k or min(weights) < 1:
+            raise ValueError("every outcome needs a whole weight of at least 1")
+        if group in self._row:
+            raise ValueError(f"group {group} already exists")
+        if not self._free:
+            self._grow()
+        row = self._free.pop()
+        self._row[group] = row
+        self.members[row, :k] = members
+        self.resources[row, :k] = resources
+        # 2:4 is the same state as 1:2, the smallest weights are stored
+        self.weights[row, :k] = np.asarray(weights) // math.gcd(*weights)
+        self.size[row] = k
+        self.dirty.add(group)
+
+    def remove(self, group):
+        row = self._row.pop(group)
+        self.members[row] = NO_TILE
+        self.weights[row] = 0
+        self.size[row] = 0
+        self._free.append(row)
+        self.dirty.add(group)
+
+    def groups(self):
+        return list(self._row)
+
+    def members_of(self, group):
+        row = self._row.get(group)
+        if row is None:
+            return ()
+        return tuple(self.members[row, :self.size[row]].tolist())
+
+    def resources_of(self, group):
+        row = self._row[group]
+        return tuple(self.resources[row, :self.size[row]].tolist())
+
+    def weights_of(self, group):
+        row = self._row[group]
+        return tuple(self.weights[row, :self.size[row]].tolist())
+
+    def probabilities(self, group):
+        """chance of every outcome, as floats for display and expectations"""
+        w = self.weights[self._row[group], :]
+        return w[w > 0] / w.sum()
+
+    def all_members(self):
+        """every tile in some group"""
+        rows = list(self._row.values())
+        tiles = self.members[rows].ravel()
+        return tiles[tiles != NO_TILE].tolist()
+
+    def tile_probabilities(self, group, tile):
+        """probability of each of the group's resources for one member, in resources_of() order"""
+        i = self.members_of(group).index(tile)
+        # resource m lands on member i in outcome (m - i) % k
+        return np.roll(self.probabilities(group), i)
+
+    # -- operators -------------------------------------------------
+    def apply(self, group, change):
+        """adds a whole number to every outcome's weight, each has to stay at least 1"""
+        row = self._row[group]
+        k = self.size[row]
+        weights = self.weights[row, :k] + np.asarray(change, dtype=np.int32)
+        if weights.min() < 1:
+            raise ValueError("an outcome weight would drop below 1")
+        self.weights[row, :k] = weights // math.gcd(*weights.tolist())
+        self.dirty.add(group)
+
+    def interference_operator(self, group, tile):
+        """
+        The interference card on one member, as the change it makes to the group's weights. The
+        card favours the outcome in which that tile gets the group's first resource: if it already
+        is the most likely one its weight grows by one, otherwise every more likely outcome loses
+        one (1:1 -> 2:1 -> 3:1 and back for a pair).
+        """
+        row = self._row[group]
+        k = self.size[row]
+        weights = self.weights[row, :k]
+        favoured = -self.members_of(group).index(tile) % k
+        change = np.zeros(k, dtype=np.int32)
+        if weights[favoured] >= weights.max():
+            change[favoured] = 1
+        else:
+            change[weights > weights[favoured]] = -1
+        return change
+
+    def interfere(self, group, tile):
+        self.apply(group, self.interference_operator(group, tile))
+
+    # -- measurement -----------------------------------------------
+    def measure(self, groups):
+        """
+        One sampled outcome per group, all groups drawn together: a whole number below the total
+        weight picks the outcome it falls in. Groups have at most MAX_GROUP_SIZE outcomes, so
+        this is constant work per group.
+        """
+        if len(groups) == 1:
+            # the robber measures one group at a time, plain Python beats array setup for that
+            row = self._row[groups[0]]
+            weights = self.weights[row, :self.size[row]].tolist()
+            u = int(self.rng.integers(sum(weights)))
+            for j, w in enumerate(weights):
+                if u < w:
+                    return [j]
+                u -= w
+        rows = np.fromiter((self._row[g] for g in groups), dtype=np.intp, count=len(groups))
+        cumulative = self.weights[rows].cumsum(axis=1)
+        u = self.rng.integers(0, cumulative[:, -1])
+        # padding adds no weight, so u never reaches past the last real outcome
+        return (cumulative <= u[:, None]).sum(axis=1).tolist()
+
+    def outcome(self, group, j):
+        """(tile, resource code) for every member in outcome j"""
+        row = self._row[group]
+        k = int(self.size[row])
+        members = self.members[row, :k].tolist()
+        resources = self.resources[row, :k].tolist()
+        return [(members[i], resources[(i + j) % k]) for i in range(k)]
+
+    # -- sync ------------------------------------------------------
+    def row(self, group):
+        """[members, resources, weights] of one group as plain lists"""
+        return [list(self.members_of(group)), list(self.resources_of(group)), list(self.weights_of(group))]
+
+    def set_row(self, group, row):
+        """what row() returned, None removes the group"""
+        if group in self._row:
+            self.remove(group)
+        if row is not None:
+            self.add(group, *row)
+
@@ -1,17 +1,13 @@
 # src/rendering.py
 # low-level drawing helpers used by UI and main loop
 
-import pygame, os
+import pygame
 from .constants import TEXT_COLOR
+from .assets import ASSETS
 
-os.chdir(os.path.dirname(os.path.realpath(__file__)))
-
-# Note: constants.py does not export fonts; create quick fallback
+# fonts come from the asset cache, so drawing text does not reopen the font file
 def draw_text(screen, text, x, y, size=18, color=TEXT_COLOR, centered=False):
-    try:
-        font = pygame.font.Font("../fonts/ScienceGothic-Regular.ttf", size)
-    except:
-        font = pygame.font.SysFont("Arial", size)
+    font = ASSETS.font(size)
     surf = font.render(text, True, color)
     dim = (x, y) if centered==False else (x-surf.get_rect().width/2, y)
     screen.blit(surf, dim)
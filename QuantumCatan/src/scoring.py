@@ -0,0 +1,100 @@
+# src/scoring.py
+# Victory points: the engine reports builds, awards and cards, the tracker keeps the per player
+# breakdown and calls the victory callbacks the moment someone reaches the target
+
+WINNING_SCORE = 10
+
+# points per item of each category
+POINTS = {"settlements": 1, "cities": 2, "longest_road": 2, "largest_army": 2, "vp_cards": 1}
+CATEGORIES = tuple(POINTS)
+# special cards that only one player can hold at a time
+TITLES = ("longest_road", "largest_army")
+
+CATEGORY_LABELS = {"settlements": "settlements", "cities": "cities", "longest_road": "longest road",
+                   "largest_army": "largest army", "vp_cards": "point cards"}
+
+
+class ScoreTracker:
+    """
+    Holds how many of each scoring item every player has. player.score is kept in sync so the
+    drawing code can keep reading it, but nothing outside this class should change it.
+
+    on_victory(player_idx, score) is called once, as soon as a player reaches `target`.
+    """
+    def __init__(self, players, target=WINNING_SCORE, on_victory=None):
+        self.players = players
+        self.target = target
+        self.counts = [dict.fromkeys(CATEGORIES, 0) for _ in players]
+        self.holders = dict.fromkeys(TITLES)  # title -> player index or None
+        self.winner = None
+        self._victory_callbacks = [on_victory] if on_victory is not None else []
+        for p in players:
+            p.score = 0
+
+    def on_victory(self, callback):
+        self._victory_callbacks.append(callback)
+
+    # -- events ----------------------------------------------------
+    def building_placed(self, player_idx, typ="settlement"):
+        self._add(player_idx, "cities" if typ == "city" else "settlements", 1)
+
+    def city_upgraded(self, player_idx):
+        """a settlement became a city: one settlement less, one city more (+1 point)"""
+        counts = self.counts[player_idx]
+        counts["settlements"] -= 1
+        counts["cities"] += 1
+        self._changed(player_idx)
+
+    def vp_card_played(self, player_idx):
+        self._add(player_idx, "vp_cards", 1)
+
+    def award(self, title, player_idx):
+        """gives longest_road / largest_army to player_idx, taking it from the previous holder"""
+        previous = self.holders[title]
+        if previous == player_idx:
+            return previous
+        if previous is not None:
+            self.revoke(title)
+        self.holders[title] = player_idx
+        self._add(player_idx, title, 1)
+        return previous
+
+    def revoke(self, title):
+        holder = self.holders[title]
+        if holder is None:
+            return
+        self.holders[title] = None
+        self._add(holder, title, -1)
+
+    # -- queries ---------------------------------------------------
+    def holder(self, title):
+        return self.holders[title]
+
+    def score(self, player_idx):
+        return sum(POINTS[cat] * n for cat, n in self.counts[player_idx].items())
+
+    def breakdown(self, player_idx):
+        """points per category, e.g. {"settlements": 2, "cities": 4, "longest_road": 2, ...}"""
+        return {cat: POINTS[cat] * n for cat, n in self.counts[player_idx].items()}
+
+    def describe(self, player_idx):
+        """short text for the game over screen, categories without points are left out"""
+        parts = [f"{CATEGORY_LABELS[cat]} {pts}" for cat, pts in self.breakdown(player_idx).items() if pts]
+        return ", ".join(parts)
+
+    def standings(self):
+        """player indices, highest score first"""
+        return sorted(range(len(self.players)), key=lambda i: self.players[i].score, reverse=True)
+
+    # -- internals -------------------------------------------------
+    def _add(self, player_idx, category, amount):
+        self.counts[player_idx][category] += amount
+        self._changed(player_idx)
+
+    def _changed(self, player_idx):
+        score = self.score(player_idx)
+        self.players[player_idx].score = score
+        if self.winner is None and score >= self.target:
+            self.winner = player_idx
+            for callback in self._victory_callbacks:
+                callback(player_idx, score)
@@ -0,0 +1,439 @@
+# src/server.py
+# Network play: one asyncio process hosts many games. Every game is an authoritative GameEngine,
+# clients only send actions and receive the results.
+#
+#   python -m src.server --port 8765
+#
+# Protocol: one JSON object per line (see protocol.py), every request has an "op" and may carry an
+# "id" that is copied into the reply.
+#
+#   {"op": "create", "players": 4, "pairs": 2, "radius": 2} -> {"op": "created", "game": 1}
+#   {"op": "join", "game": 1, "seat": 0}             -> {"op": "joined", "game": 1, "seat": 0, "state": <full snapshot>}
+#   {"op": "action", "action": ["road", 12]}         -> everyone in the game: {"op": "update", "seat": 0, "action": [...], "delta": <delta>}
+#                                                       then the sender: {"op": "applied", "version": 5}
+#   {"op": "sync"}                                   -> <full snapshot>, for clients that missed a delta
+#   {"op": "legal"}                                  -> {"op": "legal", "actions": [...]}
+#                                                       while entangling at most MAX_LISTED_PAIRS pairs, with
+#                                                       "more": true and "tiles": [...] when there are more
+#   {"op": "legal", "tile": 7}                       -> the entangle pairs with tile 7 in them
+#   {"op": "list"}                                   -> {"op": "games", "games": [...]}
+#   {"op": "leave"}                                  -> {"op": "left"}
+# Failures are answered with {"op": "error", "message": "..."}.
+
+import argparse, asyncio, itertools, logging
+from .engine import GameEngine
+from .constants import HEX_RADIUS
+from .topology import get_topology
+from .actions import legal_actions, is_legal, apply_action, iter_entangle_pairs, entangle_tiles, OFFER_TRADE, DECLINE_TRADE, ENTANGLE
+from .resources import NUM_RESOURCES
+from .protocol import MAX_MESSAGE_BYTES, MAX_STATE_BYTES, encode, decode, decode_action
+from .sync import DeltaEncoder, StaleDelta, for_seat
+from .gamelog import get_logger, log_event, configure_from_env
+
+log = get_logger("server")
+
+DEFAULT_PORT = 8765
+# a client that has this many unsent messages queued is too slow and gets disconnected
+MAX_QUEUED = 256
+# largest board a client may ask for, a full snapshot of it still fits in MAX_STATE_BYTES
+MAX_RADIUS = 30
+# entangle pairs in one "legal" reply, a big board has millions (clients ask per tile for the rest)
+MAX_LISTED_PAIRS = 1000
+
+
+class ProtocolError(Exception):
+    """a request the server answers with an error message"""
+
+
+class Room:
+    """
+    One hosted game. A room is plain data, it has no task of its own, so idle games only cost
+    the memory of their engine.
+    """
+    def __init__(self, game_id, num_players, num_entangled_pairs, board_radius=HEX_RADIUS):
+        self.id = game_id
+        self.game = GameEngine(num_players, board_radius=board_radius)
+        self.game.num_entangled_pairs = num_entangled_pairs
+        self.game.start_game()
+        self.seats = {}     # seat -> Connection
+        # what the clients know, its version counts the applied actions
+        self.sync = DeltaEncoder(self.game)
+
+    def free_seat(self):
+        for seat in range(self.game.num_players):
+            if seat not in self.seats:
+                return seat
+        return None
+
+    def broadcast(self, message):
+        data = encode(message)
+        for conn in list(self.seats.values()):
+            conn.send_raw(data)
+
+    def broadcast_update(self, seat, action, delta):
+        """the delta of an action, every client gets its own view of the hands (sync.for_seat)"""
+        for to, conn in list(self.seats.items()):
+            conn.send({"op": "update", "game": self.id, "seat": seat, "action": action, "delta": for_seat(delta, to)})
+
+    def summary(self):
+        return {"game": self.id, "players": self.game.num_players, "seated": sorted(self.seats),
+                "version": self.sync.version, "running": self.game.runningGame}
+
+
+def _is_int(value):
+    # JSON true/false arrive as bools, which Python counts as ints
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _int_field(request, name, default):
+    """a whole number field of a request; JSON true/false, null, strings and lists are refused"""
+    value = request.get(name, default)
+    if not _is_int(value):
+        raise ProtocolError(f"{name} must be a whole number")
+    return value
+
+
+class Connection:
+    """one client; messages are queued and written by a task of their own so a slow client blocks nobody"""
+    def __init__(self, writer):
+        self.writer = writer
+        self.queue = asyncio.Queue()
+        self.room = None
+        self.seat = None
+        self.created = set()    # ids of the rooms this client created
+        self.closed = False
+
+    def send(self, message):
+        self.send_raw(encode(message))
+
+    def send_raw(self, data):
+        if self.closed:
+            return
+        if self.queue.qsize() >= MAX_QUEUED:
+            self.close()
+            return
+        self.queue.put_nowait(data)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.queue.put_nowait(None)
+
+    async def pump(self):
+        while True:
+            data = await self.queue.get()
+            if data is None:
+                break
+            self.writer.write(data)
+            await self.writer.drain()
+
+
+class GameServer:
+    def __init__(self):
+        self.rooms = {}
+        self._ids = itertools.count(1)
+        self._server = None
+        self._handlers = {}   # connected client -> its task
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        """starts listening, port 0 picks a free port; returns the port"""
+        self._server = await asyncio.start_server(self._handle, host, port, limit=MAX_MESSAGE_BYTES)
+        port = self._server.sockets[0].getsockname()[1]
+        log_event(log, logging.INFO, "server_started", host=host, port=port)
+        return port
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        """stops listening and disconnects every client"""
+        if self._server is not None:
+            self._server.close()
+        # closing the sockets ends every handler through the normal end-of-stream path
+        for conn in list(self._handlers):
+            conn.writer.close()
+        await asyncio.gather(*self._handlers.values(), return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    # -- rooms -----------------------------------------------------
+    def create_room(self, num_players=4, num_entangled_pairs=2, board_radius=HEX_RADIUS):
+        if not 2 <= num_players <= 4:
+            raise ProtocolError("players must be 2, 3 or 4")
+        if not 1 <= board_radius <= MAX_RADIUS:
+            raise ProtocolError(f"radius must be between 1 and {MAX_RADIUS}")
+        # a pair takes two tiles, at most half the board can be entangled
+        max_pairs = len(get_topology(board_radius).hex_coords) // 2
+        if not 0 <= num_entangled_pairs <= max_pairs:
+            raise ProtocolError(f"pairs must be between 0 and {max_pairs}")
+        room = Room(next(self._ids), num_players, num_entangled_pairs, board_radius)
+        self.rooms[room.id] = room
+        log_event(log, logging.INFO, "room_created", game=room.id, players=num_players, pairs=num_entangled_pairs)
+        return room
+
+    def _leave(self, conn):
+        room = conn.room
+        if room is None:
+            return
+        seat = conn.seat
+        room.seats.pop(seat, None)
+        conn.room = conn.seat = None
+        room.broadcast({"op": "left", "game": room.id})
+        game = room.game
+        if room.seats and game.runningGame and game.trading and game.current_player == seat:
+            # an offer waiting for the player who left is declined, the offering player gets their turn back
+            apply_action(game, (DECLINE_TRADE,))
+            room.broadcast_update(seat, (DECLINE_TRADE,), room.sync.delta())
+        # a game nobody plays any more is gone for good, running or not
+        if not room.seats:
+            self.rooms.pop(room.id, None)
+
+    def _drop_unused_rooms(self, conn):
+        """rooms a disconnecting client created that nobody ever joined"""
+        for room_id in conn.created:
+            room = self.rooms.get(room_id)
+            if room is not None and not room.seats:
+                del self.rooms[room_id]
+        conn.created.clear()
+
+    # -- connection handling ---------------------------------------
+    async def _handle(self, reader, writer):
+        conn = Connection(writer)
+        pump = asyncio.create_task(conn.pump())
+        self._handlers[conn] = asyncio.current_task()
+        try:
+            while not conn.closed:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # longer than MAX_MESSAGE_BYTES
+                    break
+                if not line:
+                    break
+                self.dispatch(conn, line)
+        except ConnectionError:
+            pass
+        finally:
+            self._handlers.pop(conn, None)
+            self._leave(conn)
+            self._drop_unused_rooms(conn)
+            conn.close()
+            try:
+                await pump
+            except ConnectionError:
+                pass
+            writer.close()
+
+    def dispatch(self, conn, line):
+        """handles one request line, every request is answered before the next one is read"""
+        request_id = None
+        try:
+            request = decode(line)
+            request_id = request.get("id")
+            handler = getattr(self, "op_" + str(request.get("op")), None)
+            if handler is None:
+                raise ProtocolError(f"unknown op {request.get('op')!r}")
+            reply = handler(conn, request)
+        except ProtocolError as e:
+            reply = {"op": "error", "message": str(e)}
+        except (ValueError, TypeError) as e:
+            # TypeError: a field of the wrong JSON type that got past the checks (a list as a game id)
+            reply = {"op": "error", "message": f"bad request: {e}"}
+        if reply is not None:
+            if request_id is not None:
+                reply["id"] = request_id
+            conn.send(reply)
+
+    # -- requests --------------------------------------------------
+    def op_create(self, conn, request):
+        room = self.create_room(_int_field(request, "players", 4), _int_field(request, "pairs", 2),
+                                _int_field(request, "radius", HEX_RADIUS))
+        conn.created.add(room.id)
+        return {"op": "created", "game": room.id}
+
+    def op_list(self, conn, request):
+        return {"op": "games", "games": [room.summary() for room in self.rooms.values()]}
+
+    def op_join(self, conn, request):
+        room = self.rooms.get(request.get("game"))
+        if room is None:
+            raise ProtocolError("no such game")
+        seat = request.get("seat")
+        if seat is None:
+            seat = room.free_seat()
+            if seat is None:
+                raise ProtocolError("game is full")
+        elif not 0 <= _int_field(request, "seat", None) < room.game.num_players:
+            raise ProtocolError("no such seat")
+        elif room.seats.get(seat) not in (None, conn):
+            raise ProtocolError("seat is taken")
+        self._leave(conn)
+        room.broadcast({"op": "seated", "game": room.id, "seat": seat})
+        room.seats[seat] = conn
+        conn.room, conn.seat = room, seat
+        return {"op": "joined", "game": room.id, "seat": seat, "state": room.sync.full(seat)}
+
+    def op_leave(self, conn, request):
+        self._leave(conn)
+        return {"op": "left"}
+
+    def _seated_room(self, conn):
+        if conn.room is None:
+            raise ProtocolError("join a game first")
+        return conn.room
+
+    def op_sync(self, conn, request):
+        return self._seated_room(conn).sync.full(conn.seat)
+
+    def op_legal(self, conn, request):
+        room = self._seated_room(conn)
+        game = room.game
+        if game.current_player != conn.seat or not game.runningGame:
+            return {"op": "legal", "actions": []}
+        actions = legal_actions(game, max_pairs=MAX_LISTED_PAIRS + 1)
+        if not actions or actions[0][0] != ENTANGLE:
+            return {"op": "legal", "actions": actions}
+        if "tile" in request:
+            tile = _int_field(request, "tile", None)
+            if not 0 <= tile < len(game.tiles):
+                raise ProtocolError("no such tile")
+            return {"op": "legal", "actions": [(ENTANGLE, pair) for pair in iter_entangle_pairs(game, tile)]}
+        if len(actions) <= MAX_LISTED_PAIRS:
+            return {"op": "legal", "actions": actions}
+        return {"op": "legal", "actions": actions[:MAX_LISTED_PAIRS], "more": True, "tiles": entangle_tiles(game)}
+
+    def op_action(self, conn, request):
+        room = self._seated_room(conn)
+        game = room.game
+        if not game.runningGame:
+            raise ProtocolError("the game is over")
+        if game.current_player != conn.seat:
+            raise ProtocolError("not your turn")
+        action = decode_action(request.get("action"))
+        if action[0] == OFFER_TRADE:
+            # offers are not enumerated, the shape is checked here and the engine checks the rest
+            if len(action) != 3 or not _is_int(action[1]) or not isinstance(action[2], tuple) \
+                    or len(action[2]) != NUM_RESOURCES or not all(_is_int(x) for x in action[2]):
+                raise ProtocolError("malformed trade offer")
+            # the game would wait for an answer from an empty seat forever
+            if action[1] not in room.seats:
+                raise ProtocolError("nobody sits in that seat")
+        elif not is_legal(game, action):
+            raise ProtocolError("action not allowed")
+        if not apply_action(game, action):
+            raise ProtocolError("action not allowed")
+        delta = room.sync.delta()
+        room.broadcast_update(conn.seat, action, delta)
+        return {"op": "applied", "version": delta["v"]}
+
+
+class GameClient:
+    """
+    Minimal asyncio client, used by tests, bots and tools talking to a (local) server.
+    Replies are matched to requests by id, everything else (updates of the game) lands in self.events.
+    With a mirror (sync.Mirror) every update is applied to the local copy of the game before it is
+    queued; a missed delta makes the client ask for a full snapshot.
+    """
+    def __init__(self, mirror=None):
+        self.mirror = mirror
+        self.events = asyncio.Queue()
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._reader_task = None
+
+    async def connect(self, host="127.0.0.1", port=DEFAULT_PORT):
+        self.reader, self.writer = await asyncio.open_connection(host, port, limit=MAX_STATE_BYTES)
+        self._reader_task = asyncio.create_task(self._read())
+        return self
+
+    async def _read(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            message = decode(line)
+            if self.mirror is not None:
+                self._follow(message)
+            future = self._pending.pop(message.get("id"), None)
+            if future is not None:
+                future.set_result(message)
+            else:
+                self.events.put_nowait(message)
+        for future in self._pending.values():
+            future.set_exception(ConnectionError("server closed the connection"))
+
+    def _follow(self, message):
+        op = message["op"]
+        if op == "joined":
+            self.mirror.apply(message["state"])
+        elif op == "full":
+            self.mirror.apply(message)
+        elif op == "update":
+            try:
+                self.mirror.apply(message["delta"])
+            except StaleDelta:
+                # the snapshot answer comes back as a "full" message
+                self.writer.write(encode({"op": "sync"}))
+
+    async def request(self, op, **fields):
+        """sends a request and waits for its reply, raises ProtocolError for error replies"""
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self.writer.write(encode({"op": op, "id": request_id, **fields}))
+        await self.writer.drain()
+        reply = await future
+        if reply["op"] == "error":
+            raise ProtocolError(reply["message"])
+        return reply
+
+    async def create(self, players=4, pairs=2, radius=HEX_RADIUS):
+        return (await self.request("create", players=players, pairs=pairs, radius=radius))["game"]
+
+    async def join(self, game, seat=None):
+        return await self.request("join", game=game, seat=seat)
+
+    async def legal(self, tile=None):
+        """the legal actions, while entangling on a big board only the first pairs (or those of `tile`)"""
+        fields = {} if tile is None else {"tile": tile}
+        return [decode_action(a) for a in (await self.request("legal", **fields))["actions"]]
+
+    async def act(self, action):
+        """applies an action, returns the new version; the update itself is already in self.events"""
+        return (await self.request("action", action=action))["version"]
+
+    async def next_event(self, op=None, timeout=None):
+        """the next event, optionally skipping events of other kinds"""
+        while True:
+            event = await asyncio.wait_for(self.events.get(), timeout)
+            if op is None or event["op"] == op:
+                return event
+
+    async def close(self):
+        self.writer.close()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quantum Catan game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+    configure_from_env()
+
+    async def run():
+        server = GameServer()
+        port = await server.start(args.host, args.port)
+        print(f"serving on {args.host}:{port}", flush=True)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# src/sprites.py
+# The board pieces (settlements, cities, number discs, group rings, robber, port markers) drawn once
+# per hex size and colour onto small surfaces, so drawing a piece every frame is a single blit.
+# Sizes follow the hex size, at the standard 50 pixels they match the pieces drawn before.
+#
+#   sheet = SPRITES.sheet(hex_size)
+#   blit(screen, sheet.settlement(PLAYER_COLORS[0], "active"), (x, y))
+
+from collections import OrderedDict
+import pygame
+from .constants import BLACK, WHITE, PREVIEW_COLOR, getFont
+from .topology import BOARD_HEX_SIZE
+
+HIGHLIGHT_COLOR = (255, 255, 0)
+PORT_COLOR = (0, 70, 100)
+# sheets of this many hex sizes are kept, zooming makes new ones
+MAX_SHEETS = 4
+
+
+def blit(screen, sprite, pos):
+    """draws a sprite centred on pos"""
+    surf, hx, hy = sprite
+    screen.blit(surf, (int(pos[0]) - hx, int(pos[1]) - hy))
+
+
+def _canvas(half):
+    """transparent square surface with its centre at (half, half)"""
+    surf = pygame.Surface((2*half + 1, 2*half + 1), pygame.SRCALPHA)
+    if pygame.display.get_surface() is not None:
+        surf = surf.convert_alpha()
+    return surf
+
+
+class SpriteSheet:
+    """
+    The pieces at one hex size. Every piece is made on first use and kept, as (surface, half width,
+    half height) with the piece centred on the surface. Variants:
+
+    None        the piece on the board
+    "active"    with the yellow highlight it gets when it just produced
+    "good"/"bad"  the placement preview outline (PREVIEW_COLOR)
+    """
+    def __init__(self, hex_size):
+        self.hex_size = hex_size
+        self.k = hex_size / BOARD_HEX_SIZE
+        self._sprites = {}
+
+    def _px(self, n, least=1):
+        return max(least, round(n * self.k))
+
+    def _get(self, key, make):
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            sprite = self._sprites[key] = make()
+        return sprite
+
+    def settlement(self, color, variant=None):
+        def make():
+            r = self._px(12, 3)
+            surf = _canvas(r + 1)
+            c = (r + 1, r + 1)
+            if variant in PREVIEW_COLOR:
+                pygame.draw.circle(surf, PREVIEW_COLOR[variant], c, r, width=self._px(2))
+            else:
+                pygame.draw.circle(surf, color, c, r)
+                pygame.draw.circle(surf, BLACK, c, self._px(2))
+                if variant == "active":
+                    pygame.draw.circle(surf, HIGHLIGHT_COLOR, c, r, width=self._px(3))
+            return (surf, r + 1, r + 1)
+        return self._get(("settlement", color, variant), make)
+
+    def city(self, color, variant=None):
+        def make():
+            h = self._px(13, 3)
+            surf = _canvas(h)
+            box = (0, 0, 2*h, 2*h)
+            if variant in PREVIEW_COLOR:
+                pygame.draw.rect(surf, PREVIEW_COLOR[variant], box, width=self._px(2))
+            else:
+                pygame.draw.rect(surf, color, box)
+                pygame.draw.rect(surf, BLACK, box, self._px(2))
+                if variant == "active":
+                    pygame.draw.rect(surf, HIGHLIGHT_COLOR, box, width=self._px(3))
+            return (surf, h, h)
+        return self._get(("city", color, variant), make)
+
+    @property
+    def disc(self):
+        """radius of the number discs"""
+        return int(self.hex_size * 18 // 50)
+
+    def number(self, n):
+        def make():
+            disc = self.disc
+            surf = _canvas(disc + 1)
+            pygame.draw.circle(surf, WHITE, (disc + 1, disc + 1), disc)
+            text = getFont(max(8, disc)).render(str(n), True, BLACK)
+            surf.blit(text, (disc + 1 - text.get_width() / 2, disc + 1 - text.get_height() / 2))
+            return (surf, disc + 1, disc + 1)
+        return self._get(("number", n), make)
+
+    def ring(self, colour):
+        """the circle around the number of an entangled tile, in its group's colour"""
+        def make():
+            r = self.disc + 2
+            surf = _canvas(r + 1)
+            pygame.draw.circle(surf, colour, (r + 1, r + 1), r, width=max(2, self.disc // 5 + 1))
+            return (surf, r + 1, r + 1)
+        return self._get(("ring", colour), make)
+
+    def robber(self):
+        def make():
+            r = self._px(24, 4)
+            surf = _canvas(r + 1)
+            pygame.draw.circle(surf, BLACK, (r + 1, r + 1), r, width=self._px(8))
+            return (surf, r + 1, r + 1)
+        return self._get(("robber",), make)
+
+    def port(self, owned):
+        """the dot on a port's corners, bigger when someone built there"""
+        def make():
+            r = max(2, (16.5 if owned else 8) * self.k)
+            half = int(r) + 1
+            surf = _canvas(half)
+            pygame.draw.circle(surf, PORT_COLOR, (half, half), r)
+            return (surf, half, half)
+        return self._get(("port", owned), make)
+
+    def port_label(self, port):
+        def make():
+            text = getFont(12).render(port.replace("port_", "").upper(), True, BLACK)
+            return (text, text.get_width() // 2, text.get_height() // 2)
+        return self._get(("port_label", port), make)
+
+
+class SpriteAtlas:
+    """SpriteSheets by hex size, the few most recently used are kept"""
+    def __init__(self, max_sheets=MAX_SHEETS):
+        self.max_sheets = max_sheets
+        self._sheets = OrderedDict()
+
+    def sheet(self, hex_size):
+        # zooming gives fractional sizes, a sheet per whole pixel is plenty
+        key = max(1, round(hex_size))
+        sheet = self._sheets.get(key)
+        if sheet is None:
+            sheet = self._sheets[key] = SpriteSheet(key)
+            if len(self._sheets) > self.max_sheets:
+                self._sheets.popitem(last=False)
+        else:
+            self._sheets.move_to_end(key)
+        return sheet
+
+    def clear(self):
+        self._sheets.clear()
+
+
+# shared instance used by the drawing code
+SPRITES = SpriteAtlas()
@@ -0,0 +1,328 @@
+# src/stats.py
+# Per turn statistics of simulated games, stored column by column in .npy chunks.
+# Recording appends plain numbers to arrays, analysis loads only the columns it needs.
+#
+#   store = StatsStore("runs/sweep1")
+#   rec = Recorder(store)
+#   rec.attach(game, game_id); play_game(game, bots); rec.finish(game); rec.close()
+#   roll_histogram(store)
+
+import os, itertools
+from array import array
+import numpy as np
+from .engine import GameObserver
+
+MAX_PLAYERS = 4
+NO_TILE = -1
+DEFAULT_CHUNK_ROWS = 1 << 16
+
+# table -> column -> (dtype, width), width > 1 is stored as a 2D (rows, width) array
+SCHEMA = {
+    # one row per finished turn
+    "turns": {
+        "game": ("i8", 1), "turn": ("i4", 1), "round": ("i2", 1), "player": ("i1", 1),
+        "roll": ("i1", 1),                   # 0 when the turn ended without a roll
+        "produced": ("i2", MAX_PLAYERS),     # classical resources every player got this turn
+        "tokens": ("i2", MAX_PLAYERS),       # superposed tokens every player got this turn
+        "collapses": ("i1", 1),              # entanglement groups measured this turn
+        "robber": ("i2", 1),                 # tile the robber moved to, NO_TILE if it did not move
+        "interference": ("i2", 1),           # tile an interference card was played on, or NO_TILE
+        "score": ("i1", MAX_PLAYERS),        # scores at the end of the turn
+    },
+    # one row per entanglement group and turn in which something happened to it. Group ids are
+    # reused once a group collapses, "entanglement" numbers the groups of a game without reuse
+    "groups": {
+        "game": ("i8", 1), "turn": ("i4", 1), "group": ("i2", 1), "entanglement": ("i2", 1),
+        "issued": ("i2", 1), "collapsed": ("i1", 1),
+    },
+    # one row per game
+    "games": {
+        "game": ("i8", 1), "players": ("i1", 1), "pairs": ("i1", 1), "rounds": ("i2", 1),
+        "turns": ("i4", 1), "winner": ("i1", 1),   # -1 when nobody won
+        "score": ("i1", MAX_PLAYERS),
+    },
+}
+
+# array module typecodes used while buffering
+_TYPECODES = {"i1": "b", "i2": "h", "i4": "i", "i8": "q"}
+
+
+class StatsStore:
+    """
+    A directory of append-only tables. Every flush writes a new chunk folder per table with one
+    .npy file per column, chunks are never rewritten, so several processes can append to the
+    same store as long as their chunk names differ (the pid is part of the name).
+    """
+    def __init__(self, path):
+        self.path = path
+        self._counter = itertools.count()
+        for table in SCHEMA:
+            os.makedirs(os.path.join(path, table), exist_ok=True)
+
+    def append(self, table, columns):
+        """columns: name -> array like, all with the same number of rows"""
+        n = len(next(iter(columns.values())))
+        if n == 0:
+            return None
+        chunk = os.path.join(self.path, table, f"{os.getpid()}-{next(self._counter):06d}")
+        tmp = chunk + ".tmp"
+        os.makedirs(tmp)
+        for name, (dtype, width) in SCHEMA[table].items():
+            values = np.asarray(columns[name], dtype=dtype)
+            if width > 1:
+                values = values.reshape(n, width)
+            np.save(os.path.join(tmp, name + ".npy"), values)
+        # readers only see complete chunks
+        os.rename(tmp, chunk)
+        return chunk
+
+    def chunks(self, table):
+        root = os.path.join(self.path, table)
+        return sorted(os.path.join(root, c) for c in os.listdir(root) if not c.endswith(".tmp"))
+
+    def column(self, table, name, mmap=True):
+        """one column over all chunks as a single array (memory mapped chunks, then concatenated)"""
+        dtype, width = SCHEMA[table][name]
+        parts = [np.load(os.path.join(c, name + ".npy"), mmap_mode="r" if mmap else None) for c in self.chunks(table)]
+        if not parts:
+            return np.zeros((0, width) if width > 1 else 0, dtype=dtype)
+        return np.concatenate(parts)
+
+    def columns(self, table, *names):
+        return {name: self.column(table, name) for name in names}
+
+    def __len__(self):
+        return sum(len(np.load(os.path.join(c, "game.npy"), mmap_mode="r")) for c in self.chunks("games"))
+
+
+class _Buffer:
+    """rows of one table collected in typed arrays until the next flush"""
+    def __init__(self, table):
+        self.table = table
+        self.cols = {name: array(_TYPECODES[dtype]) for name, (dtype, width) in SCHEMA[table].items()}
+        self.rows = 0
+
+    def add(self, **values):
+        for name, col in self.cols.items():
+            v = values[name]
+            if isinstance(v, (list, tuple)):
+                col.extend(v)
+            else:
+                col.append(v)
+        self.rows += 1
+
+    def flush(self, store):
+        if self.rows:
+            store.append(self.table, self.cols)
+        self.__init__(self.table)
+
+
+class Recorder(GameObserver):
+    """
+    Follows games through the engine's observer hooks and writes one row per turn.
+    attach() a game before playing it, finish() it afterwards, close() at the end to write the rest.
+    One recorder can follow one game at a time.
+    """
+    def __init__(self, store, chunk_rows=DEFAULT_CHUNK_ROWS):
+        self.store = store
+        self.chunk_rows = chunk_rows
+        self.buffers = {table: _Buffer(table) for table in SCHEMA}
+        self.game = None
+        self.game_id = None
+
+    # -- game lifetime ---------------------------------------------
+    def attach(self, game, game_id):
+        if self.game is not None:
+            self.detach()
+        self.game, self.game_id = game, game_id
+        self.turn = 0
+        self.entanglements = {}     # group id -> number of the entanglement that has it now
+        self._next_entanglement = itertools.count()
+        game.observers.append(self)
+        self._new_turn()
+
+    def detach(self):
+        if self.game is not None and self in self.game.observers:
+            self.game.observers.remove(self)
+        self.game = None
+
+    def finish(self, game):
+        """writes the last (unfinished) turn and the game row, then detaches"""
+        self._end_turn(game)
+        winner = game.scores.winner
+        self.buffers["games"].add(
+            game=self.game_id, players=game.num_players, pairs=game.num_entangled_pairs,
+            rounds=game.round, turns=self.turn, winner=-1 if winner is None else winner,
+            score=self._per_player(p.score for p in game.players))
+        self.detach()
+        if self.buffers["turns"].rows >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        for buf in self.buffers.values():
+            buf.flush(self.store)
+
+    def close(self):
+        self.detach()
+        self.flush()
+
+    # -- observer hooks --------------------------------------------
+    def on_roll(self, game, roll):
+        self.roll = roll
+
+    def on_produce(self, game, player_idx, resource, amount):
+        self.produced[player_idx] += amount
+
+    def on_token(self, game, player_idx, group, amount):
+        self.tokens[player_idx] += amount
+        key = self._entanglement(group)
+        issued, collapsed = self.group_events.get(key, (0, 0))
+        self.group_events[key] = (issued + amount, collapsed)
+
+    def on_collapse(self, game, group, tile_indices):
+        self.collapses += 1
+        key = self._entanglement(group)
+        issued, collapsed = self.group_events.get(key, (0, 0))
+        self.group_events[key] = (issued, collapsed + 1)
+        # the next group with this id is a new one
+        del self.entanglements[group]
+
+    def on_robber(self, game, tile_idx):
+        self.robber = tile_idx
+
+    def on_interference(self, game, tile_idx):
+        self.interference = tile_idx
+
+    def on_turn_end(self, game):
+        self._end_turn(game)
+
+    # -- internals -------------------------------------------------
+    def _new_turn(self):
+        self.roll = 0
+        self.produced = [0] * MAX_PLAYERS
+        self.tokens = [0] * MAX_PLAYERS
+        self.collapses = 0
+        self.robber = NO_TILE
+        self.interference = NO_TILE
+        self.group_events = {}
+
+    def _entanglement(self, group):
+        """(group, entanglement number) for a group id of the followed game"""
+        if group not in self.entanglements:
+            self.entanglements[group] = next(self._next_entanglement)
+        return (group, self.entanglements[group])
+
+    @staticmethod
+    def _per_player(values):
+        values = list(values)
+        return values + [0] * (MAX_PLAYERS - len(values))
+
+    def _end_turn(self, game):
+        turns = self.buffers["turns"]
+        turns.add(game=self.game_id, turn=self.turn, round=game.round, player=game.current_player,
+                  roll=self.roll, produced=self.produced, tokens=self.tokens, collapses=self.collapses,
+                  robber=self.robber, interference=self.interference,
+                  score=self._per_player(p.score for p in game.players))
+        groups = self.buffers["groups"]
+        for (group, entanglement), (issued, collapsed) in self.group_events.items():
+            groups.add(game=self.game_id, turn=self.turn, group=group, entanglement=entanglement,
+                       issued=issued, collapsed=collapsed)
+        self.turn += 1
+        self._new_turn()
+
+
+# -- analysis, everything works on whole columns -------------------
+
+def roll_histogram(store):
+    """how often each dice total (index 2..12) was rolled"""
+    rolls = store.column("turns", "roll")
+    return np.bincount(rolls[rolls > 0], minlength=13)
+
+
+def players_per_turn(store):
+    """number of players of the game every turn row belongs to, 0 for games without a game row"""
+    game = store.column("turns", "game")
+    g = store.columns("games", "game", "players")
+    if len(g["game"]) == 0:
+        return np.zeros(len(game), dtype=np.int8)
+    order = np.argsort(g["game"], kind="stable")
+    ids = g["game"][order]
+    at = np.minimum(np.searchsorted(ids, game), len(ids) - 1)
+    return np.where(ids[at] == game, g["players"][order][at], 0)
+
+
+def production_by_seat(store, players):
+    """
+    mean classical resources produced per turn for every seat, in games with `players` players
+    only: seat 2 of a 3 player game and of a 4 player game are not the same place at the table
+    """
+    produced = store.column("turns", "produced")[players_per_turn(store) == players]
+    if len(produced) == 0:
+        return np.zeros(MAX_PLAYERS)
+    return produced.mean(axis=0)
+
+
+def tokens_by_group(store):
+    """
+    Totals per entanglement (a group from being entangled to its collapse), as columns with one
+    row each: game, group (its id on the board), issued tokens and collapsed (0 or 1).
+    """
+    g = store.columns("groups", "game", "group", "entanglement", "issued", "collapsed")
+    if len(g["game"]) == 0:
+        return {name: np.zeros(0, dtype=np.int64) for name in ("game", "group", "issued", "collapsed")}
+    keys, first, index = np.unique(np.stack([g["game"], g["entanglement"]], axis=1), axis=0,
+                                   return_index=True, return_inverse=True)
+    index = index.ravel()
+    return {
+        "game": keys[:, 0], "group": g["group"][first].astype(np.int64),
+        "issued": np.bincount(index, weights=g["issued"], minlength=len(keys)).astype(np.int64),
+        "collapsed": np.bincount(index, weights=g["collapsed"], minlength=len(keys)).astype(np.int64),
+    }
+
+
+def robber_targets(store, num_tiles=None):
+    """how often the robber was sent to each tile"""
+    robber = store.column("turns", "robber")
+    robber = robber[robber != NO_TILE]
+    return np.bincount(robber, minlength=num_tiles or 0)
+
+
+def interference_targets(store, num_tiles=None):
+    tiles = store.column("turns", "interference")
+    tiles = tiles[tiles != NO_TILE]
+    return np.bincount(tiles, minlength=num_tiles or 0)
+
+
+def win_rate_by_seat(store, players=None):
+    """share of games won by each seat, optionally only games with the given number of players"""
+    g = store.columns("games", "players", "winner")
+    winners = g["winner"] if players is None else g["winner"][g["players"] == players]
+    if len(winners) == 0:
+        return np.zeros(MAX_PLAYERS)
+    return np.bincount(winners[winners >= 0], minlength=MAX_PLAYERS) / len(winners)
+
+
+def game_length_histogram(store):
+    """number of games per length in rounds"""
+    return np.bincount(store.column("games", "rounds"))
+
+
+def mean_score_by_round(store):
+    """
+    (rounds, MAX_PLAYERS) mean score of every seat at the end of each round, over the games that
+    got to the end of it (or stopped in it). Only the last turn of a round counts, every game
+    weighs the same whatever the number of turns in its rounds.
+    """
+    t = store.columns("turns", "game", "turn", "round", "score")
+    if len(t["round"]) == 0:
+        return np.zeros((0, MAX_PLAYERS))
+    order = np.lexsort((t["turn"], t["round"], t["game"]))
+    games, rounds = t["game"][order], t["round"][order].astype(np.int64)
+    last = np.ones(len(order), dtype=bool)
+    last[:-1] = (games[1:] != games[:-1]) | (rounds[1:] != rounds[:-1])
+    rounds, scores = rounds[last], t["score"][order][last]
+    n = int(rounds.max()) + 1
+    totals = np.zeros((n, MAX_PLAYERS))
+    np.add.at(totals, rounds, scores)
+    counts = np.bincount(rounds, minlength=n)
+    return totals / np.maximum(counts, 1)[:, None]
@@ -0,0 +1,382 @@
+# src/sync.py
+# Keeping remote copies of a game up to date. A client gets one compact full snapshot when it
+# (re)connects and after that a small versioned delta per action: only the tiles, buildings,
+# hands, turn fields and messages that changed. Clients apply both onto a local GameEngine
+# (or GameState), so the normal drawing code works on the mirror.
+#
+#   server: enc = DeltaEncoder(game); send(enc.full(seat)); ...; apply_action(game, a)
+#           d = enc.delta(); to every client: send(for_seat(d, its seat))
+#   client: mirror = Mirror(GameEngine()); mirror.apply(message)   # full or delta
+
+import base64, sys
+from array import array
+from .board import generate_sea_ring
+from .resources import Inventory
+from .scoring import TITLES, CATEGORIES
+from .actions import DEV_CARDS
+from .tiles import TileStore
+from .topology import get_topology
+
+# TileStore columns sent in full snapshots: (name, array typecode)
+TILE_COLUMNS = (("resource", "b"), ("number", "b"), ("quantum", "b"), ("ent_group", "h"))
+# the columns that can change during a game, in the order of a tile row in a delta
+TILE_ROW = ("resource", "quantum", "ent_group")
+
+
+class StaleDelta(Exception):
+    """a delta that does not continue the mirror's version, the client needs a full snapshot"""
+
+
+# the parts of a hand only its owner may see, and what everybody else gets instead: how many
+HIDDEN_HAND = {"resources": "cards", "tokens": "token_count", "held": "held_count"}
+
+
+# -- encoding helpers ----------------------------------------------
+def _pack(col):
+    # columns go over the wire little endian, whatever the server runs on
+    if sys.byteorder == "big":
+        col = array(col.typecode, col)
+        col.byteswap()
+    return base64.b64encode(col.tobytes()).decode("ascii")
+
+
+def _unpack(typecode, text):
+    col = array(typecode)
+    col.frombytes(base64.b64decode(text))
+    if sys.byteorder == "big":
+        col.byteswap()
+    return col
+
+
+def tile_row(tiles, i):
+    return [i, tiles.resource[i], tiles.quantum[i], tiles.ent_group[i]]
+
+
+def group_row(states, group):
+    """[group, members, resources, weights], or [group, None] once the group is gone"""
+    return [group, states.row(group) if group in states else None]
+
+
+def hand(game, i):
+    """one player's cards, counts are lists in RESOURCES / CATEGORIES / DEV_CARDS order"""
+    p = game.players[i]
+    counts = game.scores.counts[i]
+    return {
+        "resources": list(p.resources.counts),
+        "tokens": [[t["group"], t["from_tile_idx"]] for t in p.tokens],
+        "points": [counts[c] for c in CATEGORIES],
+        "held": [p.held_dev_cards[c] for c in DEV_CARDS],
+        "played": [p.played_dev_cards[c] for c in DEV_CARDS],
+        "knights": p.knightmight,
+    }
+
+
+def public_hand(h):
+    """what opponents see of a hand (or of the changed fields of one): counts instead of cards"""
+    out = {k: v for k, v in h.items() if k not in HIDDEN_HAND}
+    for field, count in HIDDEN_HAND.items():
+        if field in h:
+            out[count] = len(h[field]) if field == "tokens" else sum(h[field])
+    return out
+
+
+def for_seat(message, seat):
+    """
+    A full snapshot or delta as the client in `seat` may see it: its own hand whole, only counts of
+    everyone else's. seat None is a spectator and sees counts only. Encoders make one message per
+    action, the server sends every client its own view of it.
+    """
+    if "hands" not in message:
+        return message
+    if message["op"] == "full":
+        hands = [h if i == seat else public_hand(h) for i, h in enumerate(message["hands"])]
+    else:
+        hands = [[i, h if i == seat else public_hand(h)] for i, h in message["hands"]]
+    return {**message, "hands": hands}
+
+
+def meta(game):
+    """the small per game fields: whose turn, phase, dice, robber, pending decisions, open trade"""
+    turn = game.turn
+    return {
+        "round": game.round,
+        "current_player": game.current_player,
+        "phase": int(turn.phase),
+        "rolled": turn.rolled,
+        "dev_card_played": turn.dev_card_played,
+        "setup_placed": turn.setup_placed,
+        "last_roll": game.last_roll,
+        "robber": game.robber_idx,
+        "running": game.runningGame,
+        "winner": game.scores.winner,
+        "longest_road": game.scores.holder("longest_road"),
+        "largest_army": game.scores.holder("largest_army"),
+        "moving_robber": game.moving_robber,
+        "victims": list(game.possible_victims),
+        "entangling": game.entangling,
+        "interfering": game.interfering,
+        "monopolysing": game.monopolysing,
+        "resources_to_collect": game.resources_to_collect,
+        "free_roads": game.roads_left_to_build if game.has_free_roads else 0,
+        "trade_from": game.trading_partner if game.trading else None,
+        "trade_offer": list(game.tradingAddedResources.counts) if game.trading else None,
+    }
+
+
+def _messages(game, count):
+    """texts of the last `count` pushed messages that are still in the log"""
+    if count <= 0:
+        return []
+    return [text for text, _ in game.message_log[-min(count, game.message_max):]]
+
+
+# -- server side ---------------------------------------------------
+class DeltaEncoder:
+    """
+    Remembers what remote clients already know about one game. Tiles and buildings are found
+    through the engine's dirty sets, hands and turn fields are compared with the last sent values
+    (a few numbers per player) and only changed fields are sent, so a delta costs about as much
+    as the action it describes, whatever the size of the board.
+    All clients of a game share one encoder. delta() holds every hand and must not be sent as it
+    is: every client gets for_seat(delta, its seat), full(seat) is already filtered.
+    """
+    def __init__(self, game):
+        self.game = game
+        self.version = 0
+        self._mark_sent()
+
+    def _mark_sent(self):
+        game = self.game
+        game.tiles.dirty.clear()
+        game.tiles.states.dirty.clear()
+        game.dirty_vertices.clear()
+        game.dirty_roads.clear()
+        self._hands = [hand(game, i) for i in range(game.num_players)]
+        self._meta = meta(game)
+        self._messages = game.messages_pushed
+
+    def full(self, seat=None):
+        """the whole game as `seat` may see it, for clients that join, reconnect or missed a delta"""
+        game = self.game
+        tiles = game.tiles
+        road_index = game.topology.road_index
+        return for_seat({
+            "op": "full", "v": self.version,
+            "players": game.num_players, "radius": game.board_radius,
+            "tiles": {name: _pack(getattr(tiles, name)) for name, _ in TILE_COLUMNS},
+            "groups": [group_row(tiles.states, g) for g in tiles.states.groups()],
+            "ports": [s["port"] for s in game.sea_tiles],
+            "settlements": [[v, owner, typ] for v, (owner, typ) in game.settlements_owner.items()],
+            "roads": [[road_index[edge], owner] for edge, owner in game.roads_owner.items()],
+            "hands": [hand(game, i) for i in range(game.num_players)],
+            "meta": meta(game),
+            "messages": _messages(game, game.message_max),
+        }, seat)
+
+    def delta(self):
+        """everything that changed since the last delta (or since the encoder was made), as the next version"""
+        game = self.game
+        out = {"op": "delta", "v": self.version + 1, "base": self.version}
+        tiles = game.tiles
+        if tiles.dirty:
+            out["tiles"] = [tile_row(tiles, i) for i in sorted(tiles.dirty)]
+            tiles.dirty.clear()
+        if tiles.states.dirty:
+            out["groups"] = [group_row(tiles.states, g) for g in sorted(tiles.states.dirty)]
+            tiles.states.dirty.clear()
+        if game.dirty_vertices:
+            owners = game.settlements_owner
+            out["settlements"] = [[v, *owners[v]] for v in sorted(game.dirty_vertices)]
+            game.dirty_vertices.clear()
+        if game.dirty_roads:
+            roads, owners = game.roads_list, game.roads_owner
+            out["roads"] = [[r, owners[tuple(roads[r])]] for r in sorted(game.dirty_roads)]
+            game.dirty_roads.clear()
+        hands = []
+        for i in range(game.num_players):
+            h, old = hand(game, i), self._hands[i]
+            if h != old:
+                hands.append([i, {k: v for k, v in h.items() if old[k] != v}])
+                self._hands[i] = h
+        if hands:
+            out["hands"] = hands
+        m = meta(game)
+        changed = {k: v for k, v in m.items() if self._meta[k] != v}
+        if changed:
+            out["meta"] = changed
+            self._meta = m
+        if game.messages_pushed != self._messages:
+            out["messages"] = _messages(game, game.messages_pushed - self._messages)
+            self._messages = game.messages_pushed
+        self.version += 1
+        return out
+
+
+# -- client side ---------------------------------------------------
+class Mirror:
+    """
+    A local copy of a remote game. `game` is any GameEngine (a GameState for a window) that was
+    reset once, the mirror overwrites its state and never runs rules on it.
+    apply() takes full snapshots and deltas; a delta that does not continue the current version
+    raises StaleDelta, the client then asks the server for a full snapshot.
+    """
+    def __init__(self, game):
+        self.game = game
+        self.version = None
+
+    def apply(self, message):
+        if message["op"] == "full":
+            self.apply_full(message)
+        elif message["op"] == "delta":
+            self.apply_delta(message)
+        else:
+            raise ValueError(f"not a sync message: {message['op']!r}")
+
+    def apply_full(self, snap):
+        game = self.game
+        if game.board_radius != snap["radius"] or game.num_players != snap["players"]:
+            game.board_radius = snap["radius"]
+            game.num_players = snap["players"]
+            game.reset_game()
+        topology = get_topology(game.board_radius)
+        game.topology = topology
+
+        cols = {name: _unpack(code, snap["tiles"][name]) for name, code in TILE_COLUMNS}
+        tiles = TileStore(topology.hex_coords, ["desert"] * len(topology.hex_coords), cols["number"], game.rng)
+        for name, _ in TILE_COLUMNS:
+            setattr(tiles, name, cols[name])
+        tiles._index_numbers()
+        for group, row in snap["groups"]:
+            tiles.states.set_row(group, row)
+        game.tiles = tiles
+
+        game.sea_tiles = generate_sea_ring(topology.sea_coords, game.rng)
+        for s_tile, port in zip(game.sea_tiles, snap["ports"]):
+            s_tile["port"] = port
+        game._index_ports()
+
+        game.settlements_owner = {}
+        game.roads_owner = {}
+        for p in game.players:
+            p.buildables_placed = {"settlements": [], "cities": [], "roads": []}
+        self._set_buildings(snap["settlements"], snap["roads"])
+        for i, h in enumerate(snap["hands"]):
+            self._set_hand(i, h)
+        self._set_meta(snap["meta"])
+        game.message_log = []
+        self._show_messages(snap["messages"])
+        self.version = snap["v"]
+
+    def apply_delta(self, delta):
+        if self.version is None or delta["base"] != self.version:
+            raise StaleDelta(f"mirror is at version {self.version}, delta needs {delta['base']}")
+        tiles = self.game.tiles
+        for row in delta.get("tiles", ()):
+            i = row[0]
+            for name, value in zip(TILE_ROW, row[1:]):
+                getattr(tiles, name)[i] = value
+        for group, row in delta.get("groups", ()):
+            tiles.states.set_row(group, row)
+        self._set_buildings(delta.get("settlements", ()), delta.get("roads", ()))
+        for i, h in delta.get("hands", ()):
+            self._set_hand(i, h)
+        if "meta" in delta:
+            self._set_meta(delta["meta"])
+        self._show_messages(delta.get("messages", ()))
+        self.version = delta["v"]
+
+    # -- internals -------------------------------------------------
+    def _set_buildings(self, settlements, roads):
+        game = self.game
+        for v, owner, typ in settlements:
+            game.settlements_owner[v] = (owner, typ)
+            placed = game.players[owner].buildables_placed
+            if v not in placed["settlements"]:
+                placed["settlements"].append(v)
+            if typ == "city" and v not in placed["cities"]:
+                placed["cities"].append(v)
+        roads_list = game.roads_list
+        for r, owner in roads:
+            game.roads_owner[tuple(roads_list[r])] = owner
+            placed = game.players[owner].buildables_placed["roads"]
+            if r not in placed:
+                placed.append(r)
+
+    def _set_hand(self, i, h):
+        """
+        h is a whole hand (full snapshot) or just its changed fields (delta). Of opponents the
+        mirror only gets counts (see for_seat), their cards stay empty and the counts go to
+        player.hidden_cards / hidden_tokens / hidden_dev_cards.
+        """
+        game = self.game
+        p = game.players[i]
+        if "cards" in h:
+            p.resources = Inventory()
+            p.hidden_cards = h["cards"]
+        if "token_count" in h:
+            p.tokens = []
+            p.hidden_tokens = h["token_count"]
+        if "held_count" in h:
+            p.held_dev_cards = dict.fromkeys(DEV_CARDS, 0)
+            p.hidden_dev_cards = h["held_count"]
+        if "resources" in h:
+            p.resources = Inventory(h["resources"])
+            p.hidden_cards = 0
+        if "tokens" in h:
+            tiles = game.tiles
+            p.tokens = [{"type": "entangled", "group": group, "from_tile_idx": ti, "tile_coord": tiles.coords[ti],
+                         "possible": tiles[ti].get("superposed", [])}
+                        for group, ti in h["tokens"]]
+            p.hidden_tokens = 0
+        if "points" in h:
+            game.scores.counts[i] = dict(zip(CATEGORIES, h["points"]))
+            p.score = game.scores.score(i)
+        if "held" in h:
+            p.held_dev_cards = dict(zip(DEV_CARDS, h["held"]))
+            p.hidden_dev_cards = 0
+        if "played" in h:
+            p.played_dev_cards = dict(zip(DEV_CARDS, h["played"]))
+        if "knights" in h:
+            p.knightmight = h["knights"]
+
+    def _set_meta(self, m):
+        game = self.game
+        # a delta only carries the fields that changed, everything else keeps its value
+        if "round" in m:
+            game.round = m["round"]
+        if "current_player" in m:
+            game.current_player = m["current_player"]
+        if "last_roll" in m:
+            game.last_roll = m["last_roll"]
+        if "robber" in m:
+            game.robber_idx = m["robber"]
+        if "running" in m:
+            game.runningGame = m["running"]
+        if "winner" in m:
+            game.scores.winner = m["winner"]
+            game.playerWon = m["winner"] is not None
+        for title in TITLES:
+            if title in m:
+                game.scores.holders[title] = m[title]
+        for key in ("moving_robber", "entangling", "interfering", "monopolysing", "resources_to_collect"):
+            if key in m:
+                setattr(game, key, m[key])
+        if "victims" in m:
+            game.possible_victims = list(m["victims"])
+        if "free_roads" in m:
+            game.roads_left_to_build = m["free_roads"]
+            game.has_free_roads = m["free_roads"] > 0
+        if "trade_from" in m:
+            game.trading = m["trade_from"] is not None
+            game.trading_partner = m["trade_from"]
+        if "trade_offer" in m:
+            game.tradingAddedResources = Inventory(m["trade_offer"]) if m["trade_offer"] else Inventory()
+        turn = game.turn
+        if any(k in m for k in ("phase", "rolled", "dev_card_played", "setup_placed")):
+            turn.restore(m.get("phase", turn.phase), m.get("rolled", turn.rolled),
+                         m.get("dev_card_played", turn.dev_card_played), m.get("setup_placed", turn.setup_placed))
+
+    def _show_messages(self, texts):
+        # the mirror's clock decides how long they stay on screen
+        for text in texts:
+            self.game.push_message(text)
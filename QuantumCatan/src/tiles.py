@@ -0,0 +1,237 @@
+# src/tiles.py
+# Land tiles stored as columns of typed arrays instead of one dict per tile
+
+import random
+from array import array
+from .resources import RESOURCE_NAMES, NO_RESOURCE, resource_code, resource_name
+from .quantum import QuantumState
+
+# number of dice combinations that roll each number
+PIPS = {2:1, 3:2, 4:3, 5:4, 6:5, 8:5, 9:4, 10:3, 11:2, 12:1}
+
+TILE_KEYS = ("coord", "resource", "number", "quantum", "ent_group", "superposed", "distribution")
+
+
+class TileStore:
+    """
+    All land tiles of one board. Every field is its own array indexed by tile index:
+
+    resource        resource code (see resources.py), NO_RESOURCE while the tile is quantum
+    number          dice number, 0 for the desert
+    quantum         1 if the tile is in a superposition
+    ent_group       entanglement group id, 0 for none
+
+    The superpositions themselves live per group in `states` (see quantum.py).
+    The coords tuple comes from the shared topology. self[i] gives a TileView that behaves like the
+    old tile dict ("resource", "superposed", ...), so drawing and UI code did not have to change.
+    """
+    def __init__(self, coords, resources, numbers, rng=random):
+        n = len(coords)
+        self.coords = coords
+        self.resource = array("b", (resource_code(r) for r in resources))
+        self.number = array("b", (num or 0 for num in numbers))
+        self.quantum = array("b", bytes(n))
+        self.ent_group = array("h", [0] * n)
+        # collapses are seeded from the board's generator, a seeded board measures the same way every time
+        self.states = QuantumState(rng.getrandbits(64))
+        # tiles changed since the last delta was sent to remote clients (see sync.py)
+        self.dirty = set()
+        self._index_numbers()
+
+    def _index_numbers(self):
+        # dice number -> tiles with that number, numbers never move during a game
+        by_number = {}
+        for i, num in enumerate(self.number):
+            if num:
+                by_number.setdefault(num, []).append(i)
+        self._by_number = {num: tuple(idxs) for num, idxs in by_number.items()}
+
+    def __len__(self):
+        return len(self.coords)
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += len(self.coords)
+        if not 0 <= idx < len(self.coords):
+            raise IndexError("tile index out of range")
+        return TileView(self, idx)
+
+    def __iter__(self):
+        for i in range(len(self.coords)):
+            yield TileView(self, i)
+
+    def __repr__(self):
+        return f"TileStore({[dict(t.items()) for t in self]})"
+
+    # -- column queries --------------------------------------------
+    def tiles_with_number(self, number):
+        return self._by_number.get(number, ())
+
+    def group_members(self, group):
+        """tile indices in the entanglement group, in board order"""
+        return list(self.states.members_of(group))
+
+    def groups(self):
+        """ids of the entanglement groups on the board"""
+        return self.states.groups()
+
+    def quantum_tiles(self):
+        return sorted(self.states.all_members())
+
+    def pips(self, tile_indices=None):
+        """total dice combinations that produce on the given tiles (all tiles if None)"""
+        numbers = self.number if tile_indices is None else (self.number[i] for i in tile_indices)
+        return sum(PIPS.get(num, 0) for num in numbers)
+
+    def expected_yield(self, tile_indices=None, blocked=None):
+        """
+        Expected resources per roll from the given tiles, as a list indexed by resource code (desert last).
+        Quantum tiles count by the chance of each resource of their group.
+        """
+        out = [0.0] * len(RESOURCE_NAMES)
+        idxs = range(len(self.coords)) if tile_indices is None else tile_indices
+        for i in idxs:
+            ways = PIPS.get(self.number[i], 0)
+            if not ways or i == blocked:
+                continue
+            p = ways / 36
+            if self.quantum[i]:
+                group = self.ent_group[i]
+                for res, q in zip(self.states.resources_of(group), self.states.tile_probabilities(group, i)):
+                    out[res] += p * q
+            else:
+                out[self.resource[i]] += p
+        return out
+
+    # -- mutations used by the rules -------------------------------
+    def entangle(self, members, group, resources=None):
+        """
+        puts the tiles into one superposition, outcome 0 gives them `resources` in board order
+        (by default the resources they have now), every outcome is equally likely
+        """
+        members = sorted(members)
+        if resources is None:
+            codes = [self.resource[i] for i in members]
+        else:
+            codes = [resource_code(r) for r in resources]
+        self.states.add(group, members, codes)
+        for idx in members:
+            self.quantum[idx] = 1
+            self.ent_group[idx] = group
+            self.resource[idx] = NO_RESOURCE
+            self.dirty.add(idx)
+
+    def interfere(self, idx):
+        """the interference card on a quantum tile, see QuantumState.interference_operator"""
+        self.states.interfere(self.ent_group[idx], idx)
+
+    def measure(self, group):
+        """collapses the group to a sampled outcome, returns {tile: resource code}"""
+        return self.collapse_group(group, self.states.measure([group])[0])
+
+    def collapse_group(self, group, outcome):
+        result = dict(self.states.outcome(group, outcome))
+        self.states.remove(group)
+        for idx, res in result.items():
+            self.quantum[idx] = 0
+            self.ent_group[idx] = 0
+            self.resource[idx] = res
+            self.dirty.add(idx)
+        return result
+
+    # -- snapshots -------------------------------------------------
+    def snapshot(self):
+        """the mutable columns as bytes plus a copy of the group states, cheap to store or send"""
+        return (self.resource.tobytes(), self.quantum.tobytes(), self.ent_group.tobytes(), self.states.copy())
+
+    def restore(self, snap):
+        cols = (self.resource, self.quantum, self.ent_group)
+        for col, data in zip(cols, snap):
+            del col[:]
+            col.frombytes(data)
+        # the board goes back, the dice of the future do not: the game keeps its own generator
+        self.states = snap[3].copy(rng=self.states.rng)
+        self.dirty.update(range(len(self.coords)))
+
+    # -- single fields, used by TileView ---------------------------
+    def get_field(self, idx, key):
+        if key == "coord":
+            return self.coords[idx]
+        if key == "resource":
+            return resource_name(self.resource[idx])
+        if key == "number":
+            return self.number[idx] or None
+        if key == "quantum":
+            return bool(self.quantum[idx])
+        if key == "ent_group":
+            return self.ent_group[idx] or None
+        if key == "superposed":
+            if not self.quantum[idx]:
+                raise KeyError(key)
+            return [resource_name(r) for r in self.states.resources_of(self.ent_group[idx])]
+        if key == "distribution":
+            # chance of the first superposed resource
+            if not self.quantum[idx]:
+                raise KeyError(key)
+            return float(self.states.tile_probabilities(self.ent_group[idx], idx)[0])
+        raise KeyError(key)
+
+    def set_field(self, idx, key, value):
+        self.dirty.add(idx)
+        if key == "resource":
+            self.resource[idx] = resource_code(value)
+        elif key == "number":
+            self.number[idx] = value or 0
+            self._index_numbers()
+        else:
+            # superpositions belong to the whole group, they change through entangle/measure
+            raise KeyError(key)
+
+    def del_field(self, idx, key):
+        raise KeyError(key)
+
+
+class TileView:
+    """dict-like access to one tile of a TileStore, reads and writes go straight to the arrays"""
+    __slots__ = ("store", "idx")
+
+    def __init__(self, store, idx):
+        self.store = store
+        self.idx = idx
+
+    def __getitem__(self, key):
+        return self.store.get_field(self.idx, key)
+
+    def __setitem__(self, key, value):
+        self.store.set_field(self.idx, key, value)
+
+    def __delitem__(self, key):
+        self.store.del_field(self.idx, key)
+
+    def __contains__(self, key):
+        try:
+            self.store.get_field(self.idx, key)
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self.store.get_field(self.idx, key)
+        except KeyError:
+            return default
+
+    def keys(self):
+        return [k for k in TILE_KEYS if k in self]
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
+
+    def __eq__(self, other):
+        return isinstance(other, TileView) and other.store is self.store and other.idx == self.idx
+
+    def __hash__(self):
+        return hash((id(self.store), self.idx))
+
+    def __repr__(self):
+        return repr(dict(self.items()))
@@ -0,0 +1,75 @@
+# src/timestep.py
+# Game time for the window, apart from the frame rate. The rules, bot pauses, message timeouts and
+# animations all read the game's clock, which only moves in fixed logic steps of STEP_MS. The main
+# loop turns wall time (times the speed) into steps and draws when a frame is due, so a fast-forwarded
+# bot game runs 20 steps per frame without drawing any of them on its own.
+#
+#   game_clock = GameClock(); timestep = FixedTimestep()
+#   each loop:  for _ in range(timestep.steps(real_dt)): game_clock.advance(STEP_MS); state.update(STEP_MS)
+#               draw the game at timestep.frame_time(game_clock)
+
+LOGIC_HZ = 60
+STEP_MS = 1000 / LOGIC_HZ
+# wall time a slow frame may take before the simulation stops catching up (no spiral of death)
+MAX_CATCH_UP_MS = 250
+FAST_FORWARD_SPEED = 20
+# frames drawn per second of wall time while fast-forwarding
+FAST_FORWARD_FPS = 15
+
+
+class GameClock:
+    """
+    Milliseconds of game time, for GameEngine(clock=...). Calling it gives whole milliseconds like
+    monotonic_ms, but it only moves on advance().
+    """
+    def __init__(self, start_ms=0.0):
+        self.ms = float(start_ms)
+
+    def __call__(self):
+        return int(self.ms)
+
+    def advance(self, ms):
+        self.ms += ms
+
+
+class FixedTimestep:
+    """
+    Wall time in, a whole number of logic steps out. What is left over (less than a step) waits for
+    the next frame; alpha says how far into the next step the frame is, for interpolating.
+    """
+    def __init__(self, step_ms=STEP_MS, speed=1.0, max_catch_up_ms=MAX_CATCH_UP_MS):
+        self.step_ms = step_ms
+        self.speed = speed
+        self.max_catch_up_ms = max_catch_up_ms
+        self.accumulator = 0.0
+
+    def steps(self, real_dt_ms):
+        """how many steps real_dt_ms of wall time make at the current speed"""
+        self.accumulator += min(real_dt_ms, self.max_catch_up_ms) * self.speed
+        n = int(self.accumulator // self.step_ms)
+        self.accumulator -= n * self.step_ms
+        return n
+
+    @property
+    def alpha(self):
+        return self.accumulator / self.step_ms
+
+    def frame_time(self, clock):
+        """game time a frame drawn now shows: the last step plus the fraction of the next one"""
+        return clock.ms + self.accumulator
+
+
+class FrameLimiter:
+    """says when the next frame should be drawn, at most fps of them per second of wall time"""
+    def __init__(self, fps=LOGIC_HZ):
+        self.fps = fps
+        self._next = 0.0
+
+    def due(self, now_ms):
+        period = 1000 / self.fps
+        # a millisecond early is on time, the loop's own tick is not that exact
+        if now_ms < self._next - 1:
+            return False
+        # keeps to the schedule, but after a long stall it does not draw a burst of frames to catch up
+        self._next = max(self._next, now_ms - period) + period
+        return True
@@ -0,0 +1,128 @@
+# src/topology.py
+# The fixed graph of a board: tiles, vertices, roads, neighbours and port edges.
+# It only depends on the board radius, so it is built once per process and shared by every game.
+
+import math
+from functools import lru_cache
+from types import MappingProxyType
+from .board import generate_hex_coords, generate_sea_coords, compute_centers_and_polys, compute_sea_polys
+from .buildings import compute_vertex_adjacency
+from .constants import HEX_RADIUS
+
+# hex size the board coordinates are computed with, the UI shifts (and scales) them onto the screen
+BOARD_HEX_SIZE = 50
+# axial offsets of the six tiles around a tile
+HEX_DIRECTIONS = ((1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1))
+
+
+class BoardTopology:
+    """
+    Read-only description of a board with the given radius, everything is stored as tuples,
+    frozensets and read-only mappings. Get one through get_topology(), never build it per game.
+
+    hex_coords / sea_coords   axial (q, r) coordinates of land and sea tiles
+    tile_index                (q, r) -> land tile index
+    tile_neighbors            per tile the indices of the land tiles next to it
+    tile_centers / sea_centers  board space centers (around (0,0), BOARD_HEX_SIZE)
+    vertex_positions          board space position of every intersection
+    hex_vertex_indices        per tile the 6 vertex indices of its corners
+    vertex_tiles              per vertex the tiles it touches
+    vertex_neighbors          vertex -> frozenset of adjacent vertices
+    roads                     sorted (a, b) vertex pairs, the index in here is the road index
+    road_index                (a, b) -> road index
+    road_mids                 board space midpoint of every road
+    sea_roads                 per sea tile the road (vertex pair) it serves as a port
+    """
+    __slots__ = ("radius", "hex_coords", "sea_coords", "tile_index", "tile_neighbors", "tile_centers", "sea_centers", "vertex_positions",
+                 "hex_vertex_indices", "vertex_tiles", "vertex_neighbors", "roads", "road_index",
+                 "road_mids", "sea_roads")
+
+    def __init__(self, radius=HEX_RADIUS):
+        hex_coords = tuple(generate_hex_coords(radius))
+        sea_coords = tuple(generate_sea_coords(radius + 1))
+        tile_centers, polys = compute_centers_and_polys((0,0), BOARD_HEX_SIZE, hex_coords)
+        sea_centers, _ = compute_sea_polys((0,0), BOARD_HEX_SIZE, sea_coords)
+
+        # create intersections by rounding corners of polygons
+        vmap = {}
+        vertex_positions = []
+        hex_vertex_indices = []
+        for poly in polys:
+            idxs = []
+            for corner in poly:
+                key = (round(corner[0],4), round(corner[1],4))
+                if key not in vmap:
+                    vmap[key] = len(vertex_positions)
+                    vertex_positions.append(corner)
+                idxs.append(vmap[key])
+            hex_vertex_indices.append(tuple(idxs))
+
+        vertex_tiles = [[] for _ in vertex_positions]
+        for ti, idxs in enumerate(hex_vertex_indices):
+            for v in idxs:
+                vertex_tiles[v].append(ti)
+
+        road_set = set()
+        for idxs in hex_vertex_indices:
+            for i in range(6):
+                a = idxs[i]; b = idxs[(i+1)%6]
+                if a != b:
+                    road_set.add(tuple(sorted((a,b))))
+        roads = tuple(sorted(road_set))
+        road_mids = []
+        for a,b in roads:
+            ax,ay = vertex_positions[a]
+            bx,by = vertex_positions[b]
+            road_mids.append(((ax+bx)/2, (ay+by)/2))
+
+        # every sea tile is served by the road (edge) closest to its center
+        sea_roads = []
+        for cx, cy in sea_centers:
+            best = min(range(len(roads)), key=lambda i: math.hypot(road_mids[i][0]-cx, road_mids[i][1]-cy))
+            sea_roads.append(roads[best])
+
+        neighbors = compute_vertex_adjacency(hex_vertex_indices)
+
+        tile_index = {coord: i for i, coord in enumerate(hex_coords)}
+        tile_neighbors = tuple(tuple(tile_index[(q+dq, r+dr)] for dq, dr in HEX_DIRECTIONS if (q+dq, r+dr) in tile_index)
+                               for q, r in hex_coords)
+
+        sets = object.__setattr__
+        sets(self, "radius", radius)
+        sets(self, "hex_coords", hex_coords)
+        sets(self, "sea_coords", sea_coords)
+        sets(self, "tile_index", MappingProxyType(tile_index))
+        sets(self, "tile_neighbors", tile_neighbors)
+        sets(self, "tile_centers", tuple(tile_centers))
+        sets(self, "sea_centers", tuple(sea_centers))
+        sets(self, "vertex_positions", tuple(vertex_positions))
+        sets(self, "hex_vertex_indices", tuple(hex_vertex_indices))
+        sets(self, "vertex_tiles", tuple(tuple(t) for t in vertex_tiles))
+        sets(self, "vertex_neighbors", MappingProxyType({v: frozenset(n) for v, n in neighbors.items()}))
+        sets(self, "roads", roads)
+        sets(self, "road_index", MappingProxyType({edge: i for i, edge in enumerate(roads)}))
+        sets(self, "road_mids", tuple(road_mids))
+        sets(self, "sea_roads", tuple(sea_roads))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("BoardTopology is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError("BoardTopology is read-only")
+
+    # games are copied for rollouts and pickled for worker processes, they should keep pointing
+    # at the shared topology instead of carrying their own copy
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (get_topology, (self.radius,))
+
+
+@lru_cache(maxsize=None)
+def get_topology(radius=HEX_RADIUS):
+    """the shared topology for a board radius, built on first use"""
+    return BoardTopology(radius)
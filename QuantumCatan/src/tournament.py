@@ -0,0 +1,272 @@
+# src/tournament.py
+# Round robin tournaments between bots, played on a process pool.
+# Every finished game is appended to a JSON lines file, so an interrupted run picks up where it stopped.
+#
+#   python -m src.tournament --entrant heuristic --entrant random --players 2 3 4 --pairs 1 2 5 9 --games 20
+
+import argparse, itertools, json, math, os, time, zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+DEFAULT_CHUNK_SIZE = 20     # games per task sent to a worker
+DEFAULT_GAMES = 10          # games per seating
+DEFAULT_OUT = "tournament.jsonl"
+
+
+def wilson_interval(wins, games, z=1.96):
+    """95% (z=1.96) confidence interval of a win rate, sane for small samples and 0 or 100%"""
+    if games == 0:
+        return (0.0, 1.0)
+    p = wins / games
+    denom = 1 + z*z / games
+    centre = (p + z*z / (2*games)) / denom
+    half = z * math.sqrt(p*(1-p) / games + z*z / (4*games*games)) / denom
+    return (max(0.0, centre - half), min(1.0, centre + half))
+
+
+def parse_entrant(text):
+    """
+    "heuristic"                            -> ("heuristic", "heuristic", {})
+    "quick=mcts:time_budget=0.05,rollout_rounds=10" -> ("quick", "mcts", {...})
+    Option values are read as JSON when possible (numbers, true/false), otherwise kept as text.
+    """
+    head, _, opts = text.partition(":")
+    name, _, bot = head.partition("=")
+    options = {}
+    for item in filter(None, opts.split(",")):
+        key, _, value = item.partition("=")
+        try:
+            options[key] = json.loads(value)
+        except ValueError:
+            options[key] = value
+    return (name, bot or name, options)
+
+
+def schedule(entrant_names, player_counts, pair_counts, games_per_seating, seed=0, balanced=False):
+    """
+    Every line-up of entrants for every player count, in every seat rotation, for every number
+    of entangled pairs. With two or more entrants a line-up has at least two different ones.
+    Each game gets a stable key (and a seed derived from it) so results can be matched on resume.
+    Games on balanced boards have keys of their own, a resume never mixes them with free boards.
+    """
+    board = "balanced/" if balanced else ""
+    games = []
+    for n in player_counts:
+        for lineup in itertools.combinations_with_replacement(entrant_names, n):
+            if len(entrant_names) > 1 and len(set(lineup)) == 1:
+                continue
+            seatings = []
+            for r in range(n):
+                seating = lineup[r:] + lineup[:r]
+                if seating not in seatings:
+                    seatings.append(seating)
+            for pairs in pair_counts:
+                for seats in seatings:
+                    for i in range(games_per_seating):
+                        key = f"{n}p/{pairs}e/{board}{'-'.join(seats)}/{i}"
+                        games.append({"key": key, "players": n, "pairs": pairs, "seats": list(seats),
+                                      "seed": zlib.crc32(f"{seed}:{key}".encode())})
+    return games
+
+
+def _bot(bot, options, game_seed, seat):
+    """
+    A new bot for one seat of one game, seeded from the game. Bots are not shared between games:
+    a bot's random state would otherwise depend on which games its worker happened to play before.
+    """
+    from .bots import make_bot
+    options = dict(options)
+    options["seed"] = zlib.crc32(f"{game_seed}:{seat}:{options.get('seed', '')}".encode())
+    if bot == "mcts":
+        # the tournament already uses every core, a bot must not start its own pool
+        options["workers"] = 1
+    return make_bot(bot, **options)
+
+
+_worker_recorders = {}
+
+
+def _recorder(stats_dir):
+    from .stats import StatsStore, Recorder
+    if stats_dir not in _worker_recorders:
+        _worker_recorders[stats_dir] = Recorder(StatsStore(stats_dir))
+    return _worker_recorders[stats_dir]
+
+
+def play_chunk(entrants, games, max_rounds, stats_dir=None, balanced=False):
+    """runs in a worker: plays the given games, returns one result dict per game"""
+    from .bots import new_game, play_game
+    recorder = _recorder(stats_dir) if stats_dir else None
+    results = []
+    for g in games:
+        t0 = time.perf_counter()
+        game = new_game(g["players"], g["pairs"], seed=g["seed"], balanced=balanced)
+        bots = [_bot(*entrants[name], g["seed"], seat) for seat, name in enumerate(g["seats"])]
+        if recorder is not None:
+            # the seed doubles as game id in the statistics
+            recorder.attach(game, g["seed"])
+        winner = play_game(game, bots, max_rounds=max_rounds)
+        for bot in bots:
+            bot.close()
+        if recorder is not None:
+            recorder.finish(game)
+        results.append({
+            "key": g["key"], "players": g["players"], "pairs": g["pairs"], "seats": g["seats"],
+            "winner_seat": winner, "winner": None if winner is None else g["seats"][winner],
+            "scores": [p.score for p in game.players], "rounds": game.round,
+            "seconds": round(time.perf_counter() - t0, 4),
+        })
+    if recorder is not None:
+        # written before the results are reported, a resumed run may record a chunk twice but never loses one
+        recorder.flush()
+    return results
+
+
+class Standings:
+    """
+    win counts per entrant, overall and per (players, pairs) setting. A game is one result for every
+    entrant in it, however many seats the entrant had: its seats are not independent samples.
+    """
+    def __init__(self):
+        self.games = {}   # (entrant, players, pairs) -> games played
+        self.wins = {}
+        self.total_games = 0
+        self.unfinished = 0
+
+    def add(self, result):
+        self.total_games += 1
+        if result["winner"] is None:
+            self.unfinished += 1
+        for name in set(result["seats"]):
+            k = (name, result["players"], result["pairs"])
+            self.games[k] = self.games.get(k, 0) + 1
+            if name == result["winner"]:
+                self.wins[k] = self.wins.get(k, 0) + 1
+
+    def rows(self, by_setting=False):
+        """(label, games, wins, rate, (low, high)) sorted by win rate"""
+        games, wins = {}, {}
+        for (name, players, pairs), n in self.games.items():
+            label = f"{name} {players}p {pairs}e" if by_setting else name
+            games[label] = games.get(label, 0) + n
+            wins[label] = wins.get(label, 0) + self.wins.get((name, players, pairs), 0)
+        rows = [(label, n, wins[label], wins[label] / n, wilson_interval(wins[label], n)) for label, n in games.items()]
+        return sorted(rows, key=lambda r: r[3], reverse=True)
+
+    def report(self, by_setting=False):
+        lines = [f"{self.total_games} games ({self.unfinished} without a winner)"]
+        for label, n, w, rate, (lo, hi) in self.rows(by_setting):
+            lines.append(f"  {label:<28} {w:>7}/{n:<7} {rate:6.1%}  [{lo:6.1%} - {hi:6.1%}]")
+        return "\n".join(lines)
+
+
+def load_results(path):
+    """the results already in the file, a half written last line (from a kill) is ignored"""
+    results = []
+    if not os.path.exists(path):
+        return results
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                results.append(json.loads(line))
+            except ValueError:
+                pass
+    return results
+
+
+def _end_last_line(path):
+    """a half written last line gets its newline, so the next result does not land on the same line"""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, "rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+
+def run_tournament(entrants, player_counts=(2, 3, 4), pair_counts=(2,), games_per_seating=DEFAULT_GAMES,
+                   out_path=DEFAULT_OUT, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, seed=0,
+                   max_rounds=None, on_progress=None, stats_dir=None, balanced=False):
+    """
+    entrants: list of (name, bot, options) as returned by parse_entrant().
+    Games already in out_path are not played again, keep names and options the same when resuming.
+    on_progress(standings, done, total) is called after every finished chunk.
+    stats_dir: if given, per turn statistics of every game go to a StatsStore there (see stats.py).
+    balanced: play on boards from balanced.py instead of freely shuffled ones.
+    """
+    from .bots.base import DEFAULT_MAX_ROUNDS
+    specs = {name: (bot, options) for name, bot, options in entrants}
+    games = schedule(list(specs), player_counts, pair_counts, games_per_seating, seed, balanced)
+
+    standings = Standings()
+    done = set()
+    scheduled = {g["key"] for g in games}
+    for result in load_results(out_path):
+        # results of other settings in the same file are kept but not counted
+        if result["key"] in scheduled and result["key"] not in done:
+            done.add(result["key"])
+            standings.add(result)
+    todo = [g for g in games if g["key"] not in done]
+    total = len(done) + len(todo)
+    chunks = [todo[i:i+chunk_size] for i in range(0, len(todo), chunk_size)]
+    if on_progress is not None:
+        on_progress(standings, len(done), total)
+    if not chunks:
+        return standings
+
+    _end_last_line(out_path)
+    finished = len(done)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool, \
+            open(out_path, "a", encoding="utf-8") as out:
+        futures = [pool.submit(play_chunk, specs, chunk, max_rounds or DEFAULT_MAX_ROUNDS, stats_dir, balanced)
+                   for chunk in chunks]
+        try:
+            for future in as_completed(futures):
+                results = future.result()
+                out.write("".join(json.dumps(r) + "\n" for r in results))
+                out.flush()
+                for r in results:
+                    standings.add(r)
+                finished += len(results)
+                if on_progress is not None:
+                    on_progress(standings, finished, total)
+        except KeyboardInterrupt:
+            for f in futures:
+                f.cancel()
+            raise
+    return standings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="round robin tournament between Quantum Catan bots")
+    parser.add_argument("--entrant", action="append", required=True,
+                        help='a bot, optionally named and configured: "heuristic" or "quick=mcts:time_budget=0.05"')
+    parser.add_argument("--players", type=int, nargs="+", default=[2, 3, 4], choices=[2, 3, 4])
+    parser.add_argument("--pairs", type=int, nargs="+", default=[2], choices=range(1, 10), metavar="{1..9}")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES, help="games per seating")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="results file, reused to resume")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stats", default=None, help="directory for per turn statistics (.npy chunks)")
+    parser.add_argument("--balanced", action="store_true", help="fair boards: no touching 6/8, spread resources and pips")
+    parser.add_argument("--by-setting", action="store_true", help="report every players/pairs setting separately")
+    args = parser.parse_args(argv)
+
+    entrants = [parse_entrant(e) for e in args.entrant]
+    last = [0.0]
+
+    def progress(standings, done, total):
+        now = time.monotonic()
+        if now - last[0] >= 2 or done == total:
+            last[0] = now
+            print(f"[{done}/{total}]\n{standings.report(args.by_setting)}", flush=True)
+
+    try:
+        run_tournament(entrants, args.players, args.pairs, args.games, args.out, args.workers,
+                       args.chunk, args.seed, on_progress=progress, stats_dir=args.stats, balanced=args.balanced)
+    except KeyboardInterrupt:
+        print(f"stopped, run the same command again to continue from {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# src/turn.py
+# Turn phases and the actions they allow, replaces the old allowed_actions list
+
+from enum import IntEnum, IntFlag
+
+
+class Action(IntFlag):
+    """what the current player may do, combined as bit flags"""
+    NONE = 0
+    ROLL = 1            # was "rolling"
+    END_TURN = 2        # was "endTurn"
+    TRADE = 4           # was "trading"
+    BUILD = 8           # was "building"
+    DEV_CARD = 16       # was "placeDevCard"
+    ACCEPT_TRADE = 32   # was "accepting_trade"
+
+
+class TurnPhase(IntEnum):
+    SETUP = 0           # initial placement rounds: one settlement and one road
+    ROLL = 1            # main rounds, before the dice are rolled
+    MAIN = 2            # after rolling: trade, build, play cards, end turn
+    ROBBER = 3          # moving the robber, stealing and re-entangling after a measurement
+    INTERFERE = 4       # choosing the tile for an interference card
+    TRADE_RESPONSE = 5  # the trading partner accepts or declines an offer
+    GAME_OVER = 6
+
+
+PHASE_ACTIONS = {
+    TurnPhase.SETUP: Action.BUILD | Action.END_TURN,
+    TurnPhase.ROLL: Action.ROLL | Action.DEV_CARD,
+    TurnPhase.MAIN: Action.END_TURN | Action.TRADE | Action.BUILD | Action.DEV_CARD,
+    TurnPhase.ROBBER: Action.NONE,
+    TurnPhase.INTERFERE: Action.NONE,
+    TurnPhase.TRADE_RESPONSE: Action.ACCEPT_TRADE,
+    TurnPhase.GAME_OVER: Action.NONE,
+}
+
+
+class TurnStateMachine:
+    """
+    Tracks the phase of the current turn. The allowed actions are recomputed on every transition
+    and kept as one int, so allows() is a single bit test no matter how long the game runs.
+    Interruptions (robber, interference, trade offers) return to ROLL or MAIN depending on
+    whether the dice were already rolled this turn.
+    """
+    __slots__ = ("phase", "rolled", "dev_card_played", "setup_placed", "actions", "_mask")
+
+    def __init__(self):
+        self.start_turn(setup=True)
+
+    def _refresh(self):
+        actions = PHASE_ACTIONS[self.phase]
+        if self.dev_card_played:
+            actions &= ~Action.DEV_CARD
+        if self.phase == TurnPhase.SETUP and not self.setup_placed:
+            actions &= ~Action.END_TURN
+        self.actions = actions
+        # plain int copy, IntFlag operators are slow enough to show up in simulations
+        self._mask = actions._value_
+
+    def allows(self, action):
+        return self._mask & action._value_ != 0
+
+    # -- transitions -----------------------------------------------
+    def start_turn(self, setup):
+        self.phase = TurnPhase.SETUP if setup else TurnPhase.ROLL
+        self.rolled = False
+        self.dev_card_played = False
+        self.setup_placed = False
+        self._refresh()
+
+    def placed_setup_pieces(self):
+        """the settlement and road of an initial placement turn are down, the turn may end"""
+        self.setup_placed = True
+        self._refresh()
+
+    def rolled_dice(self, seven):
+        self.rolled = True
+        self.phase = TurnPhase.ROBBER if seven else TurnPhase.MAIN
+        self._refresh()
+
+    def played_dev_card(self):
+        self.dev_card_played = True
+        self._refresh()
+
+    def enter(self, phase):
+        self.phase = phase
+        self._refresh()
+
+    def resume(self):
+        """back to the normal flow after an interruption"""
+        if self.phase != TurnPhase.GAME_OVER:
+            self.phase = TurnPhase.MAIN if self.rolled else TurnPhase.ROLL
+            self._refresh()
+
+    def game_over(self):
+        self.phase = TurnPhase.GAME_OVER
+        self._refresh()
+
+    def restore(self, phase, rolled, dev_card_played, setup_placed):
+        """sets the whole state at once, for copies of a game kept by remote clients"""
+        self.phase = TurnPhase(phase)
+        self.rolled = rolled
+        self.dev_card_played = dev_card_played
+        self.setup_placed = setup_placed
+        self._refresh()
@@ -1,23 +1,128 @@
 # src/ui.py
 # Game UI: buttons, panels, input handling and drawing coordination
 
-import pygame, copy
+import pygame
 from .constants import BG_COLOR, PANEL_BG, LINE_COLOR, TEXT_COLOR, HIGHLIGHT, INVALID_COLOR, BUTTON_COLOR, WHITE, BLACK, PLAYER_COLORS
-from .util import dist
-from .board import compute_centers_and_polys, compute_sea_polys, HEX_COORDS  # used only for structure in imports
-from .util import polygon_corners
+from .rendering import draw_text
+from .camera import ZOOM_STEP
 from .game_state import GameState
+from .resources import RESOURCES, Inventory
+from .turn import Action
+from .actions import legal_actions, apply_action, END_TURN
+from .worker import ANALYSIS_DONE, bot_move, analyse, autosave
+from .gamelog import get_logger, log_event
+import logging
 
-def rect_contains(rect, pos):
-    return rect.collidepoint(pos)
+# pause between two moves of a computer player, so people can follow what it does
+BOT_MOVE_DELAY_MS = 400
+
+# keys for choosing a resource (monopoly / year of plenty): first letter of the resource
+RESOURCE_KEYS = {pygame.K_l: "lumber", pygame.K_b: "brick", pygame.K_w: "wool", pygame.K_g: "grain", pygame.K_o: "ore"}
+
+log = get_logger("ui")
 
 class GameUI:
-    def __init__(self, state: GameState, screen):
+    def __init__(self, state: GameState, screen, bot=None, num_bots=0, worker=None, autosave_path=None):
         self.state = state
         self.screen = screen
+        # the last num_bots seats are played by bot (see src/bots)
+        self.bot = bot
+        self.num_bots = num_bots
+        self._last_bot_move = 0
+        # bot moves, the analysis overlay and autosaves run on this AnalysisWorker (see worker.py),
+        # without one they run right away in the calling thread
+        self.worker = worker
+        self.autosave_path = autosave_path
+        self._bot_job = None
+        self._analysis_key = None
+        self._saved_turn = None
+        self.show_analysis = False
+        self.analysis = None
+        # right or middle button held down: the board follows the mouse
+        self._dragging = False
+        # how much faster than real time the game runs (main.py's fixed timestep), shown while above 1
+        self.speed = 1
+
+    def bot_for(self, seat):
+        if self.bot is not None and seat >= self.state.num_players - self.num_bots:
+            return self.bot
+        return None
+
+    def _submit(self, kind, fn, *args):
+        if self.worker is not None:
+            return self.worker.submit(kind, fn, *args)
+        result, error = None, None
+        try:
+            result = fn(*args)
+        except Exception as e:
+            error = e
+        self.job_done(kind, None, result, error)
+        return None
+
+    def run_bots(self):
+        """lets a computer player make one move when it has to, called once per frame"""
+        state = self.state
+        if not state.runningGame or self._bot_job is not None:
+            return
+        bot = self.bot_for(state.current_player)
+        if bot is None or state.clock() - self._last_bot_move < BOT_MOVE_DELAY_MS:
+            return
+        actions = legal_actions(state)
+        if not actions:
+            return
+        if len(actions) == 1:
+            self._apply_bot_move(actions[0])
+            return
+        # the bot thinks on a copy, the board stays locked until its answer arrives (job_done)
+        self._bot_job = (state.current_player, state.round)
+        self._submit("bot_move", bot_move, bot, state.clone(), actions)
+
+    def _apply_bot_move(self, action):
+        if not apply_action(self.state, action):
+            apply_action(self.state, (END_TURN,))
+        self._last_bot_move = self.state.clock()
+
+    def run_jobs(self):
+        """hands the worker the analysis and autosave jobs the game needs now, called once per frame"""
+        state = self.state
+        if not state.runningGame:
+            return
+        if self.show_analysis:
+            key = (state.round, state.current_player, state.messages_pushed, getattr(state, "robber_idx", None))
+            if key != self._analysis_key:
+                self._analysis_key = key
+                self._submit("analysis", analyse, state.clone())
+        turn = (state.round, state.current_player)
+        if self.autosave_path and turn != self._saved_turn:
+            self._saved_turn = turn
+            self._submit("autosave", autosave, state.clone(), self.autosave_path)
+
+    def job_done(self, kind, job, result, error):
+        """a finished job, from an ANALYSIS_DONE event or straight from _submit"""
+        if job is not None and not self.worker.is_current(kind, job):
+            return
+        if kind == "bot_move":
+            pending, self._bot_job = self._bot_job, None
+            state = self.state
+            # the game may have been reset while the bot was thinking
+            if error is not None or pending != (state.current_player, state.round) or not state.runningGame:
+                self._last_bot_move = state.clock()
+                return
+            self._apply_bot_move(result)
+        elif kind == "analysis" and error is None:
+            self.analysis = result
+        elif kind == "autosave" and error is None:
+            log_event(log, logging.INFO, "autosaved", path=result)
 
     def handle_event(self, g_event):
-        if g_event.type == pygame.MOUSEBUTTONDOWN and g_event.button == 1:
+        if g_event.type == ANALYSIS_DONE:
+            self.job_done(g_event.kind, g_event.job, g_event.result, g_event.error)
+            return
+        if self.handle_camera(g_event):
+            return
+        # the board is not clickable while a computer player is moving
+        bots_turn = self.state.runningGame and self.bot_for(self.state.current_player) is not None
+        if g_event.type == pygame.MOUSEBUTTONDOWN and g_event.button == 1 and not bots_turn:
             self._handle_click(g_event.pos)
         if g_event.type == pygame.KEYDOWN:
             if g_event.key == pygame.K_ESCAPE:
@@ -25,34 +130,43 @@ class GameUI:
                 self.state.sel = None
                 self.state.placing = False
                 self.state.entangling_pair = []
+            elif g_event.key == pygame.K_a and not (self.state.monopolysing or self.state.resources_to_collect > 0):
+                # analysis overlay: expected income per roll and what the tokens are worth
+                self.show_analysis = not self.show_analysis
+                self._analysis_key = None
             else:
                 self.handle_dev_clicks(g_event)
             if self.state.monopolysing or self.state.resources_to_collect > 0:
-                allowed_keys = (pygame.K_l, pygame.K_b, pygame.K_w, pygame.K_g, pygame.K_o)
-                if g_event.key in allowed_keys:
+                if g_event.key in RESOURCE_KEYS:
                     self.handle_devcard_click(g_event)
                 else:
                     self.state.push_message("Please use a valid button")
 
+    def handle_camera(self, g_event):
+        """mouse wheel zooms at the mouse, right/middle drag pans, Home fits the board to the window again"""
+        camera = self.state.camera
+        if not self.state.runningGame:
+            return False
+        if g_event.type == pygame.MOUSEWHEEL:
+            camera.zoom_at(ZOOM_STEP ** g_event.y, pygame.mouse.get_pos())
+            return True
+        if g_event.type == pygame.MOUSEBUTTONDOWN and g_event.button in (2, 3):
+            self._dragging = True
+            return True
+        if g_event.type == pygame.MOUSEBUTTONUP and g_event.button in (2, 3):
+            self._dragging = False
+            return True
+        if g_event.type == pygame.MOUSEMOTION and self._dragging:
+            camera.pan_by(*g_event.rel)
+            return True
+        if g_event.type == pygame.KEYDOWN and g_event.key == pygame.K_HOME:
+            camera.reset()
+            return True
+        return False
+
     def handle_devcard_click(self, g_event):
-        if g_event.key == pygame.K_l:
-            resource = "lumber"
-        elif g_event.key == pygame.K_b:
-            resource = "brick"
-        elif g_event.key == pygame.K_w:
-            resource = "wool"
-        elif g_event.key == pygame.K_g:
-            resource = "grain"
-        elif g_event.key == pygame.K_o:
-            resource = "ore"
-        if self.state.monopolysing:
-            self.state.steal_every_ones_resource(resource, self.state.current_player)
-        # year of plenty card 
-        else:
-            self.state.push_message(self.state.players[self.state.current_player].add_resource(resource, 0))
-            if self.state.resources_to_collect == 2:
-                self.state.push_message("Please type the first letter of the second resource you would like to recieve")
-            self.state.resources_to_collect -= 1
+        # monopoly or year of plenty card
+        self.state.choose_resource(RESOURCE_KEYS[g_event.key])
 
             
             
@@ -66,326 +180,218 @@ class GameUI:
                 self.state.entangling = not self.state.entangling
             
 
+    def screen_name(self):
+        """which screen the window shows, the hit registry keeps its targets by this name"""
+        if self.state.runningGame == False and self.state.playerWon == False:
+            return "start"
+        return "game_over" if self.state.playerWon else "game"
+
     def _handle_click(self, pos):
+        # one look in the hit registry (hittest.py) says what was clicked, then its click_<action>
+        # handles it. Clicks that hit no button or panel go to the board.
+        screen = self.screen_name()
+        self.state.layout_buttons()
+        hit = self.state.hits.hit(screen, pos)
+        if hit is not None:
+            action, payload = hit
+            getattr(self, "click_" + action)(payload)
+        elif screen == "game":
+            self.click_board(pos)
+
+    # -- start and game over screens ---------------------------------------
+    def click_players(self, n):
+        self.button_clicked()
+        self.state.num_players = n  # 2-4 players
+
+    def click_pairs(self, n):
+        self.button_clicked()
+        self.state.num_entangled_pairs = n  # 1-9 entanglements
+
+    def click_start(self, _):
+        self.button_clicked()
+        self.state.start_game()
+
+    def click_restart(self, _):
+        self.button_clicked()
+        self.state.playerWon = False
+
+    # -- game screen buttons ----------------------------------------------
+    def click_reset(self, _):
+        self.button_clicked()
+        self.state.reset_game()
+
+    def click_roll(self, _):
+        if self.state.turn.allows(Action.ROLL) or self.state.devMode == True:
+            self.button_clicked()
+            self.state.roll_and_distribute(None)
+
+    def click_end_turn(self, _):
+        if self.state.turn.allows(Action.END_TURN) or self.state.devMode == True:
+            self.button_clicked()
+            self.state.end_turn()
+
+    def click_trade(self, _):
+        if self.state.turn.allows(Action.TRADE) or self.state.devMode == True:
+            yesOrNo = True if self.state.trading == False else False
+            self.button_clicked()
+            self.state.trading = yesOrNo
+            self.state.tradingAddedResources = Inventory()
+            self.state.trading_partner = None
+
+    def click_dev_mode(self, _):
+        if self.state.devMode == False:
+            self.button_clicked()
+            self.state.devMode = True
+            self.state.round = 5
+            self.state.push_message("Developer mode activated.")
+            for player in self.state.players:
+                player.resources = Inventory([100] * len(RESOURCES))
+
+    def click_inspect(self, _):
+        yesOrNo = True if self.state.inspecting == False else False
+        self.button_clicked()
+        self.state.inspecting = yesOrNo
+
+    # -- panels -----------------------------------------------------------
+    def click_send_offer(self, _):
         state = self.state
-        mx,my = pos
-        # check buttons first
-        if self.state.runningGame == False and self.state.playerWon == False:
-            for i in range(len(self.state.num_player_buttons)):
-                if rect_contains(self.state.num_player_buttons[i][1], pos):
-                    self.button_clicked()
-                    self.state.num_players = (i+2)  # 2-4 players
-                    return
-            for i in range(len(self.state.entanglement_buttons)):
-                if rect_contains(self.state.entanglement_buttons[i][1], pos):
-                    self.button_clicked()
-                    self.state.num_entangled_pairs = (i+1)  # 1-3 entanglements
-                    return
-            if rect_contains(self.state.start_button, pos):
-                self.button_clicked()
-                self.state.start_game()
-                return
-        elif self.state.playerWon:
-            # game over screen click
-            if rect_contains(self.state.restart_button, pos):
-                self.button_clicked()
-                self.state.playerWon = False
-                return
-            
+        if state.trading_partner is None or not state.tradingAddedResources.any() or state.turn.allows(Action.ACCEPT_TRADE):
+            return
+        if state.trading_partner == 'bank/port':
+            resourcesForReceiving = 0
+            for k in RESOURCES:
+                if (state.tradingAddedResources[k] < 0 ):
+                    ratio = state.check_best_trade_ratio(k)
+                    if state.tradingAddedResources[k] % ratio == 0:
+                        resourcesForReceiving += state.tradingAddedResources[k]/ratio
+                    else:
+                        state.push_message("Incorrect trade ratio, please change")
+                        return
+                if (state.tradingAddedResources[k] > 0):
+                    resourcesForReceiving += state.tradingAddedResources[k]
+            if resourcesForReceiving == 0:
+                state.players[state.current_player].resources.add(state.tradingAddedResources)
+            state.tradingAddedResources = Inventory()
         else:
-            if rect_contains(self.state.reset_rect, pos):
-                self.button_clicked()
-                state.reset_game()
-                
-                return
-            if rect_contains(self.state.dice_rect, pos) and ("rolling" in self.state.allowed_actions or self.state.devMode == True):
-                self.button_clicked()
-                state.roll_and_distribute(None)
-                
-                return
-            if rect_contains(self.state.end_turn_rect, pos) and ("endTurn" in self.state.allowed_actions or self.state.devMode == True):
-                self.button_clicked()
-                state.end_turn()
-                
-                return
-            if rect_contains(self.state.trade_rect, pos) and ("trading" in self.state.allowed_actions or self.state.devMode == True):
-                yesOrNo = True if self.state.trading == False else False
-                self.button_clicked()
-                self.state.trading = yesOrNo
-                self.state.tradingAddedResources = {"lumber":0,"brick":0,"wool":0,"grain":0,"ore":0}
-                self.state.trading_partner = None
-                #print(self.state.trading)
-                return
-            if rect_contains(self.state.sendTrade_rect, pos) and self.state.trading_partner is not None and any(self.state.tradingAddedResources[k] != 0 for k in ("lumber","brick","wool","grain","ore")) and not "accepting_trade" in self.state.allowed_actions:
-                if self.state.trading_partner == 'bank/port':
-                    resourcesForReceiving = 0
-                    for k in ("lumber","brick","wool","grain","ore"):
-                        if (self.state.tradingAddedResources[k] < 0 ):
-                            ratio = self.state.check_best_trade_ratio(k)
-                            if self.state.tradingAddedResources[k] % ratio == 0:
-                                resourcesForReceiving += self.state.tradingAddedResources[k]/ratio
-                            else:
-                                self.state.push_message("Incorrect trade ratio, please change")
-                                return
-                        if (self.state.tradingAddedResources[k] > 0):
-                            resourcesForReceiving += self.state.tradingAddedResources[k]
-                    if resourcesForReceiving == 0:
-                        for k in ("lumber","brick","wool","grain","ore"):
-                            self.state.players[self.state.current_player].add_resource(k, self.screen, self.state.tradingAddedResources[k])
-                    self.state.tradingAddedResources = {"lumber":0,"brick":0,"wool":0,"grain":0,"ore":0}
+            state.offer_trade(int(state.trading_partner), state.tradingAddedResources)
+
+    def click_accept(self, _):
+        self.state.accept_trade()
+
+    def click_decline(self, _):
+        self.state.decline_trade()
+
+    def click_partner(self, partner):
+        state = self.state
+        if not state.trading or state.turn.allows(Action.ACCEPT_TRADE):
+            return
+        state.tradingAddedResources = Inventory()
+        # clicking the selected partner again deselects it
+        state.trading_partner = partner if state.trading_partner != partner else None
+
+    def click_plus(self, res):
+        if self.state.trading and not self.state.turn.allows(Action.ACCEPT_TRADE):
+            self.state.tradingAddedResources[res] += 1
+
+    def click_minus(self, res):
+        state = self.state
+        if state.trading and not state.turn.allows(Action.ACCEPT_TRADE) and state.players[state.current_player].resources.get(res,0) + state.tradingAddedResources.get(res, 0) >= 0:
+            state.tradingAddedResources[res] -= 1
+
+    def click_dev_card(self, card):
+        state = self.state
+        if state.players[state.current_player].held_dev_cards[card] > 0:
+            if state.turn.allows(Action.DEV_CARD) or state.devMode == True:
+                state.play_dev_card(state.current_player, card)
+            else:
+                state.push_message("Cannot play development card right now.")
+        else:
+            state.push_message("You do not have that development card.")
+
+    def click_victim(self, pidx):
+        if pidx in self.state.possible_victims:
+            self.state.victim = pidx
+            self.state.steal_from_victim(self.state.current_player, self.state.victim)
+            self.state.possible_victims = []
+
+    def click_shop(self, k):
+        # toggle selection
+        if self.state.sel == k:
+            self.button_clicked()
+            self.state.sel = None
+            self.state.placing = False
+            return
+        self.button_clicked()
+        if self.state.round < 2 and self.state.devMode == False:
+            if k == "settlement":
+                if self.state.settlements_placed == 0:
+                    self.state.sel = k
+                    self.state.placing = self.state.sel
                 else:
-                    player_sending = int(f"{self.state.current_player}")
-                    player_receiving = int(f"{self.state.trading_partner}")
-                    self.state.trading_partner = player_sending
-                    self.state.current_player = player_receiving
-                    print(self.state.trading_partner)
-                    self.state.allowed_actions = ["accepting_trade"]
-                    for k in ("lumber","brick","wool","grain","ore"):
-                        self.state.tradingAddedResources[k] *= -1
-            
-            if rect_contains(self.state.acceptTrade_rect, pos) and all(self.state.tradingAddedResources[k] + self.state.players[self.state.current_player].resources[k] >= 0 for k in ("lumber","brick","wool","grain","ore")):
-                for k in ("lumber","brick","wool","grain","ore"):
-                    self.state.players[self.state.current_player].add_resource(k, self.screen, self.state.tradingAddedResources[k])
-                self.state.current_player = self.state.trading_partner
-                self.state.trading = False
-                for k in ("lumber","brick","wool","grain","ore"):
-                    self.state.tradingAddedResources[k] *= -1
-                    self.state.players[self.state.current_player].add_resource(k, self.screen, self.state.tradingAddedResources[k])
-                self.state.tradingAddedResources = {"lumber":0,"brick":0,"wool":0,"grain":0,"ore":0}
-                self.state.allowed_actions.remove("accepting_trade")
-                for k in ("endTurn", "trading", "building"):
-                    if k not in self.state.allowed_actions:
-                        self.state.allowed_actions.append(k)
-            if rect_contains(self.state.declineTrade_rect, pos):
-                self.state.current_player = self.state.trading_partner
-                self.state.trading = False
-                self.state.tradingAddedResources = {"lumber":0,"brick":0,"wool":0,"grain":0,"ore":0}
-                self.state.allowed_actions.remove("accepting_trade")
-                for k in ("endTurn", "trading", "building"):
-                    if k not in self.state.allowed_actions:
-                        self.state.allowed_actions.append(k)
-                                
-            if rect_contains(self.state.devMode_rect, pos) and self.state.devMode == False:
-                self.button_clicked()
-                self.state.devMode = True
-                self.state.round = 5
-                self.state.push_message("Developer mode activated.") 
-                for player in self.state.players:
-                    player.resources = {"lumber":100,"brick":100,"wool":100,"grain":100,"ore":100}
-            if rect_contains(self.state.inspect_rect, pos):
-                yesOrNo = True if self.state.inspecting == False else False
-                self.button_clicked()
-                self.state.inspecting = yesOrNo
-            elif self.state.inspecting: # inspection mode
-                tile_idx = self.state.find_nearest_tile(pos)
-                tile = self.state.tiles[tile_idx] if tile_idx is not None else None
-                self.state.push_message(f"Inspected tile:")
-                if tile and tile_idx is not None and tile.get("quantum"):
-                    entangled_with_coord = None
-                    for entTile in self.state.tiles:
-                        if entTile.get("ent_group") == tile.get("ent_group") and entTile != tile:
-                            entangled_with_coord = entTile.get("coord")
-                            break
-                    self.state.push_message(f"- Possible resources: {tile.get('superposed')[0]} and {tile.get('superposed')[1]}")
-                    self.state.push_message(f"- entangled with coord: {entangled_with_coord}")
+                    self.state.push_message("You already placed a settlement this initial placement turn")
+            elif k == "road":
+                if self.state.settlements_placed == 1:
+                    if self.state.roads_placed == 0:
+                        self.state.sel = k
+                        self.state.placing = self.state.sel
+                    else:
+                        self.state.push_message("You already placed a road this initial placement turn")
                 else:
-                    self.state.push_message(f"- Resource: {tile.get('resource') if tile else 'N/A'}")
-            
-            # if trading mode: select give then receive via panels
-            if self.state.trading:
-                # check inventory give buttons
-                #print(self.state.trading_partners_rects)
-                #print(self.state.possible_trading_partners)
-                for res, rect in enumerate(self.state.trading_partners_rects):
-                    if rect_contains(rect, pos) and "accepting_trade" not in self.state.allowed_actions:
-                        self.state.tradingAddedResources = {"lumber":0,"brick":0,"wool":0,"grain":0,"ore":0}
-                        if self.state.possible_trading_partners[res] == "bank/port":
-                            if not self.state.trading_partner == "bank/port":
-                                self.state.trading_partner = "bank/port"
-                            else:
-                                self.state.trading_partner = None
-                        else:
-                            for player in self.state.players:
-                                if player.idx == self.state.possible_trading_partners[res]:
-                                    if not self.state.trading_partner == player.idx:
-                                        self.state.trading_partner = player.idx
-                                    else:
-                                        self.state.trading_partner = None
-                        return
-                # + and - clicks
-                #check plus signs
-                for i, (rect, res) in enumerate(self.state.plusSignRects):
-                    if rect_contains(rect, pos) and "accepting_trade" not in self.state.allowed_actions:
-                        self.state.tradingAddedResources[res] += 1
-                for i, (rect, res) in enumerate(self.state.minusSignRects):
-                    if rect_contains(rect, pos) and "accepting_trade" not in self.state.allowed_actions and self.state.players[self.state.current_player].resources.get(res,0) + self.state.tradingAddedResources.get(res, 0) >= 0:
-                        self.state.tradingAddedResources[res] -= 1
-                    
-            if self.state.dev_card_rects:
-                for i, (rect, card) in enumerate(self.state.dev_card_rects):
-                    if rect_contains(rect, pos):
-                        if self.state.players[self.state.current_player].held_dev_cards[card] > 0:
-                            if "placeDevCard" in self.state.allowed_actions or self.state.devMode == True:
-                                self.state.play_dev_card(self.state.current_player, card)
-                            else:
-                                self.state.push_message("Cannot play development card right now.")
-                        else:
-                            self.state.push_message("You do not have that development card.")
-                        return
-            
-            if self.state.possible_victims:
-                for res, rect in enumerate(self.state.possible_victims_rects):
-                    if rect_contains(rect, pos):
-                        self.state.victim = self.state.possible_victims[res]
-                        self.state.steal_from_victim(self.state.current_player, self.state.victim)
-                        self.state.possible_victims = []
-                        return
+                    self.state.push_message("First, place a settlement before placing a road")
+            else:
+                self.state.push_message("Can only place settlements and roads during initial placement.")
+        elif self.state.player_can_afford(self.state.current_player, k):
+            if self.state.turn.allows(Action.BUILD) or self.state.devMode == True:
+                if k == "dev":
+                    self.state.buy_dev_card()
+                else:
+                    self.state.sel = k
+                    self.state.placing = self.state.sel
+            else:
+                self.state.push_message("Cannot build right now.")
+        else:
+            self.state.push_message("Can't afford")
 
-            # shop clicks
-            for k, rect in self.state.shop_rects:
-                if rect_contains(rect, pos):
-                    # toggle selection
-                    if self.state.sel == k:
-                        self.button_clicked()
-                        self.state.sel = None
-                        self.state.placing = False
-                    else:
-                        self.button_clicked()
-                        if self.state.round < 2 and self.state.devMode == False:
-                            if k == "settlement":
-                                if self.state.settlements_placed == 0:
-                                    self.state.sel = k
-                                    self.state.placing = self.state.sel
-                                else:
-                                    self.state.push_message("You already placed a settlement this initial placement turn")
-                            elif k == "road":
-                                if self.state.settlements_placed == 1:
-                                    if self.state.roads_placed == 0:
-                                        self.state.sel = k
-                                        self.state.placing = self.state.sel
-                                    else:
-                                        self.state.push_message("You already placed a road this initial placement turn")
-                                else:
-                                    self.state.push_message("First, place a settlement before placing a road")
-                            else:
-                                self.state.push_message("Can only place settlements and roads during initial placement.")
-                        elif self.state.player_can_afford(self.state.current_player, k):
-                            if "building" in self.state.allowed_actions or self.state.devMode == True:
-                                if k == "dev":
-                                    if len(self.state.possible_cards) > 0:
-                                        self.state.player_buy(self.state.current_player, k)
-                                        self.state.give_player_devcard(self.state.current_player)
-                                    else:
-                                        self.state.push_message("No development cards left to buy.")
-                                    return
-                                else:
-                                    self.state.sel = k
-                                    self.state.placing = self.state.sel
-                            else:
-                                self.state.push_message("Cannot build right now.")
-                        else:
-                            self.state.push_message("Can't afford")
-                    return
-
-            # placement logic
-            if self.state.placing and self.state.sel:
-                if self.state.sel in ("settlement","city"):
-                    nearest = self.state.find_nearest_intersection(pos)
-                    if nearest is not None:
-                        if self.state.sel == "settlement":
-                            if self.state.can_place_settlement(nearest):
-                                if self.state.round < 2:
-                                    if self.state.settlements_placed == 0:
-                                        self.state.place_settlement(nearest, self.state.current_player, "settlement")
-                                        self.state.sel = None
-                                        self.state.placing = False
-                                        self.state.settlements_placed += 1
-                                        if self.state.round == 1:
-                                            # give resources for 2nd settlement
-                                            self.state.give_initial_settlement_resources(nearest, self.state.current_player)
-                                            #print("Gave initial resources for settlement at", nearest)
-                                    else:
-                                        self.state.push_message("Cannot place more settlements this round.")
-                                elif self.state.player_buy(self.state.current_player, "settlement"):
-                                    self.state.place_settlement(nearest, self.state.current_player, "settlement")
-                                    self.state.sel = None
-                                    self.state.placing = False
-                                    self.state.settlements_placed += 1
-                        else:
-                            # city
-                            if self.state.can_upgrade_to_city(self.state.current_player, nearest):
-                                if self.state.player_buy(self.state.current_player, "city"):
-                                    self.state.upgrade_to_city(nearest, self.state.current_player)
-                                    self.state.sel = None
-                                    self.state.placing = False
-                elif self.state.sel == "road":
-                    nearest = self.state.find_nearest_road(pos)
-                    if nearest is not None:
-                        if self.state.can_place_road_slot(nearest):
-                            if self.state.round < 2:
-                                if self.state.roads_placed == 0:
-                                    self.state.place_road(nearest, self.state.current_player)
-                                    self.state.sel = None
-                                    self.state.placing = False
-                                    self.state.roads_placed += 1
-                                else:
-                                    self.state.push_message("Cannot place more roads this round.")
-                            # incase the player played a development card
-                            elif self.state.has_free_roads:
-                                self.state.place_road(nearest, self.state.current_player)
-                                self.state.roads_left_to_build -= 1
-                                self.state.roads_placed += 1
-                                if self.state.roads_left_to_build == 0:
-                                    self.state.sel = None
-                                    self.state.placing = False
-                                    self.state.has_free_roads = False
-                                else:
-                                    self.state.push_message("place second road")
-                            # incase the player bought a road
-                            elif self.state.player_buy(self.state.current_player, "road"):
-                                self.state.place_road(nearest, self.state.current_player)
-                                self.state.sel = None
-                                self.state.placing = False
-                                self.state.roads_placed += 1
-            elif self.state.moving_robber and self.state.inspecting == False:
-                tile_idx = self.state.find_nearest_tile(pos)
-                if tile_idx is not None and tile_idx != self.state.robber_idx:
-                    self.state.move_robber_to(tile_idx)
-                    self.state.moving_robber = False
-
-            elif self.state.interfering and self.state.inspecting == False:
-                tile_idx = self.state.find_nearest_tile(pos)
-                if tile_idx is not None:
-                    tile = self.state.tiles[tile_idx]
-                    if not tile.get("quantum"):
-                        self.state.push_message("please select a quantum tile")
-                    else:
-                        self.state.change_ditribution(tile)
-                        self.state.interfering = False
-
-
-            elif self.state.entangling and self.state.inspecting == False:
-                tile_idx = self.state.find_nearest_tile(pos)
-                resource_list = [t.get("resource") for idx, t in self.state.entangling_pair]
-                if tile_idx is not None and tile_idx != self.state.robber_idx:
-                    tile = self.state.tiles[tile_idx]
-                    if tile in self.state.entangling_pair:
-                        self.state.push_message("Already selected this tile. Select a different quantum tile.")
-                    elif tile.get("quantum", False):
-                        self.state.push_message("Selected tile is quantum. Select a classical tile.")
-                    elif tile.get("resource") == "desert":
-                        self.state.push_message("Cannot entangle desert tile. Select a different tile.")
-                    
-                    elif tile.get("resource") in resource_list:
-                        self.state.push_message("Cannot entangle two tiles of the same resource type. Select a different tile.")
+    # -- the board ----------------------------------------------------------
+    def click_board(self, pos):
+        if self.state.inspecting: # inspection mode
+            tile_idx = self.state.find_nearest_tile(pos)
+            tile = self.state.tiles[tile_idx] if tile_idx is not None else None
+            self.state.push_message(f"Inspected tile:")
+            if tile and tile_idx is not None and tile.get("quantum"):
+                tiles = self.state.tiles
+                entangled_with = [tiles.coords[t] for t in tiles.group_members(tile.get("ent_group")) if t != tile_idx]
+                self.state.push_message(f"- Possible resources: {' and '.join(tile.get('superposed'))}")
+                self.state.push_message(f"- entangled with coord: {', '.join(map(str, entangled_with))}")
+            else:
+                self.state.push_message(f"- Resource: {tile.get('resource') if tile else 'N/A'}")
+
+        # placement logic
+        if self.state.placing and self.state.sel:
+            built = False
+            if self.state.sel in ("settlement","city"):
+                nearest = self.state.find_nearest_intersection(pos)
+                if nearest is not None:
+                    if self.state.sel == "settlement":
+                        built = self.state.build_settlement(nearest)
                     else:
-                        self.state.entangling_pair.append((tile_idx, tile))
-                        if len(self.state.entangling_pair) == 2:
-                            self.state.unused_ent_group_numbers.sort()
-                            #print("entangling tiles:", self.state.entangling_pair)
-                            self.state.entangle_pair_of_normal_tiles(self.state.entangling_pair, self.state.unused_ent_group_numbers.pop(0))
-                            self.state.entangling_pair = []
-                            self.state.entangling = False 
+                        built = self.state.build_city(nearest)
+            elif self.state.sel == "road":
+                nearest = self.state.find_nearest_road(pos)
+                if nearest is not None:
+                    built = self.state.build_road(nearest)
+            # the road building card keeps the road selected until both are placed
+            if built and not self.state.has_free_roads:
+                self.state.sel = None
+                self.state.placing = False
+        elif self.state.moving_robber and self.state.inspecting == False:
+            self.state.place_robber(self.state.find_nearest_tile(pos))
+
+        elif self.state.interfering and self.state.inspecting == False:
+            self.state.interfere(self.state.find_nearest_tile(pos))
+
+        elif self.state.entangling and self.state.inspecting == False:
+            self.state.select_entangle_tile(self.state.find_nearest_tile(pos))
 
     def button_clicked(self):
         self.state.inspecting = False #if button != self.state.inspect_rect else self.state.inspecting
@@ -396,13 +402,38 @@ class GameUI:
                     
         
 
-    def draw(self):
+    def draw(self, now=None):
+        """now: game time of the frame, see GameState.draw"""
         s = self.screen
         s.fill(BG_COLOR)
         if self.state.runningGame:
-            self.state.draw()  # the game state handles low-level drawing
+            self.state.draw(now)  # the game state handles low-level drawing
+            if self.show_analysis:
+                self.draw_analysis()
+            if self.speed != 1:
+                draw_text(s, f"Fast forward {self.speed:g}x", s.get_width()//2, 40, size=18, color=TEXT_COLOR, centered=True)
         elif self.state.playerWon == False:
             self.state.draw_start_screen()
         else:
             self.state.draw_game_over_screen()
 
+
+    def draw_analysis(self):
+        """the overlay from the last analysis job, one line per player: income per roll and token worth"""
+        s = self.screen
+        x, w = 150, 420
+        h = 26 + 20 * self.state.num_players
+        y = s.get_height() - 76 - h
+        panel = pygame.Surface((w, h), pygame.SRCALPHA)
+        panel.fill((*PANEL_BG[:3], 220))
+        s.blit(panel, (x, y))
+        title = "Expected per roll  |  in tokens" if self.analysis is not None else "Analysing..."
+        draw_text(s, title, x + 8, y + 4, size=14)
+        if self.analysis is None:
+            return
+        short = "LBWGO"
+        for i, (income, tokens) in enumerate(zip(self.analysis["yields"], self.analysis["tokens"])):
+            parts = " ".join(f"{short[r]}{v:.2f}" for r, v in enumerate(income))
+            held = " ".join(f"{short[r]}{v:.1f}" for r, v in enumerate(tokens) if v)
+            draw_text(s, f"P{i+1}  {sum(income):.2f}: {parts}  |  {held or '-'}", x + 8, y + 24 + 20*i,
+                      size=14, color=PLAYER_COLORS[i])
@@ -8,6 +8,21 @@ def hex_to_pixel(q, r, size=50, origin=(0,0)):
     y = size * 1.5 * r
     return (ox + x, oy + y)
 
+def pixel_to_hex(x, y, size=50, origin=(0,0)):
+    """the (q, r) of the hex the pixel lies in, the inverse of hex_to_pixel"""
+    ox, oy = origin
+    fq = (SQRT3/3 * (x - ox) - (y - oy)/3) / size
+    fr = (2/3 * (y - oy)) / size
+    # round in cube coordinates, the component that moved most is recomputed from the other two
+    fs = -fq - fr
+    q, r, s = round(fq), round(fr), round(fs)
+    dq, dr, ds = abs(q - fq), abs(r - fr), abs(s - fs)
+    if dq > dr and dq > ds:
+        q = -r - s
+    elif dr > ds:
+        r = -q - s
+    return (q, r)
+
 def polygon_corners(center, size=50):
     cx, cy = center
     pts = []
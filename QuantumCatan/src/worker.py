@@ -0,0 +1,116 @@
+# src/worker.py
+# Background jobs for the window: bot moves, the analysis overlay and autosaves run on a worker
+# thread against a clone() of the game, results come back as ANALYSIS_DONE pygame events.
+# The main loop only copies the game and reads events, so it keeps its 60 frames per second
+# while a bot thinks.
+#
+#   worker = AnalysisWorker()
+#   worker.submit("analysis", analyse, game.clone())
+#   ... in the event loop: event.type == ANALYSIS_DONE -> event.kind, event.job, event.result, event.error
+
+import logging, os, pickle, queue, threading
+import pygame
+from .gamelog import get_logger, log_event
+from .resources import NUM_RESOURCES
+
+ANALYSIS_DONE = pygame.event.custom_type()
+
+log = get_logger("worker")
+
+
+class AnalysisWorker:
+    """
+    One thread working off a queue of jobs. Every job has a kind; a new job replaces the queued
+    ones of its kind, so the overlay never works through a backlog of outdated games.
+    The jobs get snapshots (clones) and must not touch the live game.
+    """
+    def __init__(self, post=None):
+        self._jobs = queue.Queue()
+        self._latest = {}       # kind -> id of the newest job of that kind
+        self._next_id = 0
+        self._lock = threading.Lock()
+        # pygame.event.post is safe to call from another thread
+        self._post = post or (lambda **result: pygame.event.post(pygame.event.Event(ANALYSIS_DONE, **result)))
+        self._thread = threading.Thread(target=self._run, name="quatan-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, kind, fn, *args):
+        """queues fn(*args), returns the job id the result event will carry"""
+        with self._lock:
+            self._next_id += 1
+            job = self._next_id
+            self._latest[kind] = job
+        self._jobs.put((job, kind, fn, args))
+        return job
+
+    def is_current(self, kind, job):
+        """False once a newer job of the same kind was submitted"""
+        return self._latest.get(kind) == job
+
+    def _run(self):
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                return
+            job, kind, fn, args = item
+            if not self.is_current(kind, job):
+                continue   # replaced while waiting
+            result, error = None, None
+            try:
+                result = fn(*args)
+            except Exception as e:
+                error = e
+                log_event(log, logging.ERROR, "job_failed", kind=kind, error=repr(e))
+            try:
+                self._post(kind=kind, job=job, result=result, error=error)
+            except pygame.error:
+                return   # the window is gone
+
+    def close(self, timeout=2.0):
+        self._jobs.put(None)
+        self._thread.join(timeout)
+
+
+# -- jobs -------------------------------------------------------------
+def bot_move(bot, game, actions):
+    return bot.choose(game, actions)
+
+
+def expected_yields(game):
+    """resources per roll for every player (a list per player, indexed by resource code), robber included"""
+    tiles = game.tiles
+    vertex_tiles = game.topology.vertex_tiles
+    robber = getattr(game, "robber_idx", None)
+    out = [[0.0] * NUM_RESOURCES for _ in game.players]
+    for v, (owner, typ) in game.settlements_owner.items():
+        amount = 2 if typ == "city" else 1
+        for res, x in enumerate(tiles.expected_yield(vertex_tiles[v], blocked=robber)[:NUM_RESOURCES]):
+            out[owner][res] += amount * x
+    return out
+
+
+def token_outcomes(game):
+    """expected resources in every player's unmeasured tokens (a list per player, indexed by resource code)"""
+    states = game.tiles.states
+    out = [[0.0] * NUM_RESOURCES for _ in game.players]
+    for i, player in enumerate(game.players):
+        for token in player.tokens:
+            group = token["group"]
+            if group not in states:
+                continue
+            for res, p in zip(states.resources_of(group), states.tile_probabilities(group, token["from_tile_idx"])):
+                out[i][res] += float(p)
+    return out
+
+
+def analyse(game):
+    return {"yields": expected_yields(game), "tokens": token_outcomes(game)}
+
+
+def autosave(game, path):
+    """pickles the game (a clone) to path, through a temporary file so a crash never leaves half a save"""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(game, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,8 @@
+# tests/conftest.py
+# The tests import the game as `src` from the project folder and never open a real window
+
+import os, sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
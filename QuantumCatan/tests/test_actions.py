@@ -0,0 +1,48 @@
+# tests/test_actions.py
+
+import random
+import pytest
+from src.bots import new_game, RandomBot, HeuristicBot
+from src.resources import RESOURCES
+from src.actions import (legal_actions, is_legal, apply_action, entangle_pairs, iter_entangle_pairs, END_TURN, ROLL,
+                         BUY_DEV, ROAD, SETTLEMENT, CITY, ROBBER, STEAL, ENTANGLE, INTERFERE, CHOOSE_RESOURCE,
+                         BANK_TRADE, PLAY_DEV, ACCEPT_TRADE, DECLINE_TRADE, DEV_CARDS)
+
+
+def candidates(game, rng):
+    """the legal actions plus a pile of random ones of every kind"""
+    tiles, vertices, roads = len(game.tiles), len(game.vertex_positions), len(game.roads_list)
+    out = legal_actions(game) + [(END_TURN,), (ROLL,), (BUY_DEV,), (ACCEPT_TRADE,), (DECLINE_TRADE,),
+                                 (ENTANGLE, None), ("fly",), (ROAD,), (ROAD, -1), (ROAD, roads), (ROAD, 1, 2)]
+    for _ in range(10):
+        out += [(ROAD, rng.randrange(roads)), (SETTLEMENT, rng.randrange(vertices)), (CITY, rng.randrange(vertices)),
+                (ROBBER, rng.randrange(tiles)), (ENTANGLE, (rng.randrange(tiles), rng.randrange(tiles))),
+                (INTERFERE, rng.randrange(tiles)), (STEAL, rng.randrange(4)), (PLAY_DEV, rng.choice(DEV_CARDS)),
+                (BANK_TRADE, rng.choice(RESOURCES), rng.choice(RESOURCES)), (CHOOSE_RESOURCE, rng.choice(RESOURCES))]
+    return out
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_is_legal_agrees_with_the_list(seed):
+    rng = random.Random(seed)
+    game = new_game(rng.choice([2, 3, 4]), 5, seed=seed)
+    bot = HeuristicBot(seed=seed) if seed % 2 else RandomBot(seed=seed)
+    while game.runningGame and game.round < 40:
+        legal = legal_actions(game)
+        listed = set(legal)
+        for action in candidates(game, rng):
+            assert is_legal(game, action) == (action in listed), action
+        # True == 1 for the list, not for the server
+        assert not is_legal(game, (ROAD, True))
+        action = legal[0] if len(legal) == 1 else bot.choose(game, legal)
+        if not apply_action(game, action):
+            apply_action(game, (END_TURN,))
+
+
+def test_pairs_of_one_tile():
+    game = new_game(2, 0, seed=1)
+    game.entangling = True
+    pairs = entangle_pairs(game)
+    tile = pairs[0][0]
+    assert list(iter_entangle_pairs(game, tile)) == [p for p in pairs if tile in p]
+    assert legal_actions(game, max_pairs=3) == [(ENTANGLE, p) for p in pairs[:3]]
@@ -0,0 +1,29 @@
+# tests/test_assets.py
+
+import pygame
+from src.assets import AssetManager, LOGO_PATH, FONT_PATH
+
+
+def test_images_are_loaded_once_and_scaled_once_per_size(monkeypatch):
+    loads = []
+    real_load = pygame.image.load
+    monkeypatch.setattr(pygame.image, "load", lambda path: loads.append(path) or real_load(path))
+    assets = AssetManager()
+    small = assets.image(LOGO_PATH, (60, 40))
+    assert assets.image(LOGO_PATH, (60, 40)) is small
+    assert assets.image(LOGO_PATH, [60, 40]) is small
+    assert assets.image(LOGO_PATH, (120, 80)).get_size() == (120, 80)
+    assert len(loads) == 1
+
+
+def test_preload_fills_the_caches():
+    assets = AssetManager()
+    assets.preload(images=[(LOGO_PATH, (30, 20))], fonts=[12])
+    assets.wait()
+    assert (LOGO_PATH, (30, 20)) in assets._images and (FONT_PATH, 12) in assets._fonts
+    assert assets.font(12) is assets._fonts[(FONT_PATH, 12)]
+
+
+def test_missing_sound_is_not_fatal():
+    assets = AssetManager()
+    assert assets.sound("music/no_such_file.wav") is None
@@ -0,0 +1,22 @@
+# tests/test_boardgen.py
+
+import numpy as np
+import pytest
+from src.boardgen import generate_boards, DESERT
+
+
+@pytest.mark.parametrize("radius, pairs", [(2, 2), (2, 9), (3, 17)])
+def test_every_board_gets_the_requested_pairs(radius, pairs):
+    b = generate_boards(2000, radius, pairs, seed=3)
+    assert b.pairs.shape == (2000, pairs, 2) and (b.pairs >= 0).all()
+    rows = np.arange(len(b))[:, None]
+    first, second = b.resource[rows, b.pairs[:, :, 0]], b.resource[rows, b.pairs[:, :, 1]]
+    assert (first != second).all() and (first != DESERT).all() and (second != DESERT).all()
+    # no tile in two pairs
+    tiles = np.sort(b.pairs.reshape(len(b), -1), axis=1)
+    assert (tiles[:, 1:] != tiles[:, :-1]).all()
+
+
+def test_more_pairs_than_a_board_holds_is_an_error():
+    with pytest.raises(ValueError):
+        generate_boards(3, 1, 4)
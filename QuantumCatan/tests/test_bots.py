@@ -0,0 +1,37 @@
+# tests/test_bots.py
+
+import random
+import pytest
+from src.bots import Bot, make_bot, new_game, play_game, HeuristicBot
+
+
+def test_a_bot_without_choose_cannot_be_made():
+    class Forgetful(Bot):
+        name = "forgetful"
+
+    with pytest.raises(TypeError):
+        Forgetful()
+
+
+@pytest.mark.parametrize("name", ["random", "heuristic", "mcts"])
+def test_every_bot_can_be_made(name):
+    bot = make_bot(name, seed=1)
+    assert isinstance(bot, Bot)
+    bot.close()
+
+
+@pytest.mark.parametrize("balanced", [False, True])
+def test_a_seeded_game_leaves_the_random_module_alone(balanced):
+    state = random.getstate()
+    games = []
+    for _ in range(2):
+        game = new_game(2, seed=4, balanced=balanced)
+        play_game(game, [HeuristicBot(seed=1), HeuristicBot(seed=2)], max_rounds=30)
+        games.append((game.tiles.resource.tolist(), [p.buildables_placed for p in game.players], game.round))
+    assert random.getstate() == state
+    assert games[0] == games[1]
+
+
+def test_a_clone_does_not_share_the_dice():
+    game = new_game(2, seed=4)
+    assert game.clone().rng is not game.rng
@@ -0,0 +1,45 @@
+# tests/test_clone.py
+# GameEngine.clone(): what bots and worker processes get must not know or hold more than the rules
+
+import pickle
+from src.bots.base import new_game
+
+
+def test_clones_do_not_predict_measurements():
+    game = new_game(2, num_entangled_pairs=9, seed=3)
+    groups = game.tiles.states.groups()
+    assert len(groups) == 9
+    matched = 0
+    for _ in range(20):
+        clone = game.clone()
+        matched += sum(clone.tiles.states.measure([g]) == game.tiles.states.measure([g]) for g in groups)
+    # a pair collapses one of two ways, a clone sharing the live stream would match all 180
+    assert matched < 0.75 * 20 * len(groups)
+
+
+def test_clone_keeps_the_quantum_state():
+    game = new_game(2, num_entangled_pairs=3, seed=4)
+    g = game.tiles.states.groups()[0]
+    game.tiles.states.apply(g, [2, 0])
+    clone = game.clone()
+    assert clone.tiles.states.weights_of(g) == game.tiles.states.weights_of(g)
+    assert clone.tiles.states.rng is not game.tiles.states.rng
+
+
+def test_gui_clone_has_no_pygame_objects():
+    import pygame
+    pygame.display.init()
+    pygame.font.init()
+    try:
+        from src.game_state import GameState
+        from src.ui import GameUI
+        screen = pygame.display.set_mode((1200, 800))
+        state = GameState(2, screen)
+        state.start_game()
+        GameUI(state, screen).draw()
+        data = pickle.dumps(state.clone())
+        # unpickling in a spawn worker would have to import pygame for any of its objects
+        assert b"pygame" not in data
+        assert b"game_state" not in data
+    finally:
+        pygame.quit()
@@ -0,0 +1,30 @@
+# tests/test_engine_split.py
+# The rules, bots, server and tools run without pygame, only the window modules import it
+
+import os, subprocess, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEADLESS = ["src.engine", "src.actions", "src.bots", "src.sync", "src.server", "src.protocol",
+            "src.tournament", "src.stats", "src.boardgen", "src.balanced"]
+
+
+def imported_modules(modules):
+    """sys.modules of a fresh interpreter after importing `modules`"""
+    code = f"import sys\nfor m in {modules!r}: __import__(m)\nprint('\\n'.join(sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(out.stdout.split())
+
+
+def test_headless_modules_do_not_import_pygame():
+    loaded = imported_modules(HEADLESS)
+    assert "src.engine" in loaded
+    assert not any(m == "pygame" or m.startswith("pygame.") for m in loaded)
+    assert "src.game_state" not in loaded
+
+
+def test_a_game_plays_without_pygame():
+    code = ("import sys\nfrom src.bots import new_game, play_game, HeuristicBot\n"
+            "game = new_game(2, seed=1)\nplay_game(game, [HeuristicBot(seed=1), HeuristicBot(seed=2)], max_rounds=50)\n"
+            "assert 'pygame' not in sys.modules\nprint(game.round)")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert out.returncode == 0, out.stderr
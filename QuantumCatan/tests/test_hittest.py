@@ -0,0 +1,31 @@
+# tests/test_hittest.py
+
+import pygame
+from src.hittest import HitRegistry, LAYER_BUTTON, LAYER_PANEL, LAYER_POPUP
+
+
+def test_top_layer_wins_then_first_registered():
+    hits = HitRegistry()
+    big = pygame.Rect(0, 0, 300, 300)
+    hits.set("game", "board", [(big, LAYER_BUTTON, "under", 0)])
+    hits.set("game", "panel", [(big, LAYER_PANEL, "first", 1), (big, LAYER_PANEL, "second", 2)])
+    assert hits.hit("game", (150, 150)) == ("first", 1)
+    hits.set("game", "popup", [(pygame.Rect(100, 100, 10, 10), LAYER_POPUP, "popup", 3)])
+    assert hits.hit("game", (105, 105)) == ("popup", 3)
+    assert hits.hit("game", (150, 150)) == ("first", 1)
+    hits.clear("game", "panel")
+    assert hits.hit("game", (150, 150)) == ("under", 0)
+    assert hits.hit("game", (400, 400)) is None
+
+
+def test_many_overlapping_targets():
+    hits = HitRegistry()
+    rect = pygame.Rect(10, 10, 40, 40)
+    targets = [(rect, LAYER_BUTTON + i % 3, "t", i) for i in range(500)]
+    hits.set("game", "grid", targets)
+    # the first target of the highest layer
+    assert hits.hit("game", (20, 20)) == ("t", 2)
+    hits.set("game", "grid", targets[:1])
+    assert hits.hit("game", (20, 20)) == ("t", 0)
+    hits.clear("game", "grid")
+    assert hits.targets("game") == [] and hits.hit("game", (20, 20)) is None
@@ -0,0 +1,23 @@
+# tests/test_panels.py
+
+import pytest
+from src.panels import Panel, InventoryPanel, TokenPanel, DevCardBar, TradePanel, ShopPanel
+
+
+def test_a_panel_without_place_or_render_cannot_be_made():
+    class NoRender(Panel):
+        def place(self, game, w, h):
+            return None
+
+    class NoPlace(Panel):
+        def render(self, game, surf):
+            pass
+
+    for cls in (NoRender, NoPlace):
+        with pytest.raises(TypeError):
+            cls()
+
+
+def test_the_game_panels_are_complete():
+    for cls in (InventoryPanel, TokenPanel, DevCardBar, TradePanel, ShopPanel):
+        assert isinstance(cls(), Panel)
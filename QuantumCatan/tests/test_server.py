@@ -0,0 +1,191 @@
+# tests/test_server.py
+# The game server over loopback: a real GameServer on a free port and real clients.
+
+import asyncio, time
+import pytest
+from src.server import GameServer, GameClient, ProtocolError, MAX_RADIUS, MAX_LISTED_PAIRS
+from src.actions import ENTANGLE, OFFER_TRADE, legal_actions, apply_action
+from src.bots import RandomBot
+from src.turn import Action, TurnPhase
+from src.protocol import encode, decode
+
+
+def run(test):
+    """runs test(server, port) against a fresh server and stops it afterwards"""
+    async def main():
+        server = GameServer()
+        port = await server.start(port=0)
+        try:
+            await asyncio.wait_for(test(server, port), 30)
+        finally:
+            await server.stop()
+    asyncio.run(main())
+
+
+async def raw_connection(port):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+    async def ask(message):
+        writer.write(message if isinstance(message, bytes) else encode(message))
+        await writer.drain()
+        return decode(await reader.readline())
+    return ask, writer
+
+
+async def wait_for_room_gone(server, game):
+    for _ in range(200):
+        if game not in server.rooms:
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+@pytest.mark.parametrize("fields", [
+    {"players": [2]}, {"players": None}, {"pairs": "2"}, {"radius": {"r": 2}}, {"players": True},
+])
+def test_bad_create_fields_get_an_error(fields):
+    async def test(server, port):
+        ask, writer = await raw_connection(port)
+        reply = await ask({"op": "create", "id": 1, **fields})
+        assert reply["op"] == "error" and reply["id"] == 1
+        # the connection is still served
+        assert (await ask({"op": "create", "id": 2, "players": 2}))["op"] == "created"
+        writer.close()
+    run(test)
+
+
+def test_wrongly_typed_fields_do_not_kill_the_connection():
+    async def test(server, port):
+        ask, writer = await raw_connection(port)
+        for line in [b"nonsense\n", b"[1]\n", b'{"op":"fly"}\n', b'{"op":"join","game":[1]}\n',
+                     b'{"op":"join","game":{"a":1}}\n', b'{"op":"action","action":["road"]}\n']:
+            assert (await ask(line))["op"] == "error"
+        assert (await ask({"op": "list"}))["op"] == "games"
+        writer.close()
+    run(test)
+
+
+def test_running_room_is_deleted_when_its_last_player_leaves():
+    async def test(server, port):
+        a = await GameClient().connect(port=port)
+        b = await GameClient().connect(port=port)
+        game = await a.create(players=2)
+        await a.join(game)
+        await b.join(game)
+        assert server.rooms[game].game.runningGame
+        await a.request("leave")
+        assert game in server.rooms
+        # disconnecting is leaving too
+        await b.close()
+        assert await wait_for_room_gone(server, game)
+        await a.close()
+    run(test)
+
+
+def test_rooms_nobody_joined_go_with_their_creator():
+    async def test(server, port):
+        a = await GameClient().connect(port=port)
+        games = [await a.create(players=2) for _ in range(3)]
+        assert all(g in server.rooms for g in games)
+        await a.close()
+        for g in games:
+            assert await wait_for_room_gone(server, g)
+    run(test)
+
+
+def test_actions_reach_every_seat():
+    async def test(server, port):
+        a = await GameClient().connect(port=port)
+        b = await GameClient().connect(port=port)
+        game = await a.create(players=2, pairs=1)
+        seat_a = (await a.join(game))["seat"]
+        joined = await b.join(game)
+        # b's snapshot shows a's hand as a count only
+        hand = joined["state"]["hands"][seat_a]
+        assert "resources" not in hand and "cards" in hand
+
+        mover = a if server.rooms[game].game.current_player == seat_a else b
+        action = (await mover.legal())[0]
+        version = await mover.act(action)
+        for client in (a, b):
+            update = await client.next_event("update", timeout=5)
+            assert update["game"] == game and update["delta"]["v"] == version
+
+        with pytest.raises(ProtocolError):
+            await (b if mover is a else a).act(action)
+        await a.close()
+        await b.close()
+    run(test)
+
+
+def test_entangling_on_the_largest_board_stays_cheap():
+    async def test(server, port):
+        a = await GameClient().connect(port=port)
+        game = await a.create(players=2, pairs=0, radius=MAX_RADIUS)
+        seat = (await a.join(game, seat=0))["seat"]
+        engine = server.rooms[game].game
+        # straight into the choice after a measurement: every tile is classical, millions of pairs
+        engine.current_player = seat
+        engine.entangling = True
+        engine.turn.enter(TurnPhase.ROBBER)
+
+        t0 = time.perf_counter()
+        reply = await a.request("legal")
+        assert len(reply["actions"]) == MAX_LISTED_PAIRS and reply["more"]
+        first = reply["tiles"][0]
+        partners = await a.legal(tile=first)
+        assert partners and all(first in pair for _, pair in partners)
+        with pytest.raises(ProtocolError):
+            await a.act((ENTANGLE, (first, first)))
+        await a.act(partners[-1])
+        assert time.perf_counter() - t0 < 2.0
+        assert engine.tiles.quantum[partners[-1][1][0]] and not engine.entangling
+        await a.close()
+    run(test)
+
+
+def test_seat_must_be_a_whole_number():
+    async def test(server, port):
+        a = await GameClient().connect(port=port)
+        game = await a.create(players=2)
+        for seat in (True, "0", 1.0):
+            with pytest.raises(ProtocolError):
+                await a.join(game, seat=seat)
+        assert (await a.join(game, seat=1))["seat"] == 1
+        await a.close()
+    run(test)
+
+
+def trading_turn(engine, seats):
+    """plays the game on until one of `seats` may offer a trade, with a lumber to give"""
+    bot = RandomBot(seed=0)
+    while not (engine.turn.allows(Action.TRADE) and engine.current_player in seats):
+        actions = legal_actions(engine)
+        apply_action(engine, actions[0] if len(actions) == 1 else bot.choose(engine, actions))
+    engine.players[engine.current_player].resources["lumber"] += 1
+    return engine.current_player
+
+
+def test_offers_need_someone_in_the_seat():
+    async def test(server, port):
+        a = await GameClient().connect(port=port)
+        b = await GameClient().connect(port=port)
+        game = await a.create(players=3)
+        await a.join(game, seat=0)
+        await b.join(game, seat=1)
+        engine = server.rooms[game].game
+        seat = trading_turn(engine, (0, 1))
+        mover, other = (a, b) if seat == 0 else (b, a)
+        with pytest.raises(ProtocolError):
+            await mover.act((OFFER_TRADE, 2, (-1, 0, 0, 0, 0)))
+        await mover.act((OFFER_TRADE, 1 - seat, (-1, 1, 0, 0, 0)))
+        assert engine.current_player == 1 - seat and engine.trading
+        # the partner goes away without answering, the offer is declined for them
+        await other.close()
+        for _ in range(200):
+            if not engine.trading:
+                break
+            await asyncio.sleep(0.01)
+        assert not engine.trading and engine.current_player == seat
+        await mover.close()
+    run(test)
@@ -0,0 +1,63 @@
+# tests/test_snapshot.py
+# TileStore.snapshot()/restore() and QuantumState copies: the board goes back, the future does not
+
+from src.bots.base import new_game
+
+
+def columns(tiles):
+    return (tiles.resource.tolist(), tiles.quantum.tolist(), tiles.ent_group.tolist())
+
+
+def rows(states):
+    return {g: states.row(g) for g in states.groups()}
+
+
+def test_restore_undoes_collapses_and_interference():
+    game = new_game(3, num_entangled_pairs=4, seed=5)
+    tiles = game.tiles
+    before_columns, before_rows = columns(tiles), rows(tiles.states)
+    snap = tiles.snapshot()
+
+    first, second = tiles.states.groups()[:2]
+    tiles.interfere(tiles.states.members_of(first)[0])
+    tiles.measure(second)
+    assert columns(tiles) != before_columns and rows(tiles.states) != before_rows
+
+    tiles.dirty.clear()
+    tiles.restore(snap)
+    assert columns(tiles) == before_columns
+    assert rows(tiles.states) == before_rows
+    # every tile is sent again after a restore
+    assert tiles.dirty == set(range(len(tiles.coords)))
+
+
+def test_snapshot_does_not_follow_the_live_board():
+    game = new_game(2, num_entangled_pairs=3, seed=6)
+    tiles = game.tiles
+    snap = tiles.snapshot()
+    group = tiles.states.groups()[0]
+    tiles.states.apply(group, [3, 0])
+    assert snap[3].weights_of(group) == (1, 1)
+    # one snapshot can be restored any number of times
+    tiles.restore(snap)
+    tiles.states.apply(group, [1, 0])
+    tiles.restore(snap)
+    assert tiles.states.weights_of(group) == (1, 1)
+
+
+def test_restore_keeps_the_games_random_stream():
+    game = new_game(2, num_entangled_pairs=9, seed=7)
+    tiles = game.tiles
+    live = tiles.states.rng
+    tiles.restore(tiles.snapshot())
+    assert tiles.states.rng is live
+
+
+def test_copies_measure_independently():
+    game = new_game(2, num_entangled_pairs=9, seed=8)
+    states = game.tiles.states
+    copy = states.copy()
+    assert rows(copy) == rows(states) and copy.rng is not states.rng
+    groups = states.groups()
+    copy.remove(groups[0])
+    assert groups[0] in states and groups[0] not in copy
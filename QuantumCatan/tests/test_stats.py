@@ -0,0 +1,73 @@
+# tests/test_stats.py
+# The analysis functions on small hand written stores with known answers.
+
+import numpy as np
+from src.stats import StatsStore, Recorder, SCHEMA, mean_score_by_round, production_by_seat, tokens_by_group
+from src.bots import new_game
+
+
+def append(store, table, rows):
+    """rows: list of dicts, missing columns are 0"""
+    columns = {}
+    for name, (dtype, width) in SCHEMA[table].items():
+        blank = [0] * width if width > 1 else 0
+        columns[name] = [row.get(name, blank) for row in rows]
+    store.append(table, columns)
+
+
+def test_mean_score_by_round_uses_the_last_turn_of_each_round(tmp_path):
+    store = StatsStore(str(tmp_path))
+    # game 1 has three turns in round 0, game 2 only one: each game counts once per round
+    append(store, "turns", [
+        {"game": 1, "turn": 0, "round": 0, "score": [1, 0, 0, 0]},
+        {"game": 1, "turn": 1, "round": 0, "score": [1, 1, 0, 0]},
+        {"game": 1, "turn": 2, "round": 0, "score": [2, 1, 0, 0]},
+        {"game": 1, "turn": 3, "round": 1, "score": [4, 1, 0, 0]},
+        {"game": 2, "turn": 0, "round": 0, "score": [0, 2, 0, 0]},
+    ])
+    means = mean_score_by_round(store)
+    assert means.shape == (2, 4)
+    assert means[0].tolist() == [1.0, 1.5, 0, 0]
+    assert means[1].tolist() == [4.0, 1.0, 0, 0]
+
+
+def test_production_by_seat_keeps_player_counts_apart(tmp_path):
+    store = StatsStore(str(tmp_path))
+    append(store, "games", [{"game": 1, "players": 2}, {"game": 2, "players": 3}])
+    append(store, "turns", [
+        {"game": 1, "produced": [2, 4, 0, 0]},
+        {"game": 1, "produced": [0, 2, 0, 0]},
+        {"game": 2, "produced": [9, 9, 9, 0]},
+    ])
+    assert production_by_seat(store, 2).tolist() == [1.0, 3.0, 0, 0]
+    assert production_by_seat(store, 3).tolist() == [9.0, 9.0, 9.0, 0]
+    assert production_by_seat(store, 4).tolist() == [0, 0, 0, 0]
+
+
+def test_tokens_by_group_does_not_merge_reused_ids(tmp_path):
+    store = StatsStore(str(tmp_path))
+    # group 1 of game 5 collapses and its id is used again; game 6 has a group 1 of its own
+    append(store, "groups", [
+        {"game": 5, "turn": 0, "group": 1, "entanglement": 0, "issued": 2},
+        {"game": 5, "turn": 1, "group": 1, "entanglement": 0, "issued": 1, "collapsed": 1},
+        {"game": 5, "turn": 1, "group": 1, "entanglement": 1, "issued": 3},
+        {"game": 6, "turn": 0, "group": 1, "entanglement": 0, "issued": 4},
+    ])
+    t = tokens_by_group(store)
+    rows = sorted(zip(t["game"].tolist(), t["group"].tolist(), t["issued"].tolist(), t["collapsed"].tolist()))
+    assert rows == [(5, 1, 3, 0), (5, 1, 3, 1), (6, 1, 4, 0)]
+
+
+def test_recorder_numbers_a_reused_group_id_again(tmp_path):
+    store = StatsStore(str(tmp_path))
+    recorder = Recorder(store)
+    game = new_game(2, seed=0)
+    recorder.attach(game, 1)
+    recorder.on_token(game, 0, 1, 2)
+    recorder.on_collapse(game, 1, [])
+    recorder.on_token(game, 1, 1, 1)
+    recorder.finish(game)
+    recorder.close()
+    t = tokens_by_group(store)
+    assert sorted(zip(t["issued"].tolist(), t["collapsed"].tolist())) == [(1, 0), (2, 1)]
+    assert np.all(t["group"] == 1)
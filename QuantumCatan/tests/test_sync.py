@@ -0,0 +1,110 @@
+# tests/test_sync.py
+# Full snapshots and deltas rebuild the game on a mirror, and a client only sees its own hand
+
+import json
+import pytest
+from src.engine import GameEngine
+from src.bots import HeuristicBot, new_game
+from src.actions import legal_actions, apply_action
+from src.sync import DeltaEncoder, Mirror, StaleDelta, for_seat, hand, public_hand, meta
+
+
+def wire(message):
+    """what arrives at the client"""
+    return json.loads(json.dumps(message))
+
+
+def assert_mirrored(game, mirror_game, seat):
+    a, b = game.tiles, mirror_game.tiles
+    for col in ("resource", "number", "quantum", "ent_group"):
+        assert list(getattr(a, col)) == list(getattr(b, col)), col
+    assert {g: a.states.row(g) for g in a.states.groups()} == {g: b.states.row(g) for g in b.states.groups()}
+    assert game.settlements_owner == mirror_game.settlements_owner
+    assert game.roads_owner == mirror_game.roads_owner
+    assert meta(game) == meta(mirror_game)
+    for i, p in enumerate(mirror_game.players):
+        assert p.score == game.players[i].score
+        if i == seat:
+            assert hand(mirror_game, i) == hand(game, i)
+        else:
+            seen = public_hand(hand(mirror_game, i))
+            seen.update(cards=p.hidden_cards, token_count=p.hidden_tokens, held_count=p.hidden_dev_cards)
+            assert seen == public_hand(hand(game, i))
+
+
+def mirror_for(num_players):
+    mirror = Mirror(GameEngine(num_players))
+    mirror.game.start_game()
+    return mirror
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_round_trip(seed):
+    game = new_game(3, 3, seed=seed)
+    enc = DeltaEncoder(game)
+    mirrors = [mirror_for(3) for _ in range(3)]
+    for seat, m in enumerate(mirrors):
+        m.apply(wire(enc.full(seat)))
+    bots = [HeuristicBot(seed=i) for i in range(3)]
+    moves = 0
+    while game.runningGame and game.round < 60:
+        apply_action(game, bots[game.current_player].choose(game, legal_actions(game)))
+        delta = enc.delta()
+        for seat, m in enumerate(mirrors):
+            m.apply(wire(for_seat(delta, seat)))
+        moves += 1
+        if moves % 10 == 0:
+            for seat, m in enumerate(mirrors):
+                assert_mirrored(game, m.game, seat)
+    for seat, m in enumerate(mirrors):
+        assert_mirrored(game, m.game, seat)
+
+
+def test_mirror_cannot_see_opponent_cards():
+    game = new_game(2, 2, seed=7)
+    opponent = game.players[1]
+    opponent.held_dev_cards["knight"] = 2
+    opponent.held_dev_cards["point"] = 1
+    opponent.resources["ore"] += 3
+    enc = DeltaEncoder(game)
+    snapshot = wire(enc.full(0))
+    assert set(snapshot["hands"][1]).isdisjoint({"resources", "tokens", "held"})
+    m = mirror_for(2)
+    m.apply(snapshot)
+    seen = m.game.players[1]
+    assert sum(seen.held_dev_cards.values()) == 0 and seen.hidden_dev_cards == 3
+    assert not seen.resources.any() and seen.hidden_cards == sum(opponent.resources.counts)
+
+    # a delta does not tell either
+    opponent.held_dev_cards["Monopoly"] += 1
+    opponent.resources["wool"] += 1
+    game.push_message("something happened")
+    delta = enc.delta()
+    hands = dict((i, h) for i, h in wire(for_seat(delta, 0))["hands"])
+    assert set(hands[1]) == {"cards", "held_count"}
+    m.apply(wire(for_seat(delta, 0)))
+    assert sum(seen.held_dev_cards.values()) == 0 and seen.hidden_dev_cards == 4
+    # its owner sees the cards
+    owner = mirror_for(2)
+    owner.apply(wire(enc.full(1)))
+    assert owner.game.players[1].held_dev_cards == opponent.held_dev_cards
+
+
+def test_spectators_see_counts_only():
+    game = new_game(2, 2, seed=8)
+    snapshot = DeltaEncoder(game).full()
+    assert all("held" not in h and "resources" not in h for h in snapshot["hands"])
+
+
+def test_stale_delta_needs_a_full_snapshot():
+    game = new_game(2, 2, seed=9)
+    enc = DeltaEncoder(game)
+    m = mirror_for(2)
+    m.apply(wire(enc.full(0)))
+    apply_action(game, legal_actions(game)[0])
+    enc.delta()
+    apply_action(game, legal_actions(game)[0])
+    with pytest.raises(StaleDelta):
+        m.apply(wire(for_seat(enc.delta(), 0)))
+    m.apply(wire(enc.full(0)))
+    assert_mirrored(game, m.game, 0)
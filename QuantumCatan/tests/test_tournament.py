@@ -0,0 +1,70 @@
+# tests/test_tournament.py
+
+from src.tournament import Standings, schedule, play_chunk, run_tournament, load_results
+
+ENTRANTS = {"a": ("random", {}), "b": ("heuristic", {})}
+
+
+def result(seats, winner_seat):
+    return {"key": "k", "players": len(seats), "pairs": 2, "seats": seats, "winner_seat": winner_seat,
+            "winner": None if winner_seat is None else seats[winner_seat]}
+
+
+def test_an_entrant_in_several_seats_is_one_sample_per_game():
+    standings = Standings()
+    standings.add(result(["a", "a", "b"], 1))
+    standings.add(result(["a", "b", "b"], 0))
+    standings.add(result(["a", "a", "b"], None))
+    rows = {label: (games, wins) for label, games, wins, _, _ in standings.rows()}
+    assert rows == {"a": (3, 2), "b": (3, 0)}
+    assert standings.total_games == 3 and standings.unfinished == 1
+
+
+def test_balanced_games_have_their_own_keys():
+    free = schedule(["a", "b"], [2], [2], 2)
+    balanced = schedule(["a", "b"], [2], [2], 2, balanced=True)
+    assert len(free) == len(balanced)
+    assert not {g["key"] for g in free} & {g["key"] for g in balanced}
+
+
+def test_a_game_does_not_depend_on_the_games_before_it():
+    games = schedule(list(ENTRANTS), [2], [2], 2, seed=7)
+    alone = play_chunk(ENTRANTS, games[-1:], max_rounds=40)
+    after_others = play_chunk(ENTRANTS, games, max_rounds=40)
+    for r in alone + after_others:
+        del r["seconds"]
+    assert after_others[-1] == alone[0]
+
+
+def play(out_path, balanced=False):
+    """a small tournament into out_path, returns (standings, games played by this run)"""
+    progress = []
+    standings = run_tournament([("a", "random", {}), ("b", "heuristic", {})], player_counts=(2,),
+                               pair_counts=(2,), games_per_seating=2, out_path=str(out_path), workers=1,
+                               chunk_size=2, max_rounds=40, balanced=balanced,
+                               on_progress=lambda s, done, total: progress.append(done))
+    return standings, progress[-1] - progress[0]
+
+
+def test_resume_plays_only_the_missing_games(tmp_path):
+    out = tmp_path / "results.jsonl"
+    standings, played = play(out)
+    assert played == 4 and len(load_results(out)) == 4
+
+    # nothing left to play, the same standings come from the file
+    again, played = play(out)
+    assert played == 0 and again.rows() == standings.rows()
+
+    # a run killed while writing leaves half a line, that game is played again
+    lines = out.read_text().splitlines(keepends=True)
+    out.write_text("".join(lines[:-1]) + lines[-1][:10])
+    resumed, played = play(out)
+    assert played == 1 and resumed.rows() == standings.rows()
+    assert play(out)[1] == 0
+
+
+def test_resume_does_not_count_games_of_other_settings(tmp_path):
+    out = tmp_path / "results.jsonl"
+    play(out)
+    standings, played = play(out, balanced=True)
+    assert played == 4 and standings.total_games == 4